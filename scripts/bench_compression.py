@@ -0,0 +1,68 @@
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+from cryptography.fernet import Fernet
+
+CURRENT_SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_SCRIPT_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from src.utils.csv_helper import CSVHelper
+from stub_api import make_user, PEOPLE
+
+
+def measure(users: list, key: bytes, level, workdir: Path) -> dict:
+    """Write and read back the CSV artifact at one compression level."""
+    path = workdir / f"valid_users_{level}.csv.enc"
+
+    start = time.perf_counter()
+    CSVHelper.save_to_csv(users, [], output_path=path, key=key, compression_level=level)
+    write_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loaded = CSVHelper.load_csv(path, key=key)
+    read_time = time.perf_counter() - start
+
+    if len(loaded) != len(users):
+        print(f"Error: read back {len(loaded)} of {len(users)} users at level {level}.")
+        sys.exit(1)
+
+    return {"size": path.stat().st_size, "write": write_time, "read": read_time}
+
+
+def main(n_users: int, levels: list, mbps: float):
+    rng = random.Random(42)
+    users = [make_user(rng, list(PEOPLE)) for _ in range(n_users)]
+    key = Fernet.generate_key()
+    bytes_per_second = mbps * 1_000_000 / 8
+
+    with tempfile.TemporaryDirectory() as tmp, open(Path(tmp) / "log.txt", "w") as log:
+        stdout, sys.stdout = sys.stdout, log
+        try:
+            results = {level: measure(users, key, level, Path(tmp)) for level in [None] + levels}
+        finally:
+            sys.stdout = stdout
+
+    base = results[None]
+    base_total = base["write"] + base["size"] / bytes_per_second + base["read"]
+
+    print(f"Users: {n_users}, link: {mbps:g} Mbit/s")
+    print(f"{'level':>6} {'size MB':>9} {'ratio':>6} {'write s':>8} {'scp s':>7} {'read s':>7} {'total s':>8} {'saved s':>8}")
+    for level, r in results.items():
+        transfer = r["size"] / bytes_per_second
+        total = r["write"] + transfer + r["read"]
+        print(f"{'none' if level is None else level:>6} {r['size'] / 1e6:>9.2f} {base['size'] / r['size']:>6.2f} "
+              f"{r['write']:>8.2f} {transfer:>7.2f} {r['read']:>7.2f} {total:>8.2f} {base_total - total:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark zstd compression of the encrypted CSV artifact")
+    parser.add_argument("--users", type=int, default=50000, help="Number of synthetic records")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 3, 9, 19], help="zstd levels to compare")
+    parser.add_argument("--mbps", type=float, default=100.0, help="VM1 -> VM2 link bandwidth used for the scp estimate")
+    args = parser.parse_args()
+
+    main(n_users=args.users, levels=args.levels, mbps=args.mbps)
@@ -0,0 +1,89 @@
+import io
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import contextlib
+import subprocess
+import urllib.request
+from pathlib import Path
+
+CURRENT_SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_SCRIPT_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from cryptography.fernet import Fernet
+from src.etl.pipeline import ETLPipeline
+
+COMPARED = ["statistics.json", "processed_users.json", "validation_report.ndjson"]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def stub_server(latency: float):
+    """The local RandomUser stub in a subprocess, answering every request after `latency` seconds."""
+    port = free_port()
+    process = subprocess.Popen([sys.executable, str(CURRENT_SCRIPT_DIR / "stub_api.py"), "--port", str(port),
+                                "--latency", str(latency)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}/api/"
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"{url}?results=1", timeout=1).read()
+                break
+            except OSError:
+                time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run(url: str, n_users: int, workers: int, pipelined: bool, output_dir: Path) -> ETLPipeline:
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        pipeline = ETLPipeline(url, n_users, base_output_dir=output_dir, max_workers=workers,
+                               pipelined=pipelined, seed="bench")
+        pipeline.run()
+    return pipeline
+
+
+def main(n_users: int, workers: int, latency: float):
+    os.environ.setdefault("ETL_ENCRYPTION_KEY", Fernet.generate_key().decode())
+    print(f"{n_users} users, {workers} extraction workers, {latency:.2f}s API latency, {os.cpu_count()} CPUs available")
+
+    with stub_server(latency) as url, tempfile.TemporaryDirectory() as tmp:
+        sequential = run(url, n_users, workers, False, Path(tmp) / "sequential")
+        pipelined = run(url, n_users, workers, True, Path(tmp) / "pipelined")
+
+        for name in COMPARED:
+            if (sequential.run_dir / name).read_bytes() != (pipelined.run_dir / name).read_bytes():
+                print(f"Error: {name} differs between the sequential and pipelined runs.")
+                sys.exit(1)
+
+    print(f"{'mode':>10} {'extract':>8} {'transform':>10} {'load':>7} {'wall':>7}")
+    for name, pipeline in (("sequential", sequential), ("pipelined", pipelined)):
+        print(f"{name:>10} {pipeline.extract_seconds:>7.2f}s {pipeline.transform_seconds:>9.2f}s "
+              f"{pipeline.load_seconds:>6.2f}s {pipeline.wall_seconds:>6.2f}s")
+    extract, transform = sequential.extract_seconds, sequential.transform_seconds
+    print(f"Sequential extract + transform: {extract + transform:.2f}s, "
+          f"max(extract, transform): {max(extract, transform):.2f}s, "
+          f"pipelined extract and transform: {pipelined.wall_seconds - pipelined.load_seconds:.2f}s")
+    print(f"Speedup: {sequential.wall_seconds / pipelined.wall_seconds:.2f}x; "
+          f"outputs identical ({', '.join(COMPARED)}).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the sequential vs pipelined ETLPipeline against the local API stub")
+    parser.add_argument("--users", type=int, default=20000, help="Number of users to extract")
+    parser.add_argument("--workers", type=int, default=10, help="Max concurrent extraction workers")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds the stub waits before each response")
+    args = parser.parse_args()
+
+    main(n_users=args.users, workers=args.workers, latency=args.latency)
@@ -0,0 +1,117 @@
+import csv
+import sys
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+from itertools import islice
+
+CURRENT_SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_SCRIPT_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from src.utils.csv_helper import CSVHelper, RowCodec
+from stub_api import make_user, PEOPLE
+
+
+class HashingSink:
+    """Write target that only keeps a SHA-256 of the CSV text, so 1M rows need no memory."""
+
+    def __init__(self):
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, text: str):
+        data = text.encode("utf-8")
+        self.digest.update(data)
+        self.size += len(data)
+
+
+def legacy_write(users, out):
+    """CSV writing as done before RowCodec: flatten every user, list-scan fieldnames, DictWriter."""
+    flattened = [CSVHelper.flatten_dict(u) for u in users]
+    fieldnames = []
+    for u in flattened:
+        for k in u.keys():
+            if k not in fieldnames:
+                fieldnames.append(k)
+    writer = csv.DictWriter(out, fieldnames=fieldnames)
+    writer.writeheader()
+    writer.writerows(flattened)
+
+
+def codec_write(users, out):
+    codec = RowCodec.from_users(users)
+    writer = csv.writer(out)
+    writer.writerow(codec.fieldnames)
+    encode = codec.encode
+    writer.writerows(encode(u) for u in users)
+
+
+def legacy_read(f):
+    for row in csv.DictReader(f):
+        yield CSVHelper.unflatten_dict(row)
+
+
+def codec_read(f):
+    reader = csv.reader(f)
+    codec = RowCodec.from_fieldnames(next(reader))
+    for row in reader:
+        if row:
+            yield codec.decode(row)
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(n_rows: int, pool: int, verify: int):
+    rng = random.Random(42)
+    distinct = [make_user(rng, list(PEOPLE)) for _ in range(pool)]
+    users = [distinct[i % pool] for i in range(n_rows)]
+    print(f"Rows: {n_rows} ({pool} distinct synthetic users)")
+
+    legacy_sink, codec_sink = HashingSink(), HashingSink()
+    write_before = timed(legacy_write, users, legacy_sink)
+    write_after = timed(codec_write, users, codec_sink)
+    if legacy_sink.digest.digest() != codec_sink.digest.digest():
+        print("Error: RowCodec output differs from flatten_dict + DictWriter.")
+        sys.exit(1)
+    print(f"Write: legacy {write_before:.2f}s, RowCodec {write_after:.2f}s "
+          f"({write_before / write_after:.1f}x, {codec_sink.size / 1e6:.0f} MB, byte-identical)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "users.csv"
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            codec_write(users, f)
+
+        def consume(reader):
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                for _ in reader(f):
+                    pass
+
+        read_before = timed(consume, legacy_read)
+        read_after = timed(consume, codec_read)
+
+        with open(path, "r", newline="", encoding="utf-8") as a, open(path, "r", newline="", encoding="utf-8") as b:
+            pairs = zip(islice(legacy_read(a), verify), islice(codec_read(b), verify))
+            if any(x != y or list(x) != list(y) for x, y in pairs):
+                print("Error: RowCodec records differ from DictReader + unflatten_dict.")
+                sys.exit(1)
+
+    print(f"Read:  legacy {read_before:.2f}s, RowCodec {read_after:.2f}s "
+          f"({read_before / read_after:.1f}x, first {min(verify, n_rows)} records identical)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark flatten_dict/unflatten_dict vs RowCodec on CSV rows")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of CSV rows")
+    parser.add_argument("--pool", type=int, default=20000, help="Distinct synthetic users the rows cycle through")
+    parser.add_argument("--verify", type=int, default=100000, help="Records compared field by field after reading")
+    args = parser.parse_args()
+
+    main(n_rows=args.rows, pool=args.pool, verify=args.verify)
@@ -0,0 +1,72 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import contextlib
+from pathlib import Path
+
+CURRENT_SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_SCRIPT_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from src.etl.transformer import Transformer
+from src.utils.passwordauditor import PasswordAuditor
+from src.utils.stats_state import RunStatsState
+from src.utils.user_record import UserRecord
+from stub_api import make_user, PEOPLE
+
+
+def sequential(users: list) -> dict:
+    """validate_data, generate_stats and the password audit one after another, as run_transform_load does."""
+    transformer = Transformer(users)
+    transformer.validate_data()
+    transformer.generate_stats()
+    auditor = PasswordAuditor(transformer.get_users())
+    auditor.generate_all_stats()
+    return RunStatsState(transformer.stats_state, auditor.audit_state,
+                         validation=transformer.validation_report.summary()).finalize()
+
+
+def sharded(users: list, workers: int) -> dict:
+    return Transformer(users).process_sharded(workers).finalize()
+
+
+def timed(func, *args) -> tuple:
+    """(result, seconds), with the stages' progress output silenced."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(n_users: int, worker_counts: list, pool: int):
+    rng = random.Random(42)
+    distinct = [UserRecord.from_dict(make_user(rng, list(PEOPLE))) for _ in range(pool)]
+    users = [distinct[i % pool] for i in range(n_users)]
+    print(f"{n_users} users, {os.cpu_count()} CPUs available")
+
+    expected, baseline = timed(sequential, users)
+    expected = json.dumps(expected)
+    print(f"{'mode':>12} {'seconds':>9} {'speedup':>8}")
+    print(f"{'sequential':>12} {baseline:>9.2f} {1:>7.2f}x")
+
+    for workers in worker_counts:
+        result, seconds = timed(sharded, users, workers)
+        if json.dumps(result) != expected:
+            print(f"Error: sharded output with {workers} workers differs from the sequential stages.")
+            sys.exit(1)
+        print(f"{f'{workers} workers':>12} {seconds:>9.2f} {baseline / seconds:>7.2f}x")
+    print("Outputs identical (same keys, values and order).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs sharded validation, statistics and password audit")
+    parser.add_argument("--users", type=int, default=200_000, help="Dataset size")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Process counts to measure")
+    parser.add_argument("--pool", type=int, default=20000, help="Distinct synthetic users the dataset cycles through")
+    args = parser.parse_args()
+
+    main(n_users=args.users, worker_counts=args.workers, pool=args.pool)
@@ -0,0 +1,132 @@
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from collections import Counter, defaultdict
+
+CURRENT_SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_SCRIPT_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from src.utils.stats_accumulator import StatsAccumulator
+from src.utils.user_record import UserRecord
+try:
+    from src.utils.stats_numpy import vectorized_stats
+except ImportError:
+    vectorized_stats = None
+from stub_api import make_user, PEOPLE
+
+
+def legacy_stats(users) -> dict:
+    """generate_stats as it was before StatsAccumulator: one list per field, then Counter/statistics."""
+    ages = [user.age for user in users if isinstance(user.age, int)]
+    genders = [user.gender for user in users if user.gender is not None]
+    countries = [user.country for user in users if user.country is not None]
+    nationalities = [user.nat for user in users if user.nat is not None]
+    email_domains = [user.email.split("@")[-1] for user in users if user.email is not None]
+    username_lengths = [len(user.username or "") for user in users]
+    passwords = [user.password or "" for user in users]
+
+    reg_years = defaultdict(int)
+    for user in users:
+        if isinstance(user.registered, datetime):
+            reg_years[str(user.registered.year)] += 1
+
+    timezones = Counter(user.timezone_offset for user in users if user.timezone_offset)
+
+    age_decades = defaultdict(int)
+    for age in ages:
+        decade = (age // 10) * 10
+        age_decades[f"{decade}s"] += 1
+
+    password_lengths = [len(p) for p in passwords if p]
+
+    stats = {
+        "total_users": len(users),
+        "average_age": round(statistics.mean(ages), 2) if ages else 0.0,
+        "minimum_age": min(ages) if ages else 0,
+        "maximum_age": max(ages) if ages else 0,
+        "most_frequent_gender": Counter(genders).most_common(1)[0][0] if genders else None,
+        "gender_distribution": dict(Counter(genders)),
+        "different_countries": len(set(countries)),
+        "users_per_country": dict(Counter(countries)),
+        "nationality_distribution": dict(Counter(nationalities)),
+        "email_domain_distribution": dict(Counter(email_domains)),
+        "username_length_stats": {
+            "min": min(username_lengths) if username_lengths else 0,
+            "max": max(username_lengths) if username_lengths else 0,
+            "average": round(statistics.mean(username_lengths), 2) if username_lengths else 0.0,
+        },
+        "age_decade_distribution": dict(age_decades),
+        "password_length_stats": {
+            "min": min(password_lengths) if password_lengths else 0,
+            "max": max(password_lengths) if password_lengths else 0,
+            "average": round(statistics.mean(password_lengths), 2) if password_lengths else 0.0,
+            "distribution": dict(Counter(password_lengths)),
+            "short_percentage": round(
+                sum(1 for l in password_lengths if l < 8) / len(password_lengths) * 100, 2
+            ) if password_lengths else 0.0,
+        },
+        "registration_by_year": dict(sorted(reg_years.items())),
+        "timezone_distribution": dict(timezones.most_common(10))
+    }
+
+    return stats
+
+
+def accumulator_stats(users) -> dict:
+    return StatsAccumulator().update(users).finalize()
+
+
+def measure(func, users) -> tuple:
+    """(result, seconds, peak bytes allocated while running). Timed without tracemalloc, which slows Python down."""
+    start = time.perf_counter()
+    result = func(users)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(users)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main(sizes: list, pool: int):
+    rng = random.Random(42)
+    distinct = [UserRecord.from_dict(make_user(rng, list(PEOPLE))) for _ in range(pool)]
+
+    backends = [("legacy", legacy_stats), ("single", accumulator_stats)]
+    if vectorized_stats is not None:
+        backends.append(("numpy", vectorized_stats))
+    else:
+        print("NumPy/pandas not installed: numpy backend skipped.")
+
+    print(f"{'users':>9} " + " ".join(f"{name + ' s':>9} {name + ' peak MB':>15}" for name, _ in backends))
+    for n_users in sizes:
+        users = [distinct[i % pool] for i in range(n_users)]
+        row = []
+        expected = None
+        for name, func in backends:
+            result, seconds, peak = measure(func, users)
+            if expected is None:
+                expected = json.dumps(result)
+            elif json.dumps(result) != expected:
+                print(f"Error: {name} output differs from the legacy stats at {n_users} users.")
+                sys.exit(1)
+            row.append(f"{seconds:>9.2f} {peak / 1e6:>15.2f}")
+        print(f"{n_users:>9} " + " ".join(row))
+    print("Outputs identical (same keys, values and order).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark list-based generate_stats vs the single-pass StatsAccumulator and the NumPy backend")
+    parser.add_argument("--users", type=int, nargs="+", default=[100_000, 1_000_000], help="Dataset sizes")
+    parser.add_argument("--pool", type=int, default=20000, help="Distinct synthetic users the dataset cycles through")
+    args = parser.parse_args()
+
+    main(sizes=args.users, pool=args.pool)
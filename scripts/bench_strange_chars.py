@@ -0,0 +1,124 @@
+import re
+import sys
+import time
+import random
+import argparse
+import unicodedata
+from pathlib import Path
+
+CURRENT_SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_SCRIPT_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from src.utils import validator
+from src.utils.validator import Validator
+from src.utils.user_record import UserRecord
+from stub_api import make_user, PEOPLE
+
+# Corruptions injected into some records: each must be flagged the same way by both scanners.
+STRANGE = ["​", "一", "\x00", "\U0001f600", "А", "﻿", "\x7f", "­"]
+# Look strange but are accepted: fullwidth letters normalize (NFKC) to ASCII, entities and accents are allowed.
+HARMLESS = ["Ｍünchen", "&amp;", "Renée", "Ålesund"]
+
+
+def legacy_contains_strange_characters(text: str) -> bool:
+    """Validator.contains_strange_characters before the fast path (patterns compiled on every call)."""
+    if not isinstance(text, str):
+        return False
+
+    normalized = unicodedata.normalize("NFKC", text)
+
+    if (
+        re.fullmatch(r"&[a-zA-Z0-9#]+;", normalized)
+        or re.fullmatch(r"^[+-]\d{1,2}:\d{2}$", normalized)
+        or re.fullmatch(r"^[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}$", normalized)
+        or re.fullmatch(r"^https?://\S+$", normalized)
+    ):
+        return False
+
+    allowed_pattern = re.compile(r"^[\w\s'’‘\-–—.,;:/()@+À-ÿ&]+$", re.UNICODE)
+    if allowed_pattern.fullmatch(normalized):
+        return False
+
+    for ch in normalized:
+        if unicodedata.category(ch).startswith("C"):
+            return True
+
+    for ch in normalized:
+        if ord(ch) > 591:
+            return True
+
+    return False
+
+
+def legacy_strange_fields(user) -> list:
+    """The validate_data loop before the fast path."""
+    return [(key, value) for key, value in user.iter_fields()
+            if isinstance(value, str) and legacy_contains_strange_characters(value)]
+
+
+def make_users(n_users: int, corrupt: float, rng: random.Random) -> list:
+    users = []
+    for _ in range(n_users):
+        user = UserRecord.from_dict(make_user(rng, list(PEOPLE)))
+        if rng.random() < corrupt:
+            slot = rng.choice(["city", "last_name", "street_name", "username", "sha256", "picture_large"])
+            value = getattr(user, slot) or ""
+            position = rng.randrange(len(value) + 1)
+            setattr(user, slot, value[:position] + rng.choice(STRANGE + HARMLESS) + value[position:])
+        users.append(user)
+    return users
+
+
+def check_code_points():
+    """Every code point of the BMP, alone and inside text, gets the same verdict from both scanners."""
+    for code in range(0x10000):
+        ch = chr(code)
+        for text in (ch, f"Ma{ch}drid", f"https://x/{ch}", f"+0{ch}:00"):
+            if Validator.contains_strange_characters(text) != legacy_contains_strange_characters(text):
+                print(f"Error: verdicts differ for {text!r}")
+                sys.exit(1)
+
+
+def records_per_second(scan, users: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        validator._scan_cached.cache_clear()
+        start = time.perf_counter()
+        for user in users:
+            scan(user)
+        best = min(best, time.perf_counter() - start)
+    return len(users) / best
+
+
+def main(n_users: int, corrupt: float, repeat: int):
+    rng = random.Random(42)
+    users = make_users(n_users, corrupt, rng)
+
+    check_code_points()
+    flagged = 0
+    for user in users:
+        expected = legacy_strange_fields(user)
+        if Validator.strange_fields(user) != expected:
+            print(f"Error: flagged fields differ for {user!r}")
+            sys.exit(1)
+        flagged += bool(expected)
+    print(f"Records: {n_users} ({flagged} flagged); verdicts identical, including every BMP code point")
+
+    before = records_per_second(legacy_strange_fields, users, repeat)
+    after = records_per_second(Validator.strange_fields, users, repeat)
+    print(f"Legacy scanner:    {before:>10,.0f} records/s")
+    print(f"Fast-path scanner: {after:>10,.0f} records/s")
+    print(f"Speedup: {after / before:.1f}x")
+    info = validator._scan_cached.cache_info()
+    print(f"Non-ASCII cache: {info.hits} hits, {info.misses} misses, {info.currsize}/{info.maxsize} entries")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the strange-character scan of validate_data, before and after the fast path")
+    parser.add_argument("--users", type=int, default=20000, help="Number of synthetic records")
+    parser.add_argument("--corrupt", type=float, default=0.05, help="Share of records with an injected character")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    main(n_users=args.users, corrupt=args.corrupt, repeat=args.repeat)
@@ -0,0 +1,52 @@
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+CURRENT_SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_SCRIPT_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from src.utils.validator import Validator
+from src.utils.schema_validator import RecordValidator
+from stub_api import make_user, PEOPLE
+
+
+def time_per_record(check, users: list, repeat: int) -> float:
+    """Best-of-N time per record, in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for user in users:
+            check(user)
+        best = min(best, time.perf_counter() - start)
+    return best / len(users) * 1e6
+
+
+def main(n_users: int, repeat: int):
+    rng = random.Random(42)
+    users = [make_user(rng, list(PEOPLE)) for _ in range(n_users)]
+    compiled = RecordValidator.randomuser()
+
+    mismatches = sum(1 for u in users if Validator.is_valid_value(u) != compiled.is_valid(u))
+    if mismatches:
+        print(f"Error: {mismatches} verdict(s) differ between validators.")
+        sys.exit(1)
+
+    before = time_per_record(Validator.is_valid_value, users, repeat)
+    after = time_per_record(compiled.is_valid, users, repeat)
+
+    print(f"Records: {n_users} ({sum(1 for u in users if not compiled.is_valid(u))} invalid)")
+    print(f"Validator.is_valid_value (recursive): {before:.2f} us/record")
+    print(f"RecordValidator.is_valid (compiled):  {after:.2f} us/record")
+    print(f"Speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the recursive vs schema-compiled null validator")
+    parser.add_argument("--users", type=int, default=50000, help="Number of synthetic records")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    main(n_users=args.users, repeat=args.repeat)
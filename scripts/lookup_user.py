@@ -0,0 +1,61 @@
+import sys
+import os
+import json
+import argparse
+from pathlib import Path
+
+CURRENT_SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_SCRIPT_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from src.utils.record_index import ArtifactReader, index_path_for
+
+
+def main(run_path: str, record: int = None, user_uuid: str = None, first: int = None, last: int = None,
+         artifact: str = "valid_users.csv.enc"):
+    run_dir = Path(run_path)
+    if not run_dir.is_absolute() and not run_dir.exists():
+        run_dir = PROJECT_ROOT / run_dir
+
+    artifact_path = run_dir / artifact
+    if not artifact_path.exists() or not index_path_for(artifact_path).exists():
+        print(f"Error: {artifact_path} or its index {index_path_for(artifact_path).name} not found.")
+        sys.exit(1)
+
+    key_str = os.environ.get("ETL_ENCRYPTION_KEY")
+    if not key_str:
+        print("Error: Environment variable ETL_ENCRYPTION_KEY not set.")
+        sys.exit(1)
+
+    with ArtifactReader(artifact_path, key_str.encode()) as reader:
+        if user_uuid is not None:
+            user = reader.get_by_uuid(user_uuid)
+            if user is None:
+                print(f"No user with uuid {user_uuid} in {artifact} ({len(reader)} records).")
+                sys.exit(1)
+            users = [user]
+        elif record is not None:
+            try:
+                users = [reader.get(record)]
+            except IndexError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+        else:
+            users = reader.slice(first, last)
+
+    print(json.dumps(users if len(users) != 1 else users[0], indent=4, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Print users from an encrypted run artifact, decrypting only the chunks that hold them")
+    parser.add_argument("run_path", help="Run directory (e.g. output/2025_11_04_10-00-00)")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--record", type=int, help="Record number (0-based, in file order)")
+    group.add_argument("--uuid", help="login.uuid of the user")
+    group.add_argument("--slice", type=int, nargs=2, metavar=("FIRST", "LAST"), help="Records FIRST..LAST-1")
+    parser.add_argument("--artifact", default="valid_users.csv.enc", help="Indexed artifact inside the run directory")
+    args = parser.parse_args()
+
+    first, last = args.slice if args.slice else (None, None)
+    main(args.run_path, record=args.record, user_uuid=args.uuid, first=first, last=last, artifact=args.artifact)
@@ -0,0 +1,75 @@
+import os
+import sys
+import argparse
+from pathlib import Path
+
+CURRENT_SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = CURRENT_SCRIPT_DIR.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from cryptography.fernet import InvalidToken
+from src.etl.loader import Loader
+from src.utils.stats_state import RunStatsState, STATE_FILE
+
+
+def _resolve(path: str) -> Path:
+    path = Path(path)
+    return path if path.is_absolute() or path.exists() else PROJECT_ROOT / path
+
+
+def main(inputs: list, output_dir: str, dashboard: bool = True):
+    """
+    Merge the stats_state.json.enc of several runs (or earlier merges) and write the combined
+    statistics.json, stats_state.json.enc and dashboard. The output may be one of the inputs, which
+    adds a new run to a running total without rescanning the users of earlier runs.
+    """
+    key_str = os.environ.get("ETL_ENCRYPTION_KEY")
+    if not key_str:
+        print("Error: Environment variable ETL_ENCRYPTION_KEY not set.")
+        sys.exit(1)
+    key = key_str.encode()
+
+    merged = None
+    for path in map(_resolve, inputs):
+        state_path = path / STATE_FILE if path.is_dir() else path
+        if not state_path.exists():
+            print(f"Error: No {STATE_FILE} found at {state_path} (run run_transform_load.py on it first)")
+            sys.exit(1)
+        try:
+            state = RunStatsState.load(state_path, key)
+        except InvalidToken:
+            print(f"Error: Cannot decrypt {state_path} (wrong ETL_ENCRYPTION_KEY?)")
+            sys.exit(1)
+        if merged is None:
+            merged = state
+        else:
+            already = [run for run in state.runs if run in merged.runs]
+            if already:
+                print(f"Skipping {state_path}: {', '.join(already)} already merged (users would be counted twice)")
+                continue
+            try:
+                merged.merge(state)
+            except ValueError as e:
+                print(f"Error: Cannot merge {state_path}: {e}")
+                sys.exit(1)
+        print(f"Merged {state_path}: {state.stats.total_users} users")
+
+    stats = merged.finalize()
+    print(f"Combined: {stats['total_users']} users from {len(merged.runs)} runs")
+
+    loader = Loader(source=[], output_dir=_resolve(output_dir))
+    loader.save_stats(stats, merged, key)
+    if dashboard:
+        loader.save_dashboard(stats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Combine the statistics of several ETL runs without reprocessing their users",
+        epilog="Example: python scripts/merge_stats.py output/run_a output/run_b --output-dir output/combined")
+    parser.add_argument("inputs", nargs="+", help="Run directories or stats_state.json.enc files, merged in order")
+    parser.add_argument("--output-dir", required=True, help="Where the combined statistics are written")
+    parser.add_argument("--no-dashboard", action="store_true", help="Only write the JSON files")
+    args = parser.parse_args()
+
+    main(args.inputs, args.output_dir, dashboard=not args.no_dashboard)
@@ -15,17 +15,33 @@ sys.path.append(str(PROJECT_ROOT))
 
 # Ahora sí podemos importar
 from src.etl.extractor import Extractor
-
-
-def main(n_users: int, max_workers: int):
-    api_url = "https://randomuser.me/api/"
-
-    base_output_dir = PROJECT_ROOT / "output"
-
-    timestamp = datetime.now().strftime("%Y_%m_%d_%H-%M-%S")
-    run_dir = base_output_dir / timestamp
-
-    run_dir.mkdir(parents=True, exist_ok=True)
+from src.utils import metrics
+
+
+def main(n_users: int, max_workers: int, engine: str = "threads", concurrency: int = 100,
+         requests_per_second: float = None, stream: bool = False, resume_dir: str = None,
+         api_url: str = "https://randomuser.me/api/", seed: str = None, cache_dir: str = None,
+         cache_max_mb: int = 1024, offline: bool = False, metrics_port: int = None,
+         metrics_textfile: str = None, columnar: bool = False, compression_level: int = None,
+         dedup: str = "auto", dedup_key: str = "login.uuid", dedup_error_rate: float = 0.001,
+         dedup_state: str = None, initial_concurrency: int = None):
+    if seed is not None and cache_dir is None:
+        cache_dir = PROJECT_ROOT / "cache" / "responses"
+
+    if resume_dir:
+        run_dir = Path(resume_dir)
+        if not run_dir.is_absolute() and not run_dir.exists():
+            run_dir = PROJECT_ROOT / run_dir
+        if not run_dir.exists():
+            print(f"Error: Run directory to resume not found: {run_dir}")
+            sys.exit(1)
+    else:
+        base_output_dir = PROJECT_ROOT / "output"
+
+        timestamp = datetime.now().strftime("%Y_%m_%d_%H-%M-%S")
+        run_dir = base_output_dir / timestamp
+
+        run_dir.mkdir(parents=True, exist_ok=True)
 
     print(f"--- Running Extraction ---")
     print(f"Output directory: {run_dir.resolve()}")
@@ -38,15 +54,39 @@ def main(n_users: int, max_workers: int):
     encryption_key = key_str.encode()
     print("Encryption key loaded securely from environment.")
 
+    if metrics_port:
+        metrics.start_exporter(metrics_port)
+
     extractor = Extractor(
         api_url,
         n_users,
         output_dir=run_dir,
         max_workers=max_workers,
-        encryption_key=encryption_key
+        encryption_key=encryption_key,
+        max_in_flight=concurrency,
+        initial_concurrency=initial_concurrency,
+        requests_per_second=requests_per_second,
+        stream=stream,
+        seed=seed,
+        cache_dir=cache_dir,
+        cache_max_bytes=cache_max_mb * 1024 * 1024,
+        offline=offline,
+        columnar=columnar,
+        compression_level=compression_level,
+        dedup=None if dedup == "off" else dedup,
+        dedup_key=dedup_key,
+        dedup_error_rate=dedup_error_rate,
+        dedup_state=dedup_state
     )
 
-    extractor.extract()
+    resume = resume_dir is not None
+    if engine == "asyncio":
+        extractor.extract_async(resume=resume)
+    else:
+        extractor.extract(resume=resume)
+
+    if metrics_textfile:
+        metrics.write_textfile(metrics_textfile)
     print("--- Extraction Complete ---")
 
 
@@ -55,7 +95,8 @@ if __name__ == "__main__":
     parser.add_argument(
         "users",
         type=int,
-        help="Number of users to extract"
+        nargs="?",
+        help="Number of users to extract (taken from the checkpoint when using --resume)"
     )
     parser.add_argument(
         "--workers",
@@ -63,11 +104,127 @@ if __name__ == "__main__":
         default=10,
         help="Max concurrent workers"
     )
+    parser.add_argument(
+        "--engine",
+        choices=["threads", "asyncio"],
+        default="threads",
+        help="Extraction engine: thread pool or a single asyncio event loop"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=100,
+        help="Max in-flight requests when using the asyncio engine"
+    )
+    parser.add_argument(
+        "--initial-concurrency",
+        type=int,
+        default=None,
+        help="Starting in-flight limit, grown by AIMD up to --workers/--concurrency (default: half of it)"
+    )
+    parser.add_argument(
+        "--rps",
+        type=float,
+        default=None,
+        help="Max API requests per second shared by all workers (default: unlimited)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write each batch to the encrypted output as it arrives (bounded memory)"
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_DIR",
+        default=None,
+        help="Continue an interrupted extraction from the checkpoint in RUN_DIR"
+    )
+    parser.add_argument(
+        "--api-url",
+        default="https://randomuser.me/api/",
+        help="API endpoint (e.g. a local scripts/stub_api.py server)"
+    )
+    parser.add_argument(
+        "--seed",
+        default=None,
+        help="Fetch reproducible (seed, page) partitions and cache the raw responses on disk"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Response cache directory for seeded runs (default: cache/responses)"
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=1024,
+        help="Evict least recently used cached responses beyond this size"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve seeded requests from the cache only, never from the network"
+    )
+    parser.add_argument(
+        "--arrow",
+        action="store_true",
+        help="Also write the valid users as a typed, encrypted Arrow artifact (valid_users.arrow.enc)"
+    )
+    parser.add_argument(
+        "--compress",
+        metavar="LEVEL",
+        type=int,
+        nargs="?",
+        const=3,
+        default=None,
+        help="zstd-compress the encrypted CSVs before encryption (level 1-22, default 3)"
+    )
+    parser.add_argument(
+        "--dedup",
+        choices=["auto", "exact", "bloom", "off"],
+        default="auto",
+        help="Drop repeated users: exact hash set, or a bloom filter (fixed memory) for very large runs "
+             "(auto: bloom with --stream, exact otherwise)"
+    )
+    parser.add_argument(
+        "--dedup-key",
+        default="login.uuid",
+        help="Dotted field that identifies a user for deduplication"
+    )
+    parser.add_argument(
+        "--dedup-error-rate",
+        type=float,
+        default=0.001,
+        help="False-positive rate of the bloom filter (new users wrongly dropped as duplicates)"
+    )
+    parser.add_argument(
+        "--dedup-state",
+        metavar="FILE",
+        default=None,
+        help="Load and save the seen users here (encrypted) to also skip users extracted by earlier runs"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Expose Prometheus metrics on this port while the run is active"
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        default=None,
+        help="Write Prometheus metrics to this file when the run finishes"
+    )
 
     args = parser.parse_args()
 
-    if args.users <= 0:
+    if args.resume is None and (args.users is None or args.users <= 0):
         print("Error: Number of users must be greater than 0.")
         sys.exit(1)
 
-    main(n_users=args.users, max_workers=args.workers)
\ No newline at end of file
+    main(n_users=args.users, max_workers=args.workers, engine=args.engine, concurrency=args.concurrency,
+         requests_per_second=args.rps, stream=args.stream, resume_dir=args.resume,
+         api_url=args.api_url, seed=args.seed, cache_dir=args.cache_dir, cache_max_mb=args.cache_max_mb,
+         offline=args.offline, metrics_port=args.metrics_port, metrics_textfile=args.metrics_textfile,
+         columnar=args.arrow, compression_level=args.compress, dedup=args.dedup, dedup_key=args.dedup_key,
+         dedup_error_rate=args.dedup_error_rate, dedup_state=args.dedup_state,
+         initial_concurrency=args.initial_concurrency)
\ No newline at end of file
@@ -29,7 +29,7 @@ done
 
 echo "--- 3. Running Extraction on VM1 ---"
 echo "Starting extraction for $N_USERS users..."
-ssh $VM1_HOST "cd $PROJECT_DIR && source ~/.profile && source venv/bin/activate && export PYTHONPATH=. && python3 scripts/run_extract_only.py $N_USERS" \
+ssh $VM1_HOST "cd $PROJECT_DIR && source ~/.profile && source venv/bin/activate && export PYTHONPATH=. && python3 scripts/run_extract_only.py $N_USERS --arrow" \
     || error_exit "Extraction script failed on VM1."
 
 echo "--- 4. Finding latest run directory on VM1 ---"
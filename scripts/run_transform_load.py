@@ -1,5 +1,6 @@
 import sys
 import os
+import argparse
 from pathlib import Path
 
 CURRENT_SCRIPT_DIR = Path(__file__).resolve().parent
@@ -9,22 +10,23 @@ sys.path.append(str(PROJECT_ROOT))
 from src.etl.transformer import Transformer
 from src.utils.passwordauditor import PasswordAuditor
 from src.etl.loader import Loader
+from src.utils.stats_state import RunStatsState
+from src.utils import metrics
 
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: python run_transform_load.py <path_to_run_directory>")
-        sys.exit(1)
-
-    relative_run_path = sys.argv[1]
-
+def main(relative_run_path: str, metrics_port: int = None, metrics_textfile: str = None,
+         input_format: str = "auto", workers: int = 1, stats_backend: str = "python", shard_workers: int = 1,
+         approximate: bool = False, hll_error: float = 0.01, topk_error: float = 0.001):
     run_dir = PROJECT_ROOT / relative_run_path
 
-    csv_path = run_dir / "valid_users.csv.enc"
+    input_path = run_dir / "valid_users.csv.enc"
+    arrow_path = run_dir / "valid_users.arrow.enc"
+    if input_format == "arrow" or (input_format == "auto" and arrow_path.exists()):
+        input_path = arrow_path
 
-    if not csv_path.exists():
-        print(f"Error: Encrypted CSV not found.")
-        print(f"Looked in: {csv_path.resolve()}")
+    if not input_path.exists():
+        print(f"Error: Encrypted input not found.")
+        print(f"Looked in: {input_path.resolve()}")
         if run_dir.exists():
             print(f"Contents of {run_dir.name}: {[p.name for p in run_dir.glob('*')]}")
         sys.exit(1)
@@ -37,24 +39,108 @@ def main():
     key = key_str.encode()
     print("Encryption key loaded securely from environment.")
 
-    print("--- Running Transform ---")
-    transformer = Transformer(users_input=csv_path, encryption_key=key)
-    transformer.validate_data()
-    stats = transformer.generate_stats()
-    users_processed = transformer.get_users()
+    if metrics_port:
+        metrics.start_exporter(metrics_port)
 
-    print("--- Running Password Audit ---")
-    auditor = PasswordAuditor(users_processed)
-    password_stats = auditor.generate_all_stats()
-
-    stats.update(password_stats)
+    print("--- Running Transform ---")
+    print(f"Input: {input_path.name}")
+    approximate = {"hll_error": hll_error, "topk_error": topk_error} if approximate else None
+    transformer = Transformer(users_input=input_path, encryption_key=key, load_workers=workers,
+                              stats_backend=stats_backend, approximate=approximate)
+    if shard_workers > 1:
+        print(f"--- Running Transform & Password Audit ({shard_workers} processes) ---")
+        state = transformer.process_sharded(shard_workers)
+        state.runs = [relative_run_path]
+        users_processed = transformer.get_users()
+    else:
+        transformer.validate_data()
+        transformer.generate_stats()
+        users_processed = transformer.get_users()
+
+        print("--- Running Password Audit ---")
+        auditor = PasswordAuditor(users_processed, approximate=approximate)
+        auditor.generate_all_stats()
+
+        state = RunStatsState(transformer.stats_state, auditor.audit_state, runs=[relative_run_path],
+                              validation=transformer.validation_report.summary())
+
+    # Transform and audit statistics combined, with the error bounds of approximate mode in one place.
+    stats = state.finalize()
 
     print("--- Running Load ---")
     loader = Loader(source=users_processed, output_dir=run_dir)
-    loader.save_stats_and_dashboard(users_processed, stats)
+    loader.save_validation_report(transformer.validation_report)
+    loader.save_stats_and_dashboard(users_processed, stats, state=state, key=key)
+
+    if metrics_textfile:
+        metrics.write_textfile(metrics_textfile)
 
     print("--- T&L Complete ---")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run ETL Transform and Load Steps")
+    parser.add_argument(
+        "run_path",
+        help="Run directory (relative to the project root) containing valid_users.csv.enc"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["auto", "csv", "arrow"],
+        default="auto",
+        help="Input artifact; auto uses valid_users.arrow.enc when present, else the CSV"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes used to decrypt and parse the CSV input (default: all CPUs; 1 loads sequentially)"
+    )
+    parser.add_argument(
+        "--shard-workers",
+        type=int,
+        default=1,
+        help="Processes that validate, compute statistics and audit passwords over shards of the users "
+             "(default: 1, sequential in this process)"
+    )
+    parser.add_argument(
+        "--stats-backend",
+        choices=["python", "numpy"],
+        default=os.environ.get("ETL_STATS_BACKEND", "python"),
+        help="Statistics engine: single-pass Python, or NumPy/pandas columns (default: $ETL_STATS_BACKEND or python)"
+    )
+    parser.add_argument(
+        "--approximate",
+        action="store_true",
+        help="Bounded-memory sketches for distinct countries, top countries, email domains and passwords"
+    )
+    parser.add_argument(
+        "--hll-error",
+        type=float,
+        default=0.01,
+        help="Relative standard error of the HyperLogLog distinct counts in approximate mode (default: 0.01)"
+    )
+    parser.add_argument(
+        "--topk-error",
+        type=float,
+        default=0.001,
+        help="Max overcount of the top-k counts in approximate mode, as a fraction of the users (default: 0.001)"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Expose Prometheus metrics on this port while the run is active"
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        default=None,
+        help="Write Prometheus metrics to this file when the run finishes"
+    )
+
+    args = parser.parse_args()
+
+    main(args.run_path, metrics_port=args.metrics_port, metrics_textfile=args.metrics_textfile,
+         input_format=args.format, workers=args.workers,
+         stats_backend=args.stats_backend, shard_workers=args.shard_workers,
+         approximate=args.approximate, hll_error=args.hll_error, topk_error=args.topk_error)
@@ -0,0 +1,177 @@
+import argparse
+import json
+import time
+import random
+import uuid
+import hashlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Local stand-in for https://randomuser.me/api/ used for offline runs, benchmarks and debugging.
+# Supports the parameters the Extractor uses: results, nat, seed and page.
+# Seeded requests are deterministic: the same (seed, page, results) always returns the same users.
+
+PEOPLE = {
+    "CH": ("Switzerland", ["Luca", "Léa", "Jürg"], ["Müller", "Meier", "Favre"], ["Zürich", "Genève", "Bern"]),
+    "DE": ("Germany", ["Jürgen", "Anke", "Lukas"], ["Schäfer", "Wagner", "Becker"], ["München", "Köln", "Berlin"]),
+    "DK": ("Denmark", ["Mads", "Freja", "Søren"], ["Jensen", "Nielsen", "Højgaard"], ["København", "Aarhus", "Odense"]),
+    "ES": ("Spain", ["Sofía", "Javier", "Iñigo"], ["García", "Núñez", "López"], ["Madrid", "Sevilla", "Málaga"]),
+    "FI": ("Finland", ["Aino", "Eetu", "Väinö"], ["Mäkinen", "Virtanen", "Koskinen"], ["Helsinki", "Espoo", "Tampere"]),
+    "FR": ("France", ["Émile", "Chloé", "Louis"], ["Dubois", "Lefèvre", "Martin"], ["Lyon", "Paris", "Nantes"]),
+    "GB": ("United Kingdom", ["Oliver", "Amelia", "Harry"], ["Smith", "Jones", "O'Brien"], ["London", "Leeds", "York"]),
+    "IE": ("Ireland", ["Seán", "Aoife", "Liam"], ["Murphy", "Kelly", "Ryan"], ["Dublin", "Cork", "Galway"]),
+    "NL": ("Netherlands", ["Daan", "Sanne", "Bram"], ["de Jong", "Jansen", "Bakker"], ["Utrecht", "Leiden", "Delft"]),
+    "NO": ("Norway", ["Ole", "Ingrid", "Håkon"], ["Hansen", "Johansen", "Ødegård"], ["Oslo", "Bergen", "Tromsø"]),
+    "TR": ("Turkey", ["Ayşe", "Mehmet", "Çağla"], ["Yılmaz", "Kaya", "Öztürk"], ["İstanbul", "Ankara", "İzmir"]),
+    "RS": ("Serbia", ["Miloš", "Jelena", "Nikola"], ["Petrović", "Jovanović", "Ilić"], ["Beograd", "Niš", "Novi Sad"]),
+    "UA": ("Ukraine", ["Олег", "Оксана", "Taras"], ["Ковальчук", "Shevchenko", "Bondarenko"], ["Київ", "Lviv", "Odesa"]),
+    "BR": ("Brazil", ["João", "Ana", "Thiago"], ["Silva", "Araújo", "Gonçalves"], ["São Paulo", "Recife", "Natal"]),
+    "MX": ("Mexico", ["José", "María", "Ximena"], ["Hernández", "Ramírez", "Pérez"], ["Cancún", "Toluca", "Mérida"]),
+}
+OFFSETS = ["-3:00", "-6:00", "0:00", "+1:00", "+2:00", "+3:00", "+5:30", "+9:00"]
+PASSWORDS = ["password", "123456", "qwerty", "dragon", "letmein", "monkey", "sunshine", "trustno1"]
+
+
+def make_user(rng: random.Random, nats: list) -> dict:
+    """Build one RandomUser-shaped record."""
+    nat = rng.choice(nats)
+    country, first_names, last_names, cities = PEOPLE[nat]
+    gender = rng.choice(["male", "female"])
+    first, last = rng.choice(first_names), rng.choice(last_names)
+    username = f"{rng.choice(['happy', 'silver', 'blue', 'tiny'])}{rng.choice(['cat', 'fox', 'bird'])}{rng.randint(1, 999)}"
+
+    if rng.random() < 0.5:
+        password = rng.choice(PASSWORDS)
+    else:
+        alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%"
+        password = "".join(rng.choice(alphabet) for _ in range(rng.randint(4, 16)))
+    if rng.random() < 0.05:
+        password = first.lower() + str(rng.randint(1, 99))
+
+    age = rng.randint(18, 80)
+    birth_year = 2025 - age
+    reg_year = rng.randint(2002, 2022)
+    salt = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(8))
+
+    return {
+        "gender": gender,
+        "name": {"title": "Mr" if gender == "male" else "Ms", "first": first, "last": last},
+        "location": {
+            "street": {"number": rng.randint(1, 9999), "name": rng.choice(["Main Street", "Hauptstraße", "Rue Haute"])},
+            "city": rng.choice(cities),
+            "state": rng.choice(cities),
+            "country": country,
+            "postcode": rng.randint(1000, 99999) if nat not in ("GB", "IE", "NL") else f"{rng.randint(10, 99)} AB",
+            "coordinates": {"latitude": f"{rng.uniform(-90, 90):.4f}", "longitude": f"{rng.uniform(-180, 180):.4f}"},
+            "timezone": {"offset": rng.choice(OFFSETS), "description": "Stub timezone"},
+        },
+        "email": f"{first.lower()}.{last.lower().replace(' ', '')}@example.com",
+        "login": {
+            "uuid": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "username": username,
+            "password": password,
+            "salt": salt,
+            "md5": hashlib.md5((password + salt).encode()).hexdigest(),
+            "sha1": hashlib.sha1((password + salt).encode()).hexdigest(),
+            "sha256": hashlib.sha256((password + salt).encode()).hexdigest(),
+        },
+        "dob": {"date": f"{birth_year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T0{rng.randint(0, 9)}:15:30.{rng.randint(100, 999)}Z",
+                "age": age},
+        "registered": {"date": f"{reg_year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00.{rng.randint(100, 999)}Z",
+                       "age": 2025 - reg_year},
+        "phone": f"0{rng.randint(10000000, 99999999)}",
+        "cell": f"0{rng.randint(10000000, 99999999)}",
+        "id": {"name": "ID", "value": None if rng.random() < 0.15 else str(rng.randint(10 ** 7, 10 ** 8))},
+        "picture": {
+            "large": f"https://randomuser.me/api/portraits/men/{rng.randint(1, 99)}.jpg",
+            "medium": f"https://randomuser.me/api/portraits/med/men/{rng.randint(1, 99)}.jpg",
+            "thumbnail": f"https://randomuser.me/api/portraits/thumb/men/{rng.randint(1, 99)}.jpg",
+        },
+        "nat": nat,
+    }
+
+
+def make_response(params: dict) -> dict:
+    """Build a full API response for the given query parameters."""
+    results = min(int(params.get("results", 1)), 5000)
+    page = int(params.get("page", 1))
+    nats = [n for n in params.get("nat", "").upper().split(",") if n in PEOPLE] or list(PEOPLE)
+    seed = params.get("seed")
+
+    rng = random.Random(f"{seed}:{page}:{','.join(nats)}") if seed else random.Random()
+    users = [make_user(rng, nats) for _ in range(results)]
+
+    return {"results": users, "info": {"seed": seed or "", "results": results, "page": page, "version": "stub"}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    fail_rate = 0.0
+    duplicate_rate = 0.0
+    latency = 0.0
+    # Users served so far (bounded), from which repeated identities are drawn.
+    served = []
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if random.random() < self.fail_rate:
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.end_headers()
+            return
+
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        response = make_response(params)
+        if self.duplicate_rate:
+            self.repeat_users(response["results"])
+        body = json.dumps(response).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    @classmethod
+    def repeat_users(cls, users: list):
+        """Replace a share of the users with ones already served, like RandomUser repeating identities."""
+        for i, user in enumerate(users):
+            if cls.served and random.random() < cls.duplicate_rate:
+                users[i] = random.choice(cls.served)
+            elif len(cls.served) < 100000:
+                cls.served.append(user)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub of the RandomUser API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--fail-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests answered with 429 (to exercise rate limiting)"
+    )
+    parser.add_argument(
+        "--duplicate-rate",
+        type=float,
+        default=0.0,
+        help="Share of users repeated from earlier responses (to exercise deduplication)"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Seconds each response is delayed (to simulate a remote API)"
+    )
+    args = parser.parse_args()
+
+    StubHandler.latency = args.latency
+    StubHandler.fail_rate = args.fail_rate
+    StubHandler.duplicate_rate = args.duplicate_rate
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Stub RandomUser API listening on http://{args.host}:{args.port}/api/")
+    server.serve_forever()
@@ -0,0 +1,83 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from cryptography.fernet import Fernet
+
+
+class CheckpointStore:
+    """
+    Persists the completed batches of an extraction run so it can be resumed after a crash.
+    - <run_dir>/checkpoint/manifest.json: run parameters and number of completed batches
+    - <run_dir>/checkpoint/batch_000001.enc: valid and invalid users of one batch (encrypted JSON)
+    """
+
+    MANIFEST_NAME = "manifest.json"
+
+    def __init__(self, run_dir, key: bytes = None):
+        self.dir = Path(run_dir) / "checkpoint"
+        self.manifest_path = self.dir / self.MANIFEST_NAME
+        self.fernet = Fernet(key) if key else None
+        self.manifest = None
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def start(self, params: dict):
+        """Start a fresh checkpoint for a new run, discarding any previous one."""
+        self.clear()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = {**params, "completed_batches": 0, "valid_count": 0, "invalid_count": 0}
+        self._write_manifest()
+
+    def load_manifest(self) -> dict:
+        """Load the manifest of an interrupted run."""
+        if not self.exists():
+            raise FileNotFoundError(f"No checkpoint manifest found at {self.manifest_path}")
+
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        return self.manifest
+
+    def _batch_path(self, number: int) -> Path:
+        return self.dir / f"batch_{number:06d}.enc"
+
+    def save_batch(self, valid: list, invalid: list, page: int = None):
+        """Persist one completed batch. The manifest is only updated once the batch file is fully written."""
+        number = self.manifest["completed_batches"] + 1
+
+        data = json.dumps({"valid": valid, "invalid": invalid, "page": page}).encode("utf-8")
+        if self.fernet:
+            data = self.fernet.encrypt(data)
+
+        batch_path = self._batch_path(number)
+        tmp_path = batch_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, batch_path)
+
+        self.manifest["completed_batches"] = number
+        self.manifest["valid_count"] += len(valid)
+        self.manifest["invalid_count"] += len(invalid)
+        self._write_manifest()
+
+    def iter_batches(self):
+        """Yield (valid, invalid, page) for every completed batch, in the order they were saved."""
+        for number in range(1, self.manifest["completed_batches"] + 1):
+            with open(self._batch_path(number), "rb") as f:
+                data = f.read()
+            if self.fernet:
+                data = self.fernet.decrypt(data)
+            batch = json.loads(data)
+            yield batch["valid"], batch["invalid"], batch.get("page")
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=4)
+        os.replace(tmp_path, self.manifest_path)
+
+    def clear(self):
+        """Remove the checkpoint directory (after a successful run, so it is not shipped to VM2)."""
+        if self.dir.exists():
+            shutil.rmtree(self.dir)
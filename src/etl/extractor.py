@@ -1,10 +1,20 @@
+import asyncio
+import json
+import random
 import requests
 import time
 import sys
 from pathlib import Path
-from src.utils.validator import Validator
-from src.utils.csv_helper import CSVHelper
+from src.utils.schema_validator import RecordValidator
+from src.utils.csv_helper import CSVHelper, StreamingCSVWriter
+from src.utils.rate_limiter import TokenBucket, AIMDController
+from src.utils.response_cache import ResponseCache, CacheMissError
+from src.utils.dedup import make_seen, load_seen, save_seen, key_of
+from src.utils import metrics
+from src.etl.checkpoint import CheckpointStore
+from src.etl.scheduler import BatchScheduler
 import concurrent.futures
+from collections import Counter
 
 def _print_progress(current: int, total: int, bar_length: int = 40):
     """Display a console progress bar."""
@@ -16,11 +26,25 @@ def _print_progress(current: int, total: int, bar_length: int = 40):
     sys.stdout.flush()
 
 
+class RetryableError(Exception):
+    """A failed request that is worth retrying (429, 5xx)."""
+
+    def __init__(self, message: str, retry_after=None, throttled: bool = False):
+        super().__init__(message)
+        try:
+            self.retry_after = float(retry_after) if retry_after is not None else None
+        except ValueError:
+            self.retry_after = None
+        self.throttled = throttled
+
+
 class Extractor:
     """
     Extractor class:
     - Fetches users from the RandomUser API
+    - With a seed, fetches reproducible (seed, page) partitions that can be served from a local cache
     - Validates only null/empty fields
+    - Drops valid users already seen (by login.uuid, in this run or, with a dedup state file, earlier runs)
     - Saves valid and invalid users to CSV
     """
 
@@ -28,86 +52,462 @@ class Extractor:
     LATAM_NATS = ["BR", "MX"]
 
     def __init__(self, api_url: str, total_users: int = 1000, batch_size: int = 500, output_dir=None,
-                 max_workers: int = 10, encryption_key: bytes = None):
+                 max_workers: int = 10, encryption_key: bytes = None, max_in_flight: int = 100,
+                 requests_per_second: float = None, latency_target: float = 10.0, max_retries: int = 5,
+                 retry_base: float = 2.0, retry_cap: float = 60.0, stream: bool = False,
+                 checkpoint: bool = True, seed: str = None, cache_dir=None,
+                 cache_max_bytes: int = 1024 * 1024 * 1024, offline: bool = False, columnar: bool = False,
+                 compression_level: int = None, dedup: str = "auto", dedup_key: str = "login.uuid",
+                 dedup_error_rate: float = 0.001, dedup_capacity: int = None, dedup_state=None, on_batch=None,
+                 initial_concurrency: int = None):
         self.api_url = api_url.rstrip("?&")
         self.total_users = total_users
         self.batch_size = batch_size
         self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.latency_target = latency_target
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+        self.rate_limiter = TokenBucket(rate=requests_per_second)
+        # Starting in-flight limit; AIMD grows it up to max_workers (threads) or max_in_flight (asyncio).
+        self.initial_concurrency = initial_concurrency
+        self.concurrency = AIMDController(maximum=max_workers, initial=initial_concurrency,
+                                          latency_target=latency_target)
         self.encryption_key = encryption_key
+        self.stream = stream
+        # Streaming mode only: called with each batch of accepted valid users (and the RowCodec they are written
+        # with), in output order, before the batch is written. Its exceptions abort the run.
+        self.on_batch = on_batch
         self.all_users = []
         self.invalid_users = []
-        self.validator = Validator()
+        self.valid_count = 0
+        self.invalid_count = 0
+        self.valid_writer = None
+        self.invalid_writer = None
+        self.columnar = columnar
+        self.compression_level = compression_level
+        self.columnar_writer = None
+        # "auto": an exact set normally; in streaming mode a (growing) bloom filter, whose memory is fixed per
+        # key instead of holding every key string, so streaming keeps its small footprint.
+        self.dedup = ("bloom" if stream else "exact") if dedup == "auto" else dedup
+        self.dedup_key = tuple(dedup_key.split("."))
+        self.dedup_error_rate = dedup_error_rate
+        self.dedup_capacity = dedup_capacity
+        self.dedup_state = Path(dedup_state) if dedup_state else None
+        self.seen = None
+        self.duplicate_count = 0
+        self.validator = RecordValidator.randomuser()
+        self.invalid_fields = Counter()
         self.nationalities = self.EU_NATS + self.LATAM_NATS
         self.run_dir = Path(output_dir) if output_dir else Path("../../output")
         self.run_dir.mkdir(parents=True, exist_ok=True)
-
-    def _build_url(self) -> str:
-        """Build API URL with nationality and results parameters."""
+        self.checkpoints = CheckpointStore(self.run_dir, key=encryption_key) if checkpoint else None
+        self.seed = seed
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.offline = offline
+        self.cache = None
+        self._next_page = 1
+        self._retry_pages = []
+        self._page_failures = {}
+        self._pending_pages = {}
+        self._pending_valid = 0
+        self._next_page_to_collect = 1
+
+    def _build_url(self, results: int = None, page: int = None) -> str:
+        """Build API URL with nationality and results parameters (plus seed and page in seeded mode)."""
         nat_param = ",".join(self.nationalities)
+        results = results or self.batch_size
+        query = f"nat={nat_param}&results={results}"
+        if self.seed is not None and page is not None:
+            query += f"&seed={self.seed}&page={page}"
+
         if "?" in self.api_url:
-            return f"{self.api_url}&nat={nat_param}&results={self.batch_size}"
+            return f"{self.api_url}&{query}"
         else:
-            return f"{self.api_url}?nat={nat_param}&results={self.batch_size}"
+            return f"{self.api_url}?{query}"
+
+    def _cached_response(self, url: str):
+        """Return the cached response for a seeded request, or None. Raises CacheMissError when offline."""
+        if self.cache is None:
+            return None
+
+        body = self.cache.get(url)
+        metrics.CACHE_REQUESTS.labels(result="miss" if body is None else "hit").inc()
+        if body is not None:
+            return json.loads(body)
+
+        if self.offline:
+            raise CacheMissError(f"Offline mode: no cached response for {url}")
+        return None
+
+    def _store_response(self, url: str, body: bytes):
+        if self.cache is not None:
+            self.cache.put(url, body)
+
+    def _fetch_batch(self, results: int = None, page: int = None) -> tuple[list, list]:
+        """Fetch a batch of users (with jittered retries) and separate valid/invalid entries (nulls only)."""
+        url = self._build_url(results, page)
+        cached = self._cached_response(url)
+        if cached is not None:
+            return self._split_users(cached)
+
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            start = time.monotonic()
+
+            try:
+                response = requests.get(url, timeout=15)
+                self._check_status(response.status_code, response.headers.get("Retry-After"),
+                                   time.monotonic() - start)
+                data = response.json()
+                metrics.API_BYTES.inc(len(response.content))
+                self._store_response(url, response.content)
+                return self._split_users(data)
+
+            except (requests.RequestException, RetryableError) as e:
+                last_error = e
+                self._record_failure(e)
+                if attempt == self.max_retries:
+                    break
+                time.sleep(self._retry_delay(attempt, e))
+
+        raise Exception(f"Giving up after {self.max_retries + 1} attempts: {self._describe_error(last_error)}")
+
+    async def _fetch_batch_async(self, session, results: int = None, page: int = None) -> tuple[list, list]:
+        """Async counterpart of _fetch_batch that reuses the pooled aiohttp session."""
+        import aiohttp
+
+        url = self._build_url(results, page)
+        cached = self._cached_response(url)
+        if cached is not None:
+            return self._split_users(cached)
+
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self.rate_limiter.reserve())
+            start = time.monotonic()
+
+            try:
+                async with session.get(url) as response:
+                    self._check_status(response.status, response.headers.get("Retry-After"),
+                                       time.monotonic() - start)
+                    body = await response.read()
+                data = json.loads(body)
+                metrics.API_BYTES.inc(len(body))
+                self._store_response(url, body)
+                return self._split_users(data)
+
+            except (aiohttp.ClientError, asyncio.TimeoutError, RetryableError) as e:
+                last_error = e
+                self._record_failure(e)
+                if attempt == self.max_retries:
+                    break
+                await asyncio.sleep(self._retry_delay(attempt, e))
 
-    def _fetch_batch(self, retry_wait: int = 5) -> tuple[list, list]:
-        """Fetch a batch of users and separate valid/invalid entries (nulls only)."""
-        url = self._build_url()
+        raise Exception(f"Giving up after {self.max_retries + 1} attempts: {self._describe_error(last_error)}")
 
-        try:
-            response = requests.get(url, timeout=15)
+    def _check_status(self, status: int, retry_after, latency: float):
+        """Report the response outcome to the concurrency controller and raise if it must be retried."""
+        metrics.API_REQUESTS.labels(status=str(status)).inc()
+        metrics.API_LATENCY.observe(latency)
 
-            if response.status_code == 429:
-                print(f"\nRate limit reached (429). Waiting {retry_wait} seconds...")
-                time.sleep(retry_wait)
-                return self._fetch_batch(retry_wait=min(retry_wait * 2, 60))
+        if status == 429:
+            self.concurrency.on_congestion()
+            metrics.CONCURRENCY_LIMIT.set(self.concurrency.limit)
+            raise RetryableError("Rate limit reached (429).", retry_after=retry_after, throttled=True)
 
-            if response.status_code != 200:
-                raise Exception(f"Error obtaining data: {response.status_code}")
+        if status >= 500:
+            raise RetryableError(f"Server error ({status}).")
 
-            data = response.json()
-            if "results" not in data:
-                raise Exception("missing 'results' key.")
+        if status != 200:
+            raise Exception(f"Error obtaining data: {status}")
 
-            users = data["results"]
+        self.concurrency.on_success(latency)
+        metrics.CONCURRENCY_LIMIT.set(self.concurrency.limit)
 
-            valid = []
-            invalid = []
-            for user in users:
-                if self.validator.is_valid_value(user):
-                    valid.append(user)
-                else:
-                    invalid.append(user)
+    @staticmethod
+    def _record_failure(error: Exception):
+        """Count requests that failed before an HTTP status was received."""
+        if not isinstance(error, RetryableError):
+            metrics.API_REQUESTS.labels(status="network_error").inc()
 
-            return valid, invalid
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """
+        Exponential backoff with jitter, so workers that failed together do not retry together.
+        A 429 also pauses the shared rate limiter, holding back every other worker.
+        """
+        backoff = min(self.retry_cap, self.retry_base * 2 ** attempt)
+        delay = backoff / 2 + random.uniform(0, backoff / 2)
 
-        except requests.RequestException as e:
-            print(f"\nNetwork error: {e}")
-            time.sleep(5)
-            return [], []
+        if not isinstance(error, RetryableError):
+            metrics.API_RETRIES.labels(reason="network_error").inc()
+        elif error.throttled:
+            metrics.API_RETRIES.labels(reason="rate_limit").inc()
+        else:
+            metrics.API_RETRIES.labels(reason="server_error").inc()
+
+        if isinstance(error, RetryableError):
+            if error.retry_after:
+                delay = max(delay, error.retry_after)
+            if error.throttled:
+                self.rate_limiter.pause(delay)
+
+        print(f"\n{self._describe_error(error)} Retrying in {delay:.1f} seconds "
+              f"(attempt {attempt + 1}/{self.max_retries})...")
+        return delay
+
+    @staticmethod
+    def _describe_error(error: Exception) -> str:
+        if isinstance(error, RetryableError):
+            return str(error)
+        return f"Network error: {str(error) or type(error).__name__}."
+
+    def _split_users(self, data: dict) -> tuple[list, list]:
+        """Separate the users of an API response into valid and invalid entries (nulls only)."""
+        if "results" not in data:
+            raise Exception("missing 'results' key.")
+
+        valid = []
+        invalid = []
+        for user in data["results"]:
+            if self.validator.is_valid(user):
+                valid.append(user)
+            else:
+                invalid.append(user)
+
+        return valid, invalid
+
+    def _report_plan(self, concurrency: int):
+        """Print how many batches the scheduler expects and how many requests start right away."""
+        estimated_batches_needed = self.scheduler.estimated_batches(self.valid_count)
+        initial_to_launch = min(estimated_batches_needed, concurrency)
+
+        print(
+            f"Estimated batches: {estimated_batches_needed}. Launching {initial_to_launch} initial worker(s)...")
 
-    def extract(self) -> Path:
+    def _collected_count(self) -> int:
+        """Valid users received so far, including seeded pages waiting for an earlier page to arrive."""
+        return self.valid_count + self._pending_valid
+
+    def _next_requests(self, in_flight: int):
         """
-        Starts the multi-threaded extraction process, collects users, and saves them to an encrypted CSV.
-        :return: Path to the saved valid users CSV file.
+        Yield (size, page) for the requests to launch now, within the AIMD limit and the scheduler's needs.
+        In seeded mode, pages that failed are always fetched again so the output has no gaps.
         """
-        print(f"\nStarting extraction of {self.total_users} users...\n")
+        while in_flight < self.concurrency.limit:
+            if self._retry_pages:
+                size, page = self.batch_size, self._retry_pages.pop(0)
+            else:
+                size = self.scheduler.next_batch_size(self._collected_count())
+                if size == 0:
+                    return
+                page = None
+                if self.seed is not None:
+                    page = self._next_page
+                    self._next_page += 1
+
+            self.scheduler.on_launch(size)
+            in_flight += 1
+            yield size, page
+
+    def _on_request_failed(self, page: int, error: Exception):
+        if isinstance(error, CacheMissError):
+            raise error
+        print(f"\nError processing a batch: {error}")
+        if page is not None:
+            # A seeded page must eventually be collected, so a page that keeps failing would stall the run.
+            failures = self._page_failures[page] = self._page_failures.get(page, 0) + 1
+            if failures > self.max_retries:
+                raise Exception(f"Giving up on page {page} after {failures} failed attempts: {error}") from error
+            self._retry_pages.append(page)
+
+    def _prepare_run(self, resume: bool):
+        """
+        Set up the scheduler, response cache and streaming outputs, and start (or restore) the checkpoint.
+        When resuming, the saved batches are replayed so only the remaining users are fetched.
+        """
+        if resume:
+            if self.checkpoints is None or not self.checkpoints.exists():
+                raise FileNotFoundError(f"No checkpoint to resume from in {self.run_dir}")
+            manifest = self.checkpoints.load_manifest()
+            self.total_users = manifest["total_users"]
+            self.batch_size = manifest["batch_size"]
+            self.seed = manifest.get("seed")
+
+        self.scheduler = BatchScheduler(self.total_users, self.batch_size, fixed_size=self.seed is not None)
+
+        if self.seed is not None and self.cache_dir is not None:
+            self.cache = ResponseCache(self.cache_dir, key=self.encryption_key, max_bytes=self.cache_max_bytes)
+        elif self.cache_dir is not None:
+            print("Response cache ignored: only seeded requests are reproducible and can be cached.")
+
+        if self.offline and self.cache is None:
+            raise ValueError("Offline mode needs a seed and a cache directory.")
+
+        if self.columnar and not self.encryption_key:
+            raise ValueError("The columnar artifact is always encrypted and needs an encryption key.")
+
+        if self.on_batch is not None and not self.stream:
+            raise ValueError("Batch consumers need streaming mode (batches are handed over as they are written out).")
+
+        self._prepare_dedup()
+
+        if self.stream:
+            suffix = ".enc" if self.encryption_key else ""
+            self.valid_writer = StreamingCSVWriter(self.run_dir / "valid_users.csv.enc", key=self.encryption_key,
+                                                   compression_level=self.compression_level, index=True)
+            self.invalid_writer = StreamingCSVWriter(self.run_dir / f"invalid_users.csv{suffix}",
+                                                     key=self.encryption_key,
+                                                     compression_level=self.compression_level)
+            if self.columnar:
+                self.columnar_writer = self._open_columnar()
+
+        if self.checkpoints is None:
+            return
+
+        if resume:
+            for valid, invalid, page in self.checkpoints.iter_batches():
+                self._receive_batch(valid, invalid, page)
+            self._restore_pages()
+            print(f"Resumed from checkpoint: {manifest['completed_batches']} batch(es), "
+                  f"{min(self.valid_count, self.total_users)}/{self.total_users} valid users already fetched.")
+        else:
+            self.checkpoints.start({
+                "api_url": self.api_url,
+                "total_users": self.total_users,
+                "batch_size": self.batch_size,
+                "seed": self.seed,
+            })
+
+    def _prepare_dedup(self):
+        """Start the set of seen keys, from the dedup state file of earlier runs when there is one."""
+        self.duplicate_count = 0
+        if self.dedup is None:
+            self.seen = None
+        elif self.dedup_state is not None and self.dedup_state.exists():
+            self.seen = load_seen(self.dedup_state, key=self.encryption_key)
+            print(f"Dedup state loaded from {self.dedup_state}: {self.seen.describe()}")
+        else:
+            # The bloom filter is sized for this run (plus replacements) unless told otherwise.
+            capacity = self.dedup_capacity or max(2 * self.total_users, 1000)
+            self.seen = make_seen(self.dedup, capacity=capacity, error_rate=self.dedup_error_rate)
+
+    def _drop_duplicates(self, users: list) -> list:
+        """Keep the users whose dedup key has not been seen yet; users without the key are always kept."""
+        if self.seen is None:
+            return users
+
+        unique = []
+        for user in users:
+            key = key_of(user, self.dedup_key)
+            if key is None or self.seen.add(key):
+                unique.append(user)
+
+        self.duplicate_count += len(users) - len(unique)
+        metrics.USERS.labels(stage="extract", result="duplicate").inc(len(users) - len(unique))
+        return unique
+
+    def _restore_pages(self):
+        """After a resume, continue after the last saved page and refetch the pages that were in flight."""
+        if self.seed is None:
+            return
+        received = set(self._pending_pages) | set(range(1, self._next_page_to_collect))
+        last_page = max(received, default=0)
+        self._next_page = last_page + 1
+        self._retry_pages = [p for p in range(self._next_page_to_collect, last_page) if p not in received]
+
+    def _handle_batch(self, valid: list, invalid: list, page: int = None):
+        """Checkpoint a freshly fetched batch, then collect it."""
+        if self.checkpoints is not None:
+            self.checkpoints.save_batch(valid, invalid, page)
+        self._receive_batch(valid, invalid, page)
+
+    def _receive_batch(self, valid: list, invalid: list, page: int = None):
+        """Collect a batch. Seeded pages are collected in page order so re-runs produce the same output."""
+        if page is None:
+            self._collect_batch(valid, invalid)
+            return
+
+        self._pending_pages[page] = (valid, invalid)
+        self._pending_valid += len(valid)
+
+        while self._next_page_to_collect in self._pending_pages:
+            valid, invalid = self._pending_pages.pop(self._next_page_to_collect)
+            self._pending_valid -= len(valid)
+            self._next_page_to_collect += 1
+            # Pages past the one that completed the run are dropped, invalid users included.
+            if self.valid_count < self.total_users:
+                self._collect_batch(valid, invalid)
+
+    def _collect_batch(self, valid: list, invalid: list):
+        """
+        Store (or, in streaming mode, write out) the valid and invalid users of a finished batch.
+        Duplicates count as fetched but not accepted, so the scheduler requests replacements for them.
+        """
+        fetched = len(valid) + len(invalid)
+        valid = self._drop_duplicates(valid)
+        self.scheduler.observe(fetched, len(valid))
+
+        if self.stream:
+            valid = valid[: self.total_users - self.valid_count]
+            # Hand the batch over first: if the consumer fails, nothing of the batch has been written.
+            if self.on_batch is not None and valid:
+                self.on_batch(valid, self.valid_writer.prepare(valid))
+            self.valid_writer.write_users(valid)
+            self.invalid_writer.write_users(invalid)
+            self._write_columnar(valid)
+        else:
+            self.all_users.extend(valid)
+            self.invalid_users.extend(invalid)
 
-        estimated_valid_per_batch = int(self.batch_size * 0.85)
-        if estimated_valid_per_batch == 0:
-            estimated_valid_per_batch = 1
+        for user in invalid:
+            self.invalid_fields[self.validator.first_invalid_field(user)] += 1
 
-        estimated_batches_needed = (self.total_users + estimated_valid_per_batch - 1) // estimated_valid_per_batch
+        metrics.USERS.labels(stage="extract", result="valid").inc(len(valid))
+        metrics.USERS.labels(stage="extract", result="invalid").inc(len(invalid))
 
-        initial_workers_to_launch = min(estimated_batches_needed, self.max_workers)
+        self.valid_count += len(valid)
+        self.invalid_count += len(invalid)
 
-        print(
-            f"Estimated batches: {estimated_batches_needed}. Launching {initial_workers_to_launch} initial worker(s)...")
+    def _open_columnar(self):
+        from src.utils.columnar import ColumnarWriter
+        return ColumnarWriter(self.run_dir / "valid_users.arrow.enc", key=self.encryption_key)
 
-        futures = set()
+    def _write_columnar(self, users: list):
+        """Append users to the optional Arrow artifact (the CSV stays authoritative, so a failure only drops it)."""
+        if self.columnar_writer is None:
+            return
+        try:
+            self.columnar_writer.write_users(users)
+        except (ValueError, TypeError) as e:
+            print(f"\nColumnar artifact skipped: {e}")
+            self.columnar_writer.abort()
+            self.columnar_writer = None
+
+    @metrics.timed_stage("extract")
+    def extract(self, resume: bool = False) -> Path:
+        """
+        Starts the multi-threaded extraction process, collects users, and saves them to an encrypted CSV.
+        :param resume: Continue an interrupted run from the checkpoint in the run directory.
+        :return: Path to the saved valid users CSV file.
+        """
+        self._prepare_run(resume)
+        print(f"\nStarting extraction of {self.total_users} users...\n")
+
+        self.concurrency = AIMDController(maximum=self.max_workers, initial=self.initial_concurrency,
+                                          latency_target=self.latency_target)
+        self._report_plan(self.concurrency.limit)
+
+        futures = {}
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            for _ in range(initial_workers_to_launch):
-                futures.add(executor.submit(self._fetch_batch))
+            for size, page in self._next_requests(len(futures)):
+                futures[executor.submit(self._fetch_batch, size, page)] = (size, page)
 
             while futures:
                 done_iter = concurrent.futures.as_completed(futures)
@@ -116,35 +516,127 @@ class Extractor:
                 except StopIteration:
                     break
 
+                size, page = futures.pop(future)
+                self.scheduler.on_finished(size)
+
+                # Only fetch errors are request failures; errors collecting the batch (writing it out,
+                # checkpointing it, a failed batch consumer) abort the run instead of refetching.
                 try:
                     valid, invalid = future.result()
-                    self.all_users.extend(valid)
-                    self.invalid_users.extend(invalid)
                 except Exception as e:
-                    print(f"\nError processing a batch: {e}")
-
-                futures.remove(future)
+                    self._on_request_failed(page, e)
+                else:
+                    self._handle_batch(valid, invalid, page)
 
-                current_count = min(len(self.all_users), self.total_users)
+                current_count = min(self.valid_count, self.total_users)
                 _print_progress(current_count, self.total_users)
 
-                if len(self.all_users) < self.total_users:
-                    futures.add(executor.submit(self._fetch_batch))
+                for size, page in self._next_requests(len(futures)):
+                    futures[executor.submit(self._fetch_batch, size, page)] = (size, page)
 
-        if len(self.all_users) > self.total_users:
-            self.all_users = self.all_users[: self.total_users]
+        return self._save_results()
 
-        print("\n\nExtraction completed.")
-        print(f"Valid users: {len(self.all_users)}")
-        print(f"Invalid users: {len(self.invalid_users)}")
+    @metrics.timed_stage("extract")
+    def extract_async(self, resume: bool = False) -> Path:
+        """
+        Same as extract(), but drives up to max_in_flight requests from a single event loop
+        over one pooled aiohttp session (keep-alive connections, no per-batch TLS handshake).
+        :param resume: Continue an interrupted run from the checkpoint in the run directory.
+        :return: Path to the saved valid users CSV file.
+        """
+        return asyncio.run(self._extract_async(resume))
 
+    async def _extract_async(self, resume: bool) -> Path:
+        import aiohttp
+
+        self._prepare_run(resume)
+        print(f"\nStarting async extraction of {self.total_users} users...\n")
+
+        self.concurrency = AIMDController(maximum=self.max_in_flight, initial=self.initial_concurrency,
+                                          latency_target=self.latency_target)
+        self._report_plan(self.concurrency.limit)
+
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+        timeout = aiohttp.ClientTimeout(total=15)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            tasks = {}
+            for size, page in self._next_requests(len(tasks)):
+                tasks[asyncio.create_task(self._fetch_batch_async(session, size, page))] = (size, page)
+
+            while tasks:
+                done, _ = await asyncio.wait(tasks.keys(), return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    size, page = tasks.pop(task)
+                    self.scheduler.on_finished(size)
+
+                    try:
+                        valid, invalid = task.result()
+                    except Exception as e:
+                        self._on_request_failed(page, e)
+                    else:
+                        self._handle_batch(valid, invalid, page)
+
+                    current_count = min(self.valid_count, self.total_users)
+                    _print_progress(current_count, self.total_users)
+
+                    for size, page in self._next_requests(len(tasks)):
+                        tasks[asyncio.create_task(self._fetch_batch_async(session, size, page))] = (size, page)
+
+        return self._save_results()
+
+    def _save_results(self) -> Path:
+        """Trim the collected users to the requested amount and save them (or close the streaming outputs)."""
         csv_output_path = self.run_dir / "valid_users.csv.enc"
 
-        CSVHelper.save_to_csv(
-            self.all_users,
-            self.invalid_users,
-            output_path=csv_output_path,
-            key=self.encryption_key
-        )
+        if not self.stream and len(self.all_users) > self.total_users:
+            self.all_users = self.all_users[: self.total_users]
+            self.valid_count = len(self.all_users)
 
-        return csv_output_path
\ No newline at end of file
+        print("\n\nExtraction completed.")
+        print(f"Valid users: {self.valid_count}")
+        print(f"Invalid users: {self.invalid_count}")
+        if self.invalid_fields:
+            reasons = ", ".join(f"{field}: {count}" for field, count in self.invalid_fields.most_common(5))
+            print(f"Most common null/empty fields: {reasons}")
+        if self.seen is not None:
+            print(f"Duplicate users dropped: {self.duplicate_count} (on {'.'.join(self.dedup_key)}, "
+                  f"{self.seen.describe()})")
+        print(f"Surplus valid users discarded: {max(self.scheduler.accepted - self.total_users, 0)}")
+        if self.cache is not None:
+            print(f"Response cache: {self.cache.hits} hit(s), {self.cache.misses} miss(es)")
+        print(f"Final concurrency limit: {self.concurrency.limit}")
+
+        if self.stream:
+            self.valid_writer.close()
+            self.invalid_writer.close()
+            print(f"Users CSV saved at {csv_output_path}")
+            if self.invalid_writer.count:
+                print(f"Invalid users CSV saved at {self.invalid_writer.output_path}")
+        else:
+            CSVHelper.save_to_csv(
+                self.all_users,
+                self.invalid_users,
+                output_path=csv_output_path,
+                key=self.encryption_key,
+                compression_level=self.compression_level,
+                index=True
+            )
+            if self.columnar:
+                self.columnar_writer = self._open_columnar()
+                for start in range(0, len(self.all_users), self.batch_size):
+                    self._write_columnar(self.all_users[start: start + self.batch_size])
+
+        if self.columnar_writer is not None:
+            self.columnar_writer.close()
+            print(f"Columnar users artifact saved at {self.columnar_writer.output_path}")
+
+        if self.seen is not None and self.dedup_state is not None:
+            save_seen(self.seen, self.dedup_state, key=self.encryption_key)
+            print(f"Dedup state saved at {self.dedup_state}")
+
+        if self.checkpoints is not None:
+            self.checkpoints.clear()
+
+        return csv_output_path
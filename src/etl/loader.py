@@ -2,6 +2,10 @@ import json
 from pathlib import Path
 import webbrowser
 from datetime import datetime
+from src.utils.user_record import as_dicts
+from src.utils.stats_state import STATE_FILE
+from src.utils.validation_report import REPORT_FILE
+from src.utils import metrics
 
 class Loader:
     """
@@ -15,18 +19,39 @@ class Loader:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.template_path = Path(__file__).parent / ".." / "web" / "templates" / "dashboard_template.html"
 
-    def save_stats_and_dashboard(self, users_processed: list, stats: dict):
-        """Save statistics to JSON and generate HTML dashboard."""
+    @metrics.timed_stage("load")
+    def save_stats_and_dashboard(self, users_processed: list, stats: dict, state=None, key: bytes = None):
+        """Save processed users and statistics to JSON and generate HTML dashboard."""
         processed_json_path = self.output_dir / "processed_users.json"
         with open(processed_json_path, "w", encoding="utf-8") as f:
-            json.dump(users_processed, f, indent=4)
+            json.dump(as_dicts(users_processed), f, indent=4)
         print(f"Processed users saved to: {processed_json_path}")
 
+        self.save_stats(stats, state, key)
+        self.save_dashboard(stats)
+
+    def save_stats(self, stats: dict, state=None, key: bytes = None):
+        """Save statistics.json and, when given, the mergeable RunStatsState behind it (encrypted with key)."""
         stats_json_path = self.output_dir / "statistics.json"
         with open(stats_json_path, "w", encoding="utf-8") as f:
             json.dump(stats, f, indent=4)
         print(f"Stats saved: {stats_json_path}")
 
+        if state is not None:
+            if not key:
+                raise ValueError("The stats state holds every password and is only saved encrypted: pass the key")
+            state_path = self.output_dir / STATE_FILE
+            state.save(state_path, key)
+            print(f"Stats state saved: {state_path}")
+
+    def save_validation_report(self, report):
+        """Write the ValidationReport of the run as validation_report.ndjson."""
+        report_path = self.output_dir / REPORT_FILE
+        report.write(report_path)
+        print(f"Validation report saved: {report_path} ({len(report)} violations)")
+
+    def save_dashboard(self, stats: dict):
+        """Generate dashboard.html from the template and open it."""
         dashboard_path = self.output_dir / "dashboard.html"
 
         if not self.template_path.exists():
@@ -129,6 +154,8 @@ class Loader:
         """
 
         country_data = stats.get("users_per_country", {})
+        country_bound = stats.get("approximation", {}).get("users_per_country")
+        country_label = f"Estimated User Count (max overcount {country_bound['max_overcount']})" if country_bound else "User Count"
         top_10 = sorted(country_data.items(), key=lambda x: x[1], reverse=True)[:10]
         country_labels = [c[0] for c in top_10]
         country_values = [c[1] for c in top_10]
@@ -140,7 +167,7 @@ class Loader:
                 data: {{
                     labels: {json.dumps(country_labels)},
                     datasets: [{{
-                        label: 'User Count',
+                        label: {json.dumps(country_label)},
                         data: {json.dumps(country_values)},
                         backgroundColor: '{blue_main}',
                         borderRadius: 6,
@@ -335,7 +362,20 @@ class Loader:
             html_content = html_content.replace("{{TOTAL_USERS}}", str(stats.get("total_users", "N/A")))
             html_content = html_content.replace("{{AVG_AGE}}", str(stats.get("average_age", "N/A")))
             html_content = html_content.replace("{{MOST_FREQUENT_GENDER}}", str(stats.get("most_frequent_gender", "N/A")))
-            html_content = html_content.replace("{{DIFFERENT_COUNTRIES}}", str(stats.get("different_countries", "N/A")))
+            approximation = stats.get("approximation", {})
+            different_countries = str(stats.get("different_countries", "N/A"))
+            if "different_countries" in approximation:
+                relative_error = approximation["different_countries"]["relative_error"]
+                different_countries = f"≈ {different_countries} <small>(±{relative_error * 100:.1f}%)</small>"
+            html_content = html_content.replace("{{DIFFERENT_COUNTRIES}}", different_countries)
+
+            validation = stats.get("validation")
+            if validation:
+                by_rule = ", ".join(f"{rule.replace('_', ' ')}: {count}" for rule, count in validation["by_rule"].items())
+                flagged = f"{validation['records_flagged']}<br><small>{by_rule or 'no violations'}</small>"
+            else:
+                flagged = "N/A"
+            html_content = html_content.replace("{{FLAGGED_RECORDS}}", flagged)
             html_content = html_content.replace("{{TIMESTAMP}}", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
             pass_len_stats = stats.get("password_length_stats", {})
@@ -361,12 +401,15 @@ class Loader:
             html_content = html_content.replace("{{MOST_SECURE_PASSWORD}}", str(stats.get("most_secure_password", "N/A")))
 
             top_pass_list = stats.get("password_pattern_stats", [])
+            pattern_bound = approximation.get("password_pattern_stats")
             if top_pass_list:
                 top = top_pass_list[:10]
                 rows = ""
                 for i, item in enumerate(top, 1):
                     pwd = item.get("password", "")
                     cnt = item.get("count", 0)
+                    if "error" in item:
+                        cnt = f"≤ {cnt} <small>(≥ {cnt - item['error']})</small>"
                     rows += f"""
                         <tr>
                             <td class="t-idx">{i}</td>
@@ -384,6 +427,7 @@ class Loader:
                                 {rows}
                             </tbody>
                         </table>
+                        {f'<p><small>Space-Saving estimates: each count is at most {pattern_bound["max_overcount"]} above the true count; ~{pattern_bound["distinct_estimate"]} distinct passwords (±{pattern_bound["relative_error"] * 100:.1f}%).</small></p>' if pattern_bound else ''}
                     </div>
                 """
             else:
@@ -393,7 +437,9 @@ class Loader:
 
             html_content = html_content.replace("{{VALID_CSV_PATH}}", "valid_users.csv.enc")
             html_content = html_content.replace("{{INVALID_CSV_PATH}}", "invalid_users.csv.enc")
+            html_content = html_content.replace("{{VALID_INDEX_PATH}}", "valid_users.csv.idx")
             html_content = html_content.replace("{{STATS_JSON_PATH}}", "statistics.json")
+            html_content = html_content.replace("{{VALIDATION_REPORT_PATH}}", REPORT_FILE)
 
             chart_script = self._create_chart_js_script(stats)
             html_content = html_content.replace("{{CHART_JS_SCRIPT}}", chart_script)
@@ -1,19 +1,122 @@
 import os
 import sys
-from extractor import Extractor
-from transformer import Transformer
-from src.utils.passwordauditor import PasswordAuditor
-from loader import Loader
+import time
+import queue
+import argparse
+import threading
 from datetime import datetime
 from pathlib import Path
 
+# Allow running as a script (python src/etl/pipeline.py) as well as a module.
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src.etl.extractor import Extractor
+from src.etl.transformer import Transformer
+from src.etl.loader import Loader
+from src.utils.passwordauditor import PasswordAuditor, make_audit_accumulator
+from src.utils.stats_accumulator import make_stats_accumulator
+from src.utils.stats_state import RunStatsState
+from src.utils.user_record import RecordLayout
+from src.utils.validation_report import ValidationReport
+from src.utils.validator import Validator
+from src.utils import metrics
+
+
+class StreamingTransform:
+    """
+    Transform side of the pipelined mode, fed by the Extractor while it is still fetching:
+    - batches go through a bounded queue to one worker thread; a full queue blocks the extractor (backpressure)
+    - each user becomes the UserRecord a round trip through the CSV artifact would give, so validation,
+      statistics and the audit see exactly what run_transform_load.py would read back
+    - valid records are counted into the stats and audit accumulators batch by batch
+    """
+
+    def __init__(self, queue_size: int = 8, approximate: dict = None):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.users = []
+        self.invalid_users = []
+        self.report = ValidationReport()
+        self.stats = make_stats_accumulator(approximate)
+        self.audit = make_audit_accumulator(approximate)
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.error = None
+        self._layouts = {}
+        self._thread = threading.Thread(target=self._run, name="streaming-transform", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def submit(self, users: list, codec):
+        """Queue a batch of user dicts, about to be written to the CSV with `codec` (waits while the queue is full)."""
+        if self.error is not None:
+            raise RuntimeError("Streaming transform failed") from self.error
+        start = time.perf_counter()
+        self.queue.put((users, codec))
+        self.blocked_seconds += time.perf_counter() - start
+
+    def close(self):
+        """Wait for the queued batches to be processed; re-raises a failure of the worker."""
+        self.queue.put(None)
+        self._thread.join()
+        if self.error is not None:
+            raise RuntimeError("Streaming transform failed") from self.error
+        metrics.USERS.labels(stage="validate", result="valid").inc(len(self.users))
+        metrics.USERS.labels(stage="validate", result="invalid").inc(len(self.invalid_users))
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if self.error is not None:
+                continue  # keep draining so the extractor is never blocked on a dead consumer
+            start = time.thread_time()  # CPU time: waits for the GIL held by the extractor don't count
+            try:
+                self._process(*item)
+            except Exception as e:
+                self.error = e
+            self.busy_seconds += time.thread_time() - start
+
+    def _process(self, users: list, codec):
+        layout = self._layouts.get(id(codec))
+        if layout is None:
+            layout = self._layouts[id(codec)] = RecordLayout(codec.fieldnames)
+
+        valid = []
+        position = len(self.users) + len(self.invalid_users)
+        for user in users:
+            position += 1
+            # The cells as csv.writer stores them: None -> "", everything else str().
+            record = layout.decode(["" if value is None else str(value) for value in codec.encode(user)])
+            fields = Validator.strange_fields(record)
+            if fields:
+                self.report.add(position, fields)
+                self.invalid_users.append(record)
+            else:
+                valid.append(record)
+
+        self.stats.update(valid)
+        self.audit.update(valid)
+        self.users.extend(valid)
+
 
 class ETLPipeline:
-    """Coordinates the ETL process: Extract, Transform, Load"""
-    def __init__(self, api_url: str, n_users: int, base_output_dir: str = "output", max_workers: int = 10):
+    """
+    Coordinates the ETL process: Extract, Transform, Load
+    - sequential: extract everything to the encrypted CSV, read it back, then transform and load
+    - pipelined: extracted batches flow through StreamingTransform while extraction continues; the
+      encrypted CSV is still written as a side output, and the results are the same as sequential
+    """
+    def __init__(self, api_url: str, n_users: int, base_output_dir: str = "output", max_workers: int = 10,
+                 pipelined: bool = False, queue_size: int = 8, seed: str = None, approximate: dict = None):
         self.api_url = api_url
         self.n_users = n_users
         self.max_workers = max_workers
+        self.pipelined = pipelined
+        self.queue_size = queue_size
+        self.seed = seed
+        self.approximate = approximate
         self.base_output_dir = Path(base_output_dir)
         self.timestamp = datetime.now().strftime("%Y_%m_%d_%H-%M-%S")
         self.run_dir = self.base_output_dir / self.timestamp
@@ -31,38 +134,106 @@ class ETLPipeline:
         print("=================================")
         print("        ETL SYSTEM START         ")
         print("=================================")
-        print(f"Extracting {self.n_users} users from API...")
+        print(f"Extracting {self.n_users} users from API{' (pipelined)' if self.pipelined else ''}...")
         print("---------------------------------")
 
-        extractor = Extractor(
+        start = time.perf_counter()
+        if self.pipelined:
+            users_processed, stats, state, report = self._run_pipelined()
+        else:
+            users_processed, stats, state, report = self._run_sequential()
+
+        load_start = time.perf_counter()
+        loader = Loader(source=users_processed, output_dir=self.run_dir)
+        loader.save_validation_report(report)
+        loader.save_stats_and_dashboard(users_processed, stats, state=state, key=self.encryption_key)
+        self.load_seconds = time.perf_counter() - load_start
+        self.wall_seconds = time.perf_counter() - start
+
+        print("\n=================================")
+        print("     ETL PROCESS COMPLETED       ")
+        print("=================================")
+        print(f"Total valid users saved: {len(users_processed)}")
+        print(f"Output folder: {self.run_dir.resolve()}")
+        print(f"Extract: {self.extract_seconds:.2f}s, transform: {self.transform_seconds:.2f}s, "
+              f"load: {self.load_seconds:.2f}s, wall: {self.wall_seconds:.2f}s")
+
+    def _extractor(self, **options) -> Extractor:
+        return Extractor(
             self.api_url,
             self.n_users,
             output_dir=self.run_dir,
             max_workers=self.max_workers,
-            encryption_key=self.encryption_key
+            encryption_key=self.encryption_key,
+            seed=self.seed,
+            **options
         )
 
-        encrypted_csv_path = extractor.extract()
+    def _run_sequential(self) -> tuple:
+        start = time.perf_counter()
+        encrypted_csv_path = self._extractor().extract()
+        self.extract_seconds = time.perf_counter() - start
 
+        start = time.perf_counter()
         transformer = Transformer(
             users_input=encrypted_csv_path,
-            encryption_key=self.encryption_key
+            encryption_key=self.encryption_key,
+            approximate=self.approximate
         )
 
         transformer.validate_data()
-        stats = transformer.generate_stats()
+        transformer.generate_stats()
         users_processed = transformer.get_users()
 
-        auditor = PasswordAuditor(users_processed)
-        password_stats = auditor.generate_all_stats()
+        auditor = PasswordAuditor(users_processed, approximate=self.approximate)
+        auditor.generate_all_stats()
 
-        stats.update(password_stats)
+        state = RunStatsState(transformer.stats_state, auditor.audit_state, runs=[str(self.run_dir)],
+                              validation=transformer.validation_report.summary())
+        stats = state.finalize()
+        self.transform_seconds = time.perf_counter() - start
+        return users_processed, stats, state, transformer.validation_report
 
-        loader = Loader(source=users_processed, output_dir=self.run_dir)
-        loader.save_stats_and_dashboard(users_processed, stats)
+    def _run_pipelined(self) -> tuple:
+        transform = StreamingTransform(self.queue_size, self.approximate)
+        extractor = self._extractor(
+            stream=True,
+            # The transform keeps every valid user anyway, so exact dedup costs little here and drops the
+            # same users as the sequential mode (a bloom filter could differ by its false positives).
+            dedup="exact",
+            on_batch=transform.submit
+        )
 
-        print("\n=================================")
-        print("     ETL PROCESS COMPLETED       ")
-        print("=================================")
-        print(f"Total valid users saved: {len(users_processed)}")
-        print(f"Output folder: {self.run_dir.resolve()}")
\ No newline at end of file
+        start = time.perf_counter()
+        transform.start()
+        try:
+            extractor.extract()
+        finally:
+            transform.close()
+        self.extract_seconds = time.perf_counter() - start
+
+        print("Validating data integrity...")
+        transform.report.print_summary()
+        state = RunStatsState(transform.stats, transform.audit, runs=[str(self.run_dir)],
+                              validation=transform.report.summary())
+        stats = state.finalize()
+        self.transform_seconds = transform.busy_seconds
+        print(f"Pipelined transform: {transform.busy_seconds:.2f}s CPU, extractor waited "
+              f"{transform.blocked_seconds:.2f}s on a full queue")
+        return transform.users, stats, state, transform.report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the whole ETL in one process (local testing)")
+    parser.add_argument("users", type=int, help="Number of users to extract")
+    parser.add_argument("--api-url", default="https://randomuser.me/api/", help="RandomUser API endpoint")
+    parser.add_argument("--workers", type=int, default=10, help="Max concurrent extraction workers")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="Validate, compute statistics and audit batches while extraction continues")
+    parser.add_argument("--queue-size", type=int, default=8, help="Batches buffered between extract and transform")
+    parser.add_argument("--seed", default=None, help="Fetch reproducible pages for this seed")
+    parser.add_argument("--output-dir", default="output", help="Base output directory")
+    args = parser.parse_args()
+
+    ETLPipeline(args.api_url, args.users, base_output_dir=args.output_dir, max_workers=args.workers,
+                pipelined=args.pipelined, queue_size=args.queue_size, seed=args.seed).run()
@@ -0,0 +1,73 @@
+import math
+
+
+class BatchScheduler:
+    """
+    Decides whether another batch is needed and how many users to ask for.
+    - Counts the valid users expected from the requests already in flight
+    - Learns the valid ratio from finished batches instead of assuming a fixed 85%
+    - Sizes the last requests to the real remainder instead of always asking for batch_size
+    """
+
+    def __init__(self, total_users: int, batch_size: int, prior_ratio: float = 0.85, prior_weight: int = None,
+                 confidence: float = 2.0, fixed_size: bool = False):
+        """
+        :param prior_ratio: Valid ratio assumed before any batch has finished.
+        :param prior_weight: How many users the prior is worth (defaults to one batch).
+        :param confidence: Standard deviations of safety margin when sizing the remainder,
+                           so the last batch rarely falls short and needs yet another round trip.
+        :param fixed_size: Always request full batches (seeded pages are only reproducible at a fixed size).
+        """
+        self.total_users = total_users
+        self.batch_size = batch_size
+        self.prior_ratio = prior_ratio
+        self.prior_weight = prior_weight if prior_weight is not None else batch_size
+        self.confidence = confidence
+        self.fixed_size = fixed_size
+        self.fetched = 0
+        self.accepted = 0
+        self.requested_in_flight = 0
+
+    @property
+    def valid_ratio(self) -> float:
+        """Observed share of fetched users that end up accepted, smoothed with the prior."""
+        ratio = (self.accepted + self.prior_ratio * self.prior_weight) / (self.fetched + self.prior_weight)
+        return min(max(ratio, 0.01), 1.0)
+
+    def expected_in_flight(self) -> float:
+        """Valid users expected from the requests that have not finished yet."""
+        return self.requested_in_flight * self.valid_ratio
+
+    def shortfall(self, collected: int) -> float:
+        """Valid users still missing once everything in flight has arrived."""
+        return self.total_users - collected - self.expected_in_flight()
+
+    def estimated_batches(self, collected: int) -> int:
+        """Rough number of full batches still needed (for reporting)."""
+        per_batch = max(self.batch_size * self.valid_ratio, 1.0)
+        return math.ceil(max(self.shortfall(collected), 0) / per_batch)
+
+    def next_batch_size(self, collected: int) -> int:
+        """Number of users to request next, or 0 if the requests in flight are expected to be enough."""
+        missing = self.shortfall(collected)
+        if missing <= 0:
+            return 0
+        if self.fixed_size:
+            return self.batch_size
+
+        ratio = self.valid_ratio
+        margin = self.confidence * math.sqrt(missing * (1 - ratio))
+        size = math.ceil((missing + margin) / ratio)
+        return max(1, min(self.batch_size, size))
+
+    def on_launch(self, size: int):
+        self.requested_in_flight += size
+
+    def on_finished(self, size: int):
+        """A request finished (successfully or not) and no longer counts as in flight."""
+        self.requested_in_flight -= size
+
+    def observe(self, fetched: int, accepted: int):
+        """Record the outcome of a batch to refine the valid ratio."""
+        self.fetched += fetched
+        self.accepted += accepted
@@ -1,115 +1,120 @@
-import statistics
-from collections import Counter, defaultdict
 from src.utils.csv_helper import CSVHelper
 from src.utils.validator import Validator
+from src.utils.validation_report import ValidationReport
+from src.utils.user_record import as_records
+from src.utils.stats_accumulator import StatsAccumulator, make_stats_accumulator
+from src.utils.stats_state import RunStatsState
+from src.utils.sharding import run_shards
+from src.utils import metrics
 from pathlib import Path
-from datetime import datetime
 
 
 class Transformer:
     """
     Transformer class:
-      - Reads users from a CSV or a list of dictionaries
+      - Reads users from a CSV or a list of dictionaries, as compact UserRecords
       - Validates and cleans user data
       - Generates descriptive statistics
     """
-    def __init__(self, users_input, encryption_key: bytes = None):
+    STATS_BACKENDS = ("python", "numpy")
+
+    def __init__(self, users_input, encryption_key: bytes = None, load_workers: int = 1,
+                 stats_backend: str = "python", approximate: dict = None):
         """
-        Initializes the Transformer by loading users from CSV or a list.
+        Initializes the Transformer by loading users from CSV, an Arrow artifact (.arrow.enc) or a list.
+        load_workers > 1 loads a chunked encrypted CSV with that many processes.
+        stats_backend "numpy" computes the statistics over NumPy columns (needs numpy and pandas).
+        approximate ({"hll_error": ..., "topk_error": ...}) sketches the high-cardinality statistics.
         """
-        if isinstance(users_input, (str, Path)):
-            self.users = CSVHelper.load_csv(users_input, key=encryption_key)
+        if stats_backend not in self.STATS_BACKENDS:
+            raise ValueError(f"Unknown stats backend {stats_backend!r} (choose from {', '.join(self.STATS_BACKENDS)})")
+        self.stats_backend = stats_backend
+        self.approximate = approximate
+
+        if isinstance(users_input, (str, Path)) and str(users_input).endswith(".arrow.enc"):
+            from src.utils.columnar import load_columnar
+            with metrics.STAGE_DURATION.labels(stage="load_arrow").time():
+                self.users = load_columnar(users_input, key=encryption_key, records=True)
+        elif isinstance(users_input, (str, Path)):
+            with metrics.STAGE_DURATION.labels(stage="load_csv").time():
+                self.users = CSVHelper.load_csv(users_input, key=encryption_key, workers=load_workers,
+                                                records=True)
         else:
-            self.users = users_input
+            self.users = as_records(users_input)
 
         self.invalid_users = []
+        self.validation_report = ValidationReport()
+        self.stats_state = None
 
+    @metrics.timed_stage("validate")
     def validate_data(self):
-        """Detect fields containing strange or invisible characters."""
+        """
+        Detect fields containing strange or invisible characters.
+        Violations are collected in self.validation_report; only a summary is printed.
+        """
         print("Validating data integrity...")
         valid_users = []
 
         for idx, user in enumerate(self.users, start=1):
-            has_strange = False
-            for key, value in Validator.iterate_fields(user):
-                if isinstance(value, str) and Validator.contains_strange_characters(value):
-                    print(f"Strange character detected in user #{idx}, field '{key}': {value}")
-                    has_strange = True
-            if has_strange:
+            fields = Validator.strange_fields(user)
+            if fields:
+                self.validation_report.add(idx, fields)
                 self.invalid_users.append(user)
             else:
                 valid_users.append(user)
 
         self.users = valid_users
-        print(f"Validation complete. {len(self.invalid_users)} records flagged for review.")
-
-    def generate_stats(self) -> dict:
-        """Generate descriptive statistics for cleaned dataset."""
-        print("Generating statistics...")
-
-        ages = [int(user["dob"]["age"]) for user in self.users if "dob" in user and "age" in user["dob"]]
-        genders = [user["gender"] for user in self.users if "gender" in user]
-        countries = [user["location"]["country"] for user in self.users if "location" in user]
-        nationalities = [user["nat"] for user in self.users if "nat" in user]
-        email_domains = [user["email"].split("@")[-1] for user in self.users if "email" in user]
-        username_lengths = [len(user.get("login", {}).get("username", "")) for user in self.users]
-        passwords = [user.get("login", {}).get("password", "") for user in self.users]
+        metrics.USERS.labels(stage="validate", result="valid").inc(len(valid_users))
+        metrics.USERS.labels(stage="validate", result="invalid").inc(len(self.invalid_users))
+        self.validation_report.print_summary()
 
-        reg_years = defaultdict(int)
-        for user in self.users:
-            reg_date_str = user.get("registered", {}).get("date", "")
-            if reg_date_str:
-                try:
-                    reg_year = datetime.fromisoformat(reg_date_str.rstrip("Z")).year
-                    reg_years[str(reg_year)] += 1
-                except ValueError:
-                    continue
-
-        timezones = Counter(
-            user.get("location", {}).get("timezone", {}).get("offset")
-            for user in self.users
-            if user.get("location", {}).get("timezone", {}).get("offset")
-        )
+    @metrics.timed_stage("sharded")
+    def process_sharded(self, workers: int) -> RunStatsState:
+        """
+        validate_data, generate_stats and the password audit in one pass over shards of the users,
+        run by a process pool. Leaves the same users, invalid users and stats_state as the sequential
+        stages, and returns the merged RunStatsState (finalize() gives the combined stats dict).
+        """
+        print(f"Validating data integrity, generating statistics ({self.stats_backend} backend) "
+              f"and auditing passwords in {workers} processes...")
+        results = run_shards(self.users, workers, self.stats_backend, self.approximate)
 
-        age_decades = defaultdict(int)
-        for age in ages:
-            decade = (age // 10) * 10
-            age_decades[f"{decade}s"] += 1
+        invalid_positions = set()
+        state = None
+        for invalid, stats, audit in results:
+            for position, fields in invalid:
+                self.validation_report.add(position + 1, fields)
+                invalid_positions.add(position)
+            shard = RunStatsState(stats, audit)
+            state = shard if state is None else state.merge(shard)
 
-        password_lengths = [len(p) for p in passwords if p]
+        self.invalid_users = [user for position, user in enumerate(self.users) if position in invalid_positions]
+        self.users = [user for position, user in enumerate(self.users) if position not in invalid_positions]
+        self.stats_state = state.stats
+        state.validation = self.validation_report.summary()
+        metrics.USERS.labels(stage="validate", result="valid").inc(len(self.users))
+        metrics.USERS.labels(stage="validate", result="invalid").inc(len(self.invalid_users))
+        self.validation_report.print_summary()
+        return state
 
-        stats = {
-            "total_users": len(self.users),
-            "average_age": round(statistics.mean(ages), 2) if ages else 0.0,
-            "minimum_age": min(ages) if ages else 0,
-            "maximum_age": max(ages) if ages else 0,
-            "most_frequent_gender": Counter(genders).most_common(1)[0][0] if genders else None,
-            "gender_distribution": dict(Counter(genders)),
-            "different_countries": len(set(countries)),
-            "users_per_country": dict(Counter(countries)),
-            "nationality_distribution": dict(Counter(nationalities)),
-            "email_domain_distribution": dict(Counter(email_domains)),
-            "username_length_stats": {
-                "min": min(username_lengths) if username_lengths else 0,
-                "max": max(username_lengths) if username_lengths else 0,
-                "average": round(statistics.mean(username_lengths), 2) if username_lengths else 0.0,
-            },
-            "age_decade_distribution": dict(age_decades),
-            "password_length_stats": {
-                "min": min(password_lengths) if password_lengths else 0,
-                "max": max(password_lengths) if password_lengths else 0,
-                "average": round(statistics.mean(password_lengths), 2) if password_lengths else 0.0,
-                "distribution": dict(Counter(password_lengths)),
-                "short_percentage": round(
-                    sum(1 for l in password_lengths if l < 8) / len(password_lengths) * 100, 2
-                ) if password_lengths else 0.0,
-            },
-            "registration_by_year": dict(sorted(reg_years.items())),
-            "timezone_distribution": dict(timezones.most_common(10))
-        }
+    def accumulate_stats(self) -> StatsAccumulator:
+        """Mergeable statistics state (counts only) of the current users."""
+        if self.stats_backend == "numpy":
+            from src.utils.stats_numpy import vectorized_state
+            state = vectorized_state(self.users)
+            return make_stats_accumulator(self.approximate).merge(state) if self.approximate else state
+        return make_stats_accumulator(self.approximate).update(self.users)
 
-        return stats
+    @metrics.timed_stage("stats")
+    def generate_stats(self) -> dict:
+        """
+        Generate descriptive statistics for cleaned dataset (one pass, see StatsAccumulator).
+        The state behind them is kept in self.stats_state, to be saved and merged with other runs.
+        """
+        print(f"Generating statistics ({self.stats_backend} backend)...")
+        self.stats_state = self.accumulate_stats()
+        return self.stats_state.finalize()
 
     def get_users(self) -> list:
-        """Return validated user list."""
+        """Return validated user list (UserRecords)."""
         return self.users
\ No newline at end of file
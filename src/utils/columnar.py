@@ -0,0 +1,137 @@
+import io
+from datetime import datetime
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.compute as pc
+from src.utils.csv_helper import RowCodec
+from src.utils.encrypted_stream import EncryptedStreamWriter, EncryptedStreamReader
+from src.utils.user_record import RecordLayout
+
+# Flattened RandomUser columns that are not plain strings; every other column is stored as a string.
+TIMESTAMP = pa.timestamp("ms", tz="UTC")
+COLUMN_TYPES = {
+    "location.street.number": pa.int64(),
+    "location.coordinates.latitude": pa.float64(),
+    "location.coordinates.longitude": pa.float64(),
+    "dob.date": TIMESTAMP,
+    "dob.age": pa.int64(),
+    "registered.date": TIMESTAMP,
+    "registered.age": pa.int64(),
+}
+
+# Dates are handed back to the Transformer in the API's own ISO format.
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+_CONVERTERS = {
+    pa.int64(): int,
+    pa.float64(): float,
+    TIMESTAMP: _parse_date,
+}
+
+
+class ColumnarWriter:
+    """
+    Writes users as an Arrow IPC stream (zstd-compressed record batches) inside the encrypted chunked container.
+    - Ages and street numbers are int64, coordinates float64 and dates UTC timestamps, instead of CSV text
+    - Columns are taken from the first batch, like StreamingCSVWriter; each write_users call is one record batch
+    """
+
+    def __init__(self, output_path, key: bytes):
+        self.output_path = Path(output_path)
+        self.key = key
+        self.count = 0
+        self.codec = None
+        self.schema = None
+        self._sink = None
+        self._writer = None
+
+    def write_users(self, users: list):
+        """Convert a batch of users to typed columns and append it as one record batch."""
+        if not users:
+            return
+
+        if self.schema is None:
+            self.codec = RowCodec.from_users(users)
+            self.schema = pa.schema([(name, COLUMN_TYPES.get(name, pa.string())) for name in self.codec.fieldnames])
+            self._open()
+
+        encode = self.codec.encode
+        columns = []
+        for field, values in zip(self.schema, zip(*(encode(u) for u in users))):
+            convert = _CONVERTERS.get(field.type, str)
+            columns.append(pa.array([None if v is None else convert(v) for v in values], type=field.type))
+
+        self._writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=self.schema))
+        self.count += len(users)
+
+    def _open(self):
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._sink = EncryptedStreamWriter(self.output_path, self.key)
+        compression = "zstd" if pa.Codec.is_available("zstd") else None
+        self._writer = pa.ipc.new_stream(pa.PythonFile(self._sink, mode="w"), self.schema,
+                                         options=pa.ipc.IpcWriteOptions(compression=compression))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+
+    def abort(self):
+        """Drop an incomplete artifact (e.g. a value that cannot be converted to its column type)."""
+        if self._sink is not None:
+            self._sink.abort()
+        self.output_path.unlink(missing_ok=True)
+
+
+def _column_tree(names: list) -> list:
+    """Nest flattened column names into [(key, column index | subtree), ...], keeping the original key order."""
+    tree = []
+    subtrees = {}
+    for index, name in enumerate(names):
+        node, parent = tree, ()
+        *parents, leaf = name.split(".")
+        for part in parents:
+            parent += (part,)
+            if parent not in subtrees:
+                subtrees[parent] = []
+                node.append((part, subtrees[parent]))
+            node = subtrees[parent]
+        node.append((leaf, index))
+    return tree
+
+
+def _build_rows(tree: list, columns: list) -> list:
+    """Assemble one nested dict per row, a whole column (or sub-dict column) at a time."""
+    keys = [key for key, _ in tree]
+    values = [columns[child] if isinstance(child, int) else _build_rows(child, columns) for _, child in tree]
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+def load_columnar(path, key: bytes, records: bool = False) -> list:
+    """
+    Load users from an encrypted Arrow artifact, one record batch at a time, keeping the column types.
+    Nested dicts are assembled column-wise from a tree built once per file, instead of splitting
+    every column name for every row.
+    :param records: Return UserRecords (dates stay datetimes) instead of nested dicts
+    :return: list of nested user dicts (dates as ISO strings, ages as ints, coordinates as floats)
+    """
+    users = []
+    # BufferedReader turns the per-chunk short reads of the raw stream into the exact reads pyarrow expects.
+    with io.BufferedReader(EncryptedStreamReader(path, key)) as stream:
+        reader = pa.ipc.open_stream(pa.PythonFile(stream, mode="r"))
+        tree = _column_tree(reader.schema.names)
+        layout = RecordLayout(reader.schema.names) if records else None
+
+        for batch in reader:
+            columns = []
+            for field, column in zip(batch.schema, batch.columns):
+                if field.type == TIMESTAMP and not records:
+                    column = pc.strftime(column, format=DATE_FORMAT)
+                columns.append(column.to_pylist())
+            users.extend(map(layout.decode, zip(*columns)) if records else _build_rows(tree, columns))
+    return users
@@ -1,7 +1,16 @@
 import csv
+from operator import itemgetter
 from pathlib import Path
 import io
 from cryptography.fernet import Fernet
+from src.utils.encrypted_stream import (EncryptedStreamWriter, EncryptedStreamReader, IntegrityError, is_chunked_file,
+                                        DEFAULT_COMPRESSION_LEVEL)
+from src.utils.user_record import RecordLayout
+
+# Users flattened and encoded at a time by save_to_csv.
+WRITE_SLICE = 1000
+
+_DICT_TYPE = frozenset([dict])
 
 
 class CSVHelper:
@@ -33,40 +42,63 @@ class CSVHelper:
         return result
 
     @staticmethod
-    def load_csv(csv_path, key: bytes = None):
+    def iter_csv(csv_path, key: bytes = None, records: bool = False):
+        """
+        Yield users from CSV one at a time, decrypting chunked files as they are read.
+        Legacy single-token files are decrypted in one go.
+        :param csv_path: Path to the CSV file (can be .csv or .csv.enc)
+        :param key: Fernet encryption key (optional)
+        :param records: Yield UserRecords instead of nested dicts
+        """
+        csv_path = Path(csv_path)
+
+        if key and is_chunked_file(csv_path):
+            f = io.TextIOWrapper(EncryptedStreamReader(csv_path, key), encoding="utf-8", newline="")
+        elif key:
+            fernet = Fernet(key)
+            with open(csv_path, "rb") as enc:
+                decrypted_data = fernet.decrypt(enc.read()).decode('utf-8')
+            f = io.StringIO(decrypted_data)
+        else:
+            f = open(csv_path, "r", encoding="utf-8", newline="")
+
+        with f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+
+            codec = RecordLayout(header) if records else RowCodec.from_fieldnames(header)
+            for row in reader:
+                if row:
+                    yield codec.decode(row)
+
+    @staticmethod
+    def load_csv(csv_path, key: bytes = None, workers: int = 1, records: bool = False):
         """
         Load users from CSV. If a key is provided, decrypts the file first.
         :param csv_path: Path to the CSV file (can be .csv or .csv.enc)
         :param key: Fernet encryption key (optional)
-        :return: list of user dicts
+        :param workers: Processes used to decrypt and parse record-aligned chunked files (others load sequentially)
+        :param records: Return UserRecords instead of nested dicts
+        :return: list of user dicts (or UserRecords)
         """
         csv_path = Path(csv_path)
         if not csv_path.exists():
             print(f"CSV file not found: {csv_path}")
             return []
 
-        users = []
-
         try:
-            if key:
-                fernet = Fernet(key)
-                with open(csv_path, "rb") as f:
-                    encrypted_data = f.read()
-
-                decrypted_data = fernet.decrypt(encrypted_data).decode('utf-8')
+            if workers > 1 and key:
+                from src.utils.parallel_loader import can_load_in_parallel, load_csv_parallel
+                if can_load_in_parallel(csv_path, key):
+                    return load_csv_parallel(csv_path, key, workers, records=records)
 
-                buffer = io.StringIO(decrypted_data)
-                reader = csv.DictReader(buffer)
-                for row in reader:
-                    user = CSVHelper.unflatten_dict(row)
-                    users.append(user)
+            users = list(CSVHelper.iter_csv(csv_path, key=key, records=records))
 
-            else:
-                with open(csv_path, "r", encoding="utf-8") as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        user = CSVHelper.unflatten_dict(row)
-                        users.append(user)
+        except IntegrityError as e:
+            print(f"Error loading CSV {csv_path}: {e}")
+            return []
 
         except Exception as e:
             print(f"Error loading CSV {csv_path}: {e}")
@@ -77,48 +109,307 @@ class CSVHelper:
         return users
 
     @staticmethod
-    def save_to_csv(users, invalid_users, output_path=None, key: bytes = None):
-        """Saves a list of user dictionaries to an encrypted CSV file."""
+    def collect_fieldnames(users) -> list:
+        """Union of the flattened column names of all users, in first-appearance order."""
+        return RowCodec.from_users(users).fieldnames
+
+    @staticmethod
+    def save_to_csv(users, invalid_users, output_path=None, key: bytes = None, compression_level: int = None,
+                    index: bool = False):
+        """
+        Saves a list of user dictionaries to an encrypted CSV file (chunked container, written in slices).
+        :param compression_level: zstd level applied before encryption (None: uncompressed). Needs a key.
+        :param index: Also write a record index for the valid users file (see record_index.ArtifactReader).
+        """
         if output_path is None:
             raise ValueError("No output path")
 
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        def write_csv(file_path, data, encryption_key):
+        def write_csv(file_path, data, encryption_key, with_index=False):
             if not data:
                 return
 
-            flattened = [CSVHelper.flatten_dict(u) for u in data]
+            writer = StreamingCSVWriter(file_path, key=encryption_key, codec=RowCodec.from_users(data),
+                                        compression_level=compression_level, index=with_index)
+            for start in range(0, len(data), WRITE_SLICE):
+                writer.write_users(data[start: start + WRITE_SLICE])
+            writer.close()
 
-            fieldnames = []
-            for u in flattened:
-                for k in u.keys():
-                    if k not in fieldnames:
-                        fieldnames.append(k)
-
-            buffer = io.StringIO()
-            writer = csv.DictWriter(buffer, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(flattened)
-
-            csv_data_str = buffer.getvalue()
-            buffer.close()
-
-            if encryption_key:
-                fernet = Fernet(encryption_key)
-                encrypted_data = fernet.encrypt(csv_data_str.encode('utf-8'))
-                with open(file_path, "wb") as f:
-                    f.write(encrypted_data)
-            else:
-                with open(file_path, "w", newline="", encoding="utf-8") as f:
-                    f.write(csv_data_str)
-
-        write_csv(output_path, users, key)
+        write_csv(output_path, users, key, with_index=index)
         print(f"Users CSV saved at {output_path}")
 
         if invalid_users:
             suffix = ".enc" if key else ""
             invalid_path = output_path.parent / f"invalid_users.csv{suffix}"
             write_csv(invalid_path, invalid_users, key)
-            print(f"Invalid users CSV saved at {invalid_path}")
\ No newline at end of file
+            print(f"Invalid users CSV saved at {invalid_path}")
+
+
+class RowCodec:
+    """
+    Converts between nested user dicts and CSV rows by column position.
+    - The column layout (split key paths and the nesting tree) is derived once per file, not per row and cell
+    - encode() reads every column straight from the nested record, without building a flattened dict
+    - decode() rebuilds the nesting from the precomputed tree, without splitting keys or probing dicts
+    - encode() warns once per field that is not in the layout (it has no column to go to)
+    Output is identical to flatten_dict + csv.DictWriter and csv.DictReader + unflatten_dict.
+    """
+
+    def __init__(self, paths, sep="."):
+        self.paths = [tuple(path) for path in paths]
+        self.sep = sep
+        self.fieldnames = [sep.join(map(str, path)) for path in self.paths]
+        self.known = {path[:depth] for path in self.paths for depth in range(1, len(path) + 1)}
+        self.unknown = set()
+        self.tree = self._build_tree()
+        self.runs, self.node_sizes = self._build_runs()
+        self.run_keys = sum(size for _, _, size in self.runs)
+
+    @classmethod
+    def from_fieldnames(cls, fieldnames, sep=".") -> "RowCodec":
+        """Layout of an existing CSV header."""
+        return cls([name.split(sep) for name in fieldnames], sep=sep)
+
+    @classmethod
+    def from_users(cls, users, sep=".") -> "RowCodec":
+        """Union of the leaf key paths of all users, in first-appearance order (the order flatten_dict yields)."""
+        paths = {}
+        # prefix -> (leaf keys seen, child key -> child prefix), so known fields cost no allocation
+        layout = {(): (set(), {})}
+
+        def walk(d, prefix):
+            leaves, children = layout[prefix]
+            for k, v in d.items():
+                if isinstance(v, dict):
+                    child = children.get(k)
+                    if child is None:
+                        child = children[k] = prefix + (k,)
+                        layout[child] = (set(), {})
+                    walk(v, child)
+                elif k not in leaves:
+                    leaves.add(k)
+                    paths[prefix + (k,)] = None
+
+        for u in users:
+            walk(u, ())
+        return cls(paths, sep=sep)
+
+    def _build_tree(self):
+        """Nest the paths into [(key, column | subtree), ...], or None if unflatten_dict would not nest them cleanly."""
+        tree = []
+        subtrees = {(): tree}
+        leaves = set()
+        for column, path in enumerate(self.paths):
+            for depth in range(1, len(path)):
+                prefix = path[:depth]
+                if prefix in leaves:
+                    return None
+                if prefix not in subtrees:
+                    subtrees[prefix] = []
+                    subtrees[prefix[:-1]].append((prefix[-1], subtrees[prefix]))
+            if path in subtrees or path in leaves:
+                return None
+            leaves.add(path)
+            subtrees[path[:-1]].append((path[-1], column))
+        return tree
+
+    def _build_runs(self) -> tuple:
+        """
+        Group consecutive columns with the same parent into (parent path, getter, key count) runs, so encode()
+        walks to each parent once and fetches all of its fields with one itemgetter call.
+        The key count is how many keys the layout knows at the run's parent: a record whose parents add up to
+        more keys than the runs' counts has fields without a column. Nodes with no leaves of their own are
+        returned separately as (path, key count).
+        """
+        sizes = {}
+        for prefix in self.known:
+            sizes[prefix[:-1]] = sizes.get(prefix[:-1], 0) + 1
+
+        runs = []
+        checked = set()
+        start = 0
+        for end in range(1, len(self.paths) + 1):
+            if end == len(self.paths) or self.paths[end][:-1] != self.paths[start][:-1]:
+                parent = self.paths[start][:-1]
+                keys = [path[-1] for path in self.paths[start:end]]
+                getter = itemgetter(*keys) if len(keys) > 1 else lambda node, k=keys[0]: (node[k],)
+                runs.append((parent, getter, sizes[parent]))
+                checked.add(parent)
+                start = end
+        return runs, [(path, size) for path, size in sizes.items() if path not in checked]
+
+    def encode(self, user: dict) -> list:
+        """
+        Row values in column order; missing fields (and dicts where a value is expected) become empty cells.
+        Fields the layout has no column for are reported with a warning (once per field) rather than silently lost.
+        """
+        row = []
+        extend = row.extend
+        keys = 0
+        try:
+            for parent, getter, _ in self.runs:
+                node = user
+                for key in parent:
+                    node = node[key]
+                extend(getter(node))
+                keys += len(node)
+            for parent, size in self.node_sizes:
+                node = user
+                for key in parent:
+                    node = node[key]
+                keys += len(node) - size
+        except (KeyError, TypeError):
+            self._check_unknown(user)
+            return [self._lookup(path, user) for path in self.paths]
+
+        if keys != self.run_keys:
+            self._check_unknown(user)
+        # Records parsed from JSON only contain plain dicts, so an exact type check is enough here.
+        if not _DICT_TYPE.isdisjoint(map(type, row)):
+            return [self._lookup(path, user) for path in self.paths]
+        return row
+
+    def unknown_fields(self, user: dict) -> list:
+        """Flattened names of the leaf fields of a record that have no column in this layout."""
+        unknown = []
+
+        def walk(d, prefix):
+            for k, v in d.items():
+                path = prefix + (k,)
+                if isinstance(v, dict):
+                    walk(v, path)
+                elif path not in self.known:
+                    unknown.append(self.sep.join(map(str, path)))
+
+        walk(user, ())
+        return unknown
+
+    def _check_unknown(self, user: dict):
+        for name in self.unknown_fields(user):
+            if name not in self.unknown:
+                self.unknown.add(name)
+                print(f"Warning: field '{name}' is not in the CSV columns (taken from the first batch); "
+                      f"its values are not written.")
+
+    @staticmethod
+    def _lookup(path, user):
+        """Value at one key path, or None if it is missing or not a leaf (what csv.DictWriter writes as '')."""
+        node = user
+        try:
+            for key in path:
+                node = node[key]
+        except (KeyError, TypeError):
+            return None
+        return None if isinstance(node, dict) else node
+
+    def decode(self, row: list) -> dict:
+        """Nested user dict from a CSV row."""
+        if self.tree is None or len(row) != len(self.paths):
+            return CSVHelper.unflatten_dict(self._as_dict_row(row), sep=self.sep)
+        return self._decode(self.tree, row)
+
+    def _decode(self, tree, row):
+        return {key: row[child] if type(child) is int else self._decode(child, row) for key, child in tree}
+
+    def _as_dict_row(self, row: list) -> dict:
+        """The dict csv.DictReader would have produced for this row."""
+        d = dict(zip(self.fieldnames, row))
+        if len(row) > len(self.fieldnames):
+            d[None] = row[len(self.fieldnames):]
+        for name in self.fieldnames[len(row):]:
+            d[name] = None
+        return d
+
+
+class StreamingCSVWriter:
+    """
+    Appends batches of user dictionaries to a (chunked, encrypted) CSV as they arrive.
+    - Column layout is given up front or taken from the first non-empty batch (RandomUser records all share one shape);
+      a field that first appears in a later batch has no column, and RowCodec.encode warns about it
+    - The file is only created once there is something to write, like CSVHelper.save_to_csv
+    - With index=True (encrypted output only), chunks are aligned to rows and a RecordIndex sidecar is written on close
+    """
+
+    def __init__(self, output_path, key: bytes = None, fieldnames: list = None, compression_level: int = None,
+                 codec: RowCodec = None, index: bool = False):
+        self.output_path = Path(output_path)
+        self.key = key
+        self.compression_level = compression_level
+        self.count = 0
+        self.codec = codec if codec is not None else RowCodec.from_fieldnames(fieldnames) if fieldnames else None
+        self.index = None
+        self.index_path = None
+        if index and key:
+            from src.utils.record_index import RecordIndex
+            self.index = RecordIndex()
+        self._stream = None
+
+    @property
+    def fieldnames(self):
+        return self.codec.fieldnames if self.codec is not None else None
+
+    def prepare(self, users: list) -> RowCodec:
+        """The codec the batch will be written with, taking the column layout from it if none is fixed yet."""
+        if self.codec is None:
+            self.codec = RowCodec.from_users(users)
+        return self.codec
+
+    def write_users(self, users: list):
+        """Encode and append a batch of users."""
+        if not users:
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if self._stream is None:
+            self.prepare(users)
+            self._open()
+            writer.writerow(self.codec.fieldnames)
+
+        encode = self.codec.encode
+        if self.index is None:
+            writer.writerows(encode(u) for u in users)
+        else:
+            # One write per record, so the index knows where each one starts and no record spans two chunks.
+            self._write_text(self._take(buffer))
+            for user in users:
+                writer.writerow(encode(user))
+                self.index.add(self._stream.tell(), user)
+                self._write_text(self._take(buffer))
+
+        self._write_text(buffer.getvalue())
+        self.count += len(users)
+
+    @staticmethod
+    def _take(buffer: io.StringIO) -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    def _write_text(self, text: str):
+        if not text:
+            return
+        if self.key:
+            self._stream.write(text.encode("utf-8"))
+        else:
+            self._stream.write(text)
+
+    def _open(self):
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.key:
+            compression = None if self.compression_level is None else "zstd"
+            level = self.compression_level if self.compression_level is not None else DEFAULT_COMPRESSION_LEVEL
+            self._stream = EncryptedStreamWriter(self.output_path, self.key, compression=compression,
+                                                 compression_level=level, aligned=self.index is not None)
+        else:
+            self._stream = open(self.output_path, "w", newline="", encoding="utf-8")
+
+    def close(self):
+        if self._stream is None:
+            return
+        self._stream.close()
+        if self.index is not None:
+            self.index_path = self.index.save(self._stream, self.codec.fieldnames, self.key)
@@ -1,7 +1,54 @@
 import sys
+import glob
+import time
+import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from cryptography.fernet import Fernet
 
+# Allow running as a script (python src/utils/decrypt.py) as well as a module.
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src.utils.encrypted_stream import EncryptedStreamReader, is_chunked_file
+
+# Plaintext copied to the output per read; with the 1 MiB container chunks this bounds memory per file.
+COPY_BUFFER = 1024 * 1024
+
+
+def output_path_for(file_p: Path, output_dir: Path = None) -> Path:
+    """
+    valid_users.csv.enc -> valid_users_DECRYPTED.csv, next to the input or in output_dir/<run directory name>/
+    (artifacts of different runs share file names).
+    """
+    name = file_p.name
+    if name.endswith(".enc"):
+        stem, dot, ext = name[:-len(".enc")].rpartition(".")
+        output_name = f"{stem}_DECRYPTED.{ext}" if dot else f"{ext}_DECRYPTED"
+    else:
+        output_name = f"{name}_DECRYPTED"
+    return (output_dir / file_p.parent.name if output_dir else file_p.parent) / output_name
+
+
+def decrypt_to(file_p: Path, key: bytes, dst) -> int:
+    """
+    Stream the plaintext of an encrypted artifact into the binary file object dst. Returns the plaintext size.
+    Chunked containers are decrypted one chunk at a time; legacy single-token files have to be decrypted whole.
+    """
+    if is_chunked_file(file_p):
+        size = 0
+        with EncryptedStreamReader(file_p, key) as src:
+            while True:
+                data = src.read(COPY_BUFFER)
+                if not data:
+                    return size
+                dst.write(data)
+                size += len(data)
+
+    with open(file_p, "rb") as f:
+        decrypted_data = Fernet(key).decrypt(f.read())
+    dst.write(decrypted_data)
+    return len(decrypted_data)
+
 
 def decrypt_file(key_path, file_path):
     """
@@ -18,7 +65,7 @@ def decrypt_file(key_path, file_path):
         key = f.read()
 
     try:
-        fernet = Fernet(key)
+        Fernet(key)
     except Exception as e:
         print(f"Error: Invalid key. {e}")
         return
@@ -27,33 +74,130 @@ def decrypt_file(key_path, file_path):
         print(f"Error: Encrypted file not found at {file_p}")
         return
 
-    with open(file_p, "rb") as f:
-        encrypted_data = f.read()
+    output_path = output_path_for(file_p)
 
     try:
-        decrypted_data = fernet.decrypt(encrypted_data)
-
-        output_name = file_p.name.replace(".csv.enc", "_DECRYPTED.csv")
-        output_path = file_p.parent / output_name
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(decrypted_data.decode('utf-8'))
+        with open(output_path, "wb") as dst:
+            decrypt_to(file_p, key, dst)
 
         print(f"Success! Decrypted file saved to:\n{output_path}")
 
     except Exception as e:
         print(f"Error: Decryption failed. The key may be incorrect or the file corrupted.")
         print(f"Details: {e}")
+        output_path.unlink(missing_ok=True)
+
+
+def expand_inputs(patterns: list) -> list:
+    """Files matched by the patterns; a matched directory contributes every .enc file below it."""
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        for match in map(Path, matches):
+            if match.is_dir():
+                files.extend(sorted(match.rglob("*.enc")))
+            else:
+                files.append(match)
+    return list(dict.fromkeys(files))
+
+
+def _decrypt_one(file_p: Path, key: bytes, output_dir: Path = None) -> tuple:
+    """Worker: decrypt one file to disk. Returns (input, output, encrypted size, plaintext size, seconds, error)."""
+    output_path = output_path_for(file_p, output_dir)
+    start = time.perf_counter()
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "wb") as dst:
+            size = decrypt_to(file_p, key, dst)
+    except Exception as e:
+        output_path.unlink(missing_ok=True)
+        return file_p, None, 0, 0, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    return file_p, output_path, file_p.stat().st_size, size, time.perf_counter() - start, None
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python decrypt.py <path_to_key_file> <path_to_encrypted_file>")
-        print(
-            "Example: python decrypt.py output/2025_11_04.../encryption_key.key output/2025_11_04.../valid_users.csv.enc")
-        sys.exit(1)
+def _report(file_p, output_path, enc_size, size, seconds, error, out=sys.stdout) -> bool:
+    if error:
+        print(f"FAILED {file_p}: {error}", file=out)
+        return False
+    rate = size / 1e6 / seconds if seconds > 0 else float("inf")
+    target = f" -> {output_path}" if output_path else ""
+    print(f"{file_p}: {enc_size / 1e6:.2f} MB -> {size / 1e6:.2f} MB in {seconds:.2f}s ({rate:.1f} MB/s){target}",
+          file=out)
+    return True
 
-    key_path_arg = sys.argv[1]
-    file_path_arg = sys.argv[2]
 
-    decrypt_file(key_path_arg, file_path_arg)
\ No newline at end of file
+def decrypt_batch(key_path, patterns: list, workers: int = 4, output_dir=None, to_stdout: bool = False) -> bool:
+    """
+    Decrypt every file matched by the patterns (globs, files or run directories) with a process pool.
+    Each file is streamed in chunks, so memory stays bounded per worker whatever the artifact size.
+    With to_stdout the plaintexts are written to stdout one after another, in input order, and the
+    report goes to stderr. Returns True when every file was decrypted.
+    """
+    key_p = Path(key_path)
+    if not key_p.exists():
+        print(f"Error: Key file not found at {key_p}")
+        return False
+    key = key_p.read_bytes().strip()
+    try:
+        Fernet(key)
+    except Exception as e:
+        print(f"Error: Invalid key. {e}")
+        return False
+
+    files = [f for f in expand_inputs(patterns) if f.is_file()]
+    if not files:
+        print(f"Error: No encrypted files matched {patterns}")
+        return False
+
+    ok = 0
+    start = time.perf_counter()
+    total = 0
+
+    if to_stdout:
+        # Concurrent decryption would need the out-of-order plaintexts buffered; stream sequentially instead.
+        for file_p in files:
+            file_start = time.perf_counter()
+            try:
+                size = decrypt_to(file_p, key, sys.stdout.buffer)
+                result = (file_p, None, file_p.stat().st_size, size, time.perf_counter() - file_start, None)
+            except Exception as e:
+                result = (file_p, None, 0, 0, time.perf_counter() - file_start, f"{type(e).__name__}: {e}")
+            sys.stdout.buffer.flush()
+            ok += _report(*result, out=sys.stderr)
+            total += result[3]
+        report = sys.stderr
+    else:
+        output_dir = Path(output_dir) if output_dir else None
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(files)))) as pool:
+            futures = [pool.submit(_decrypt_one, file_p, key, output_dir) for file_p in files]
+            for future in as_completed(futures):
+                result = future.result()
+                ok += _report(*result)
+                total += result[3]
+        report = sys.stdout
+
+    elapsed = time.perf_counter() - start
+    print(f"Decrypted {ok}/{len(files)} files, {total / 1e6:.2f} MB in {elapsed:.2f}s "
+          f"({total / 1e6 / elapsed if elapsed > 0 else 0:.1f} MB/s overall)", file=report)
+    return ok == len(files)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Decrypt ETL artifacts. One file: writes <name>_DECRYPTED next to it. "
+                    "Several files, globs or run directories: batch mode with a process pool.",
+        epilog="Example: python decrypt.py output/2025_11_04.../encryption_key.key 'output/2025_11_*'")
+    parser.add_argument("key_path", help="Path to the key file")
+    parser.add_argument("paths", nargs="+", help="Encrypted files, globs or run directories")
+    parser.add_argument("--workers", type=int, default=4, help="Processes used in batch mode")
+    parser.add_argument("--output-dir", default=None, help="Write the decrypted files here instead of next to the inputs")
+    parser.add_argument("--stdout", action="store_true", help="Stream the plaintexts to stdout (report on stderr)")
+    args = parser.parse_args()
+
+    single = len(args.paths) == 1 and Path(args.paths[0]).is_file()
+    if single and not args.stdout and not args.output_dir:
+        decrypt_file(args.key_path, args.paths[0])
+    else:
+        success = decrypt_batch(args.key_path, args.paths, workers=args.workers, output_dir=args.output_dir,
+                                to_stdout=args.stdout)
+        sys.exit(0 if success else 1)
@@ -0,0 +1,192 @@
+import json
+import math
+import hashlib
+from pathlib import Path
+from cryptography.fernet import Fernet
+
+
+class SeenSet:
+    """Exact record of the keys seen so far (a hash set): no false positives, memory grows with every key."""
+
+    kind = "exact"
+
+    def __init__(self, keys=()):
+        self.keys = set(keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def add(self, key: str) -> bool:
+        """Add the key; True if it was new, False if it had been seen already."""
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        return True
+
+    def describe(self) -> str:
+        return f"exact set, {len(self.keys)} keys"
+
+    def _dump(self) -> tuple:
+        return {}, "\n".join(self.keys).encode("utf-8")
+
+    @classmethod
+    def _restore(cls, header: dict, body: bytes) -> "SeenSet":
+        return cls(body.decode("utf-8").split("\n") if body else ())
+
+
+class BloomFilter:
+    """
+    One fixed-size Bloom filter layer: about 1.44 * log2(1 / error_rate) bits per key, with a bounded
+    false-positive rate while at most `capacity` keys are added.
+    A false positive drops a new user as a duplicate; it is never the other way round.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("Bloom filter needs capacity > 0 and 0 < error_rate < 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def _positions(self, key: str):
+        # Double hashing (h1 + i * h2) over one 128-bit digest instead of k independent hash functions.
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> bool:
+        """Add the key; True if it was new, False if it was (probably) seen already."""
+        bits = self.bits
+        new = False
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter over the keys seen so far that grows instead of degrading (Almeida et al.):
+    - starts with one BloomFilter layer sized for `capacity` keys
+    - once a layer holds its capacity, a new layer twice as large is added, with half the false-positive
+      rate of the previous one, so the overall rate stays below error_rate however many runs a
+      --dedup-state file is carried through
+    - a key is seen if any layer has it; new keys go to the newest layer
+    """
+
+    kind = "bloom"
+
+    def __init__(self, capacity: int, error_rate: float = 0.001, layers: list = None):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("Bloom filter needs capacity > 0 and 0 < error_rate < 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.layers = layers if layers is not None else [BloomFilter(capacity, error_rate / 2)]
+
+    def __len__(self) -> int:
+        return sum(layer.count for layer in self.layers)
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in layer for layer in self.layers)
+
+    def add(self, key: str) -> bool:
+        """Add the key; True if it was new, False if it was (probably) seen already."""
+        if key in self:
+            return False
+        layer = self.layers[-1]
+        if layer.count >= layer.capacity:
+            layer = BloomFilter(layer.capacity * 2, layer.error_rate / 2)
+            self.layers.append(layer)
+        return layer.add(key)
+
+    def describe(self) -> str:
+        size = sum(len(layer.bits) for layer in self.layers)
+        return (f"bloom filter, {len(self)} keys in {len(self.layers)} layer(s), {size / 1024:.0f} KiB, "
+                f"target false-positive rate {self.error_rate:g}")
+
+    def _dump(self) -> tuple:
+        header = {"capacity": self.capacity, "error_rate": self.error_rate,
+                  "layers": [{"capacity": layer.capacity, "error_rate": layer.error_rate, "count": layer.count}
+                             for layer in self.layers]}
+        return header, b"".join(bytes(layer.bits) for layer in self.layers)
+
+    @classmethod
+    def _restore(cls, header: dict, body: bytes) -> "ScalableBloomFilter":
+        layers = []
+        offset = 0
+        # Single-layer states (saved before the filter could grow) hold one layer's parameters at the top level.
+        for params in header.get("layers") or [header]:
+            layer = BloomFilter(params["capacity"], params["error_rate"])
+            size = len(layer.bits)
+            if offset + size > len(body):
+                raise ValueError("Bloom filter state does not match its parameters")
+            layer.bits[:] = body[offset: offset + size]
+            layer.count = params["count"]
+            layers.append(layer)
+            offset += size
+        if offset != len(body):
+            raise ValueError("Bloom filter state does not match its parameters")
+        return cls(header["capacity"], header["error_rate"], layers=layers)
+
+
+_KINDS = {SeenSet.kind: SeenSet, ScalableBloomFilter.kind: ScalableBloomFilter}
+
+
+def make_seen(kind: str, capacity: int = None, error_rate: float = 0.001):
+    """'exact' -> SeenSet, 'bloom' -> ScalableBloomFilter starting with room for `capacity` keys."""
+    if kind == "exact":
+        return SeenSet()
+    if kind == "bloom":
+        return ScalableBloomFilter(capacity, error_rate)
+    raise ValueError(f"Unknown dedup mode: {kind}")
+
+
+def save_seen(seen, path, key: bytes = None):
+    """Persist the seen keys (encrypted when a key is given) so later runs skip users already extracted."""
+    header, body = seen._dump()
+    data = json.dumps({"kind": seen.kind, **header}).encode("utf-8") + b"\n" + body
+    if key:
+        data = Fernet(key).encrypt(data)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+
+
+def load_seen(path, key: bytes = None):
+    """Load keys saved by save_seen; the stored kind (exact or bloom) wins over the requested one."""
+    data = Path(path).read_bytes()
+    if key:
+        data = Fernet(key).decrypt(data)
+    header, _, body = data.partition(b"\n")
+    header = json.loads(header)
+    return _KINDS[header["kind"]]._restore(header, body)
+
+
+def key_of(user: dict, path: tuple):
+    """Value at the dotted key path (e.g. ('login', 'uuid')), or None when missing or empty."""
+    value = user
+    for part in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return str(value) if value not in (None, "") else None
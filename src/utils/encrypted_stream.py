@@ -0,0 +1,320 @@
+import io
+import os
+import json
+import struct
+import hashlib
+from pathlib import Path
+from cryptography.fernet import Fernet
+
+try:
+    import zstandard
+except ImportError:  # Compression is optional: files can still be written and read uncompressed.
+    zstandard = None
+
+MAGIC = b"ETLENC"
+VERSION = 2
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_COMPRESSION_LEVEL = 3
+
+_LENGTH = struct.Struct(">I")
+# Authenticated prefix of every chunk: file id, chunk index and flags.
+_CHUNK_PREFIX = struct.Struct(">16sQB")
+_FLAG_FINAL = 0x01
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ValueError("zstd compression needs the 'zstandard' package")
+
+
+class IntegrityError(ValueError):
+    """The encrypted container is truncated, reordered, spliced or otherwise does not match its trailer."""
+
+
+def is_chunked_file(path) -> bool:
+    """Return True if the file uses the chunked container instead of a single Fernet token."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class EncryptedStreamWriter:
+    """
+    Writes data as a sequence of independently encrypted chunks:
+        MAGIC | version | header length | header (JSON) | (token length | Fernet token)* | trailer token
+    - Every chunk carries the file id and its index, so chunks cannot be reordered, dropped or mixed between files
+    - The final (trailer) chunk holds the chunk count, plaintext size and SHA-256 of the plaintext and header,
+      so a truncated file is detected even if it ends on a chunk boundary
+    - With compression="zstd", each chunk is compressed on its own before encryption (ciphertext does not compress)
+    - With aligned=True, chunks are only cut between write() calls (so a caller writing whole records never has
+      one split across chunks) and may exceed chunk_size by up to one write
+    Only one chunk is kept in memory, so arbitrarily large outputs can be appended to as they are produced.
+    """
+
+    def __init__(self, path, key: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE, compression: str = None,
+                 compression_level: int = DEFAULT_COMPRESSION_LEVEL, aligned: bool = False):
+        self.path = Path(path)
+        self.fernet = Fernet(key)
+        self.chunk_size = chunk_size
+        self.aligned = aligned
+        self.chunk_offsets = []
+        self.file_id = os.urandom(16)
+        self.header = {"chunk_size": chunk_size, "compression": compression, "file_id": self.file_id.hex(),
+                       "aligned": aligned}
+
+        self._compressor = None
+        if compression == "zstd":
+            _require_zstandard()
+            self._compressor = zstandard.ZstdCompressor(level=compression_level)
+            self.header["compression_level"] = compression_level
+        elif compression is not None:
+            raise ValueError(f"Unsupported compression: {compression}")
+
+        self._buffer = bytearray()
+        self._index = 0
+        self._size = 0
+        self._digest = hashlib.sha256()
+
+        header = json.dumps(self.header, sort_keys=True).encode("utf-8")
+        self._header_digest = hashlib.sha256(header).hexdigest()
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC + bytes([VERSION]) + _LENGTH.pack(len(header)) + header)
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        if self.aligned:
+            if len(self._buffer) >= self.chunk_size:
+                self._write_chunk(bytes(self._buffer))
+                self._buffer.clear()
+            return len(data)
+
+        while len(self._buffer) >= self.chunk_size:
+            self._write_chunk(bytes(self._buffer[: self.chunk_size]))
+            del self._buffer[: self.chunk_size]
+        return len(data)
+
+    def tell(self) -> tuple:
+        """(chunk index, offset in its plaintext) where the next write starts. Exact per record with aligned=True."""
+        return self._index, len(self._buffer)
+
+    def _write_chunk(self, chunk: bytes, flags: int = 0):
+        if not flags & _FLAG_FINAL:
+            self._digest.update(chunk)
+            self._size += len(chunk)
+            if self._compressor is not None:
+                chunk = self._compressor.compress(chunk)
+            self.chunk_offsets.append(self._file.tell())
+        token = self.fernet.encrypt(_CHUNK_PREFIX.pack(self.file_id, self._index, flags) + chunk)
+        self._file.write(_LENGTH.pack(len(token)))
+        self._file.write(token)
+        self._index += 1
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def flush(self):
+        """Chunks are only written once full; kept for file-like compatibility (e.g. pyarrow sinks)."""
+
+    def close(self):
+        """Flush the last chunk and write the integrity trailer."""
+        if self._file.closed:
+            return
+        if self._buffer:
+            self._write_chunk(bytes(self._buffer))
+            self._buffer.clear()
+
+        trailer = {
+            "chunks": self._index,
+            "size": self._size,
+            "sha256": self._digest.hexdigest(),
+            "header_sha256": self._header_digest,
+        }
+        self._write_chunk(json.dumps(trailer).encode("utf-8"), flags=_FLAG_FINAL)
+        self._file.close()
+
+    def abort(self):
+        """Close without a trailer, so readers reject the incomplete file."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class EncryptedStreamReader(io.RawIOBase):
+    """
+    Read-only binary stream over a chunked encrypted file (container version 2).
+    Decrypts one chunk at a time, so it can be wrapped in io.TextIOWrapper and fed to csv.reader.
+    Integrity errors (bad order, truncation, wrong digest) raise IntegrityError while reading.
+    read_chunk() gives random access to single chunks instead (do not mix it with sequential reads).
+    """
+
+    def __init__(self, path, key: bytes):
+        super().__init__()
+        self.fernet = Fernet(key)
+        self._file = open(path, "rb")
+        magic = self._file.read(len(MAGIC) + 1)
+        if magic[: len(MAGIC)] != MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a chunked encrypted file")
+
+        self.version = magic[len(MAGIC)]
+        if self.version != VERSION:
+            self._file.close()
+            if self.version == 1:
+                # Version 1 had no chunk indexes or trailer: truncation and reordering would go unnoticed.
+                raise ValueError(f"{path} uses container version 1, which has no integrity checks and is no "
+                                 f"longer read; extract the run again")
+            raise ValueError(f"Unsupported container version {self.version}")
+
+        (length,) = _LENGTH.unpack(self._read_exact(_LENGTH.size, "header length"))
+        header = self._read_exact(length, "header")
+        self.header = json.loads(header)
+        self.file_id = bytes.fromhex(self.header["file_id"])
+        self._header_digest = hashlib.sha256(header).hexdigest()
+
+        self._decompressor = None
+        compression = self.header.get("compression")
+        if compression == "zstd":
+            _require_zstandard()
+            self._decompressor = zstandard.ZstdDecompressor()
+        elif compression is not None:
+            self._file.close()
+            raise ValueError(f"Unsupported compression: {compression}")
+
+        self._chunk = b""
+        self._pos = 0
+        self._index = 0
+        self._size = 0
+        self._digest = hashlib.sha256()
+        self._finished = False
+
+    def readable(self) -> bool:
+        return True
+
+    def _read_exact(self, n: int, what: str) -> bytes:
+        data = self._file.read(n)
+        if len(data) < n:
+            raise IntegrityError(f"Truncated {what}")
+        return data
+
+    def _read_token(self):
+        frame_header = self._file.read(_LENGTH.size)
+        if not frame_header:
+            return None
+        if len(frame_header) < _LENGTH.size:
+            raise IntegrityError("Truncated chunk header")
+        (length,) = _LENGTH.unpack(frame_header)
+        return self.fernet.decrypt(self._read_exact(length, "chunk"))
+
+    def _next_chunk(self) -> bool:
+        if self._finished:
+            return False
+
+        plaintext = self._read_token()
+        if plaintext is None:
+            raise IntegrityError("File ends without an integrity trailer (truncated)")
+
+        flags, payload = self._open_chunk(plaintext, self._index)
+        self._index += 1
+
+        if flags & _FLAG_FINAL:
+            self._verify_trailer(json.loads(payload))
+            return False
+
+        self._digest.update(payload)
+        self._size += len(payload)
+        self._chunk, self._pos = payload, 0
+        return True
+
+    def _open_chunk(self, plaintext: bytes, expected_index: int) -> tuple:
+        """Check the authenticated chunk prefix and return (flags, payload), decompressing data chunks."""
+        file_id, index, flags = _CHUNK_PREFIX.unpack_from(plaintext)
+        if file_id != self.file_id:
+            raise IntegrityError("Chunk belongs to another file")
+        if index != expected_index:
+            raise IntegrityError(f"Chunk {index} found where chunk {expected_index} was expected")
+
+        payload = plaintext[_CHUNK_PREFIX.size:]
+        if self._decompressor is not None and not flags & _FLAG_FINAL:
+            payload = self._decompressor.decompress(payload)
+        return flags, payload
+
+    def frame_offsets(self) -> list:
+        """
+        File offset of every frame (data chunks, then the trailer), found by skipping over the frames without
+        decrypting them. Used to hand chunks out to parallel readers.
+        """
+        offsets = []
+        self._file.seek(0)
+        self._file.read(len(MAGIC) + 1)
+        (length,) = _LENGTH.unpack(self._file.read(_LENGTH.size))
+        self._file.seek(length, io.SEEK_CUR)
+
+        while True:
+            offset = self._file.tell()
+            frame_header = self._file.read(_LENGTH.size)
+            if not frame_header:
+                return offsets
+            if len(frame_header) < _LENGTH.size:
+                raise IntegrityError("Truncated chunk header")
+            (length,) = _LENGTH.unpack(frame_header)
+            self._file.seek(length, io.SEEK_CUR)
+            offsets.append(offset)
+
+    def verify_trailer_at(self, index: int, file_offset: int, size: int):
+        """
+        Check that the frame at file_offset is the trailer and matches the chunk count and plaintext size of
+        chunks read out of order (the SHA-256 of the whole content is only checked by sequential reads).
+        """
+        self._file.seek(file_offset)
+        plaintext = self._read_token()
+        if plaintext is None:
+            raise IntegrityError("File ends without an integrity trailer (truncated)")
+        flags, payload = self._open_chunk(plaintext, index)
+        if not flags & _FLAG_FINAL:
+            raise IntegrityError("File ends without an integrity trailer (truncated)")
+        trailer = json.loads(payload)
+        if self._file.read(1):
+            raise IntegrityError("Unexpected data after the integrity trailer")
+        if trailer["chunks"] != index or trailer["size"] != size or trailer["header_sha256"] != self._header_digest:
+            raise IntegrityError("Content does not match the integrity trailer")
+
+    def read_chunk(self, index: int, file_offset: int) -> bytes:
+        """Decrypt only the data chunk `index`, whose frame starts at `file_offset` (e.g. taken from a record index)."""
+        self._file.seek(file_offset)
+        plaintext = self._read_token()
+        if plaintext is None:
+            raise IntegrityError(f"Chunk {index} is past the end of the file")
+        flags, payload = self._open_chunk(plaintext, index)
+        if flags & _FLAG_FINAL:
+            raise IntegrityError(f"Chunk {index} is the integrity trailer, not data")
+        return payload
+
+    def _verify_trailer(self, trailer: dict):
+        self._finished = True
+        if self._file.read(1):
+            raise IntegrityError("Unexpected data after the integrity trailer")
+        if (trailer["chunks"] != self._index - 1 or trailer["size"] != self._size
+                or trailer["sha256"] != self._digest.hexdigest()
+                or trailer["header_sha256"] != self._header_digest):
+            raise IntegrityError("Content does not match the integrity trailer")
+
+    def readinto(self, buffer) -> int:
+        while self._pos >= len(self._chunk):
+            if not self._next_chunk():
+                return 0
+
+        n = min(len(buffer), len(self._chunk) - self._pos)
+        buffer[:n] = self._chunk[self._pos: self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        self._file.close()
+        super().close()
@@ -0,0 +1,89 @@
+import contextlib
+import functools
+import time
+
+try:
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server, write_to_textfile
+except ImportError:  # Metrics are optional: without prometheus_client every metric is a no-op.
+    CollectorRegistry = None
+
+
+class _NoopMetric:
+    """Stand-in used when prometheus_client is not installed."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, amount):
+        pass
+
+    def set(self, value):
+        pass
+
+    def time(self):
+        return contextlib.nullcontext()
+
+
+if CollectorRegistry is not None:
+    REGISTRY = CollectorRegistry()
+
+    API_REQUESTS = Counter(
+        "etl_api_requests_total", "API requests by HTTP status (or network_error)", ["status"], registry=REGISTRY)
+    API_LATENCY = Histogram(
+        "etl_api_request_duration_seconds", "API request latency", registry=REGISTRY,
+        buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30))
+    API_RETRIES = Counter(
+        "etl_api_retries_total", "Retried API requests by reason", ["reason"], registry=REGISTRY)
+    API_BYTES = Counter(
+        "etl_api_downloaded_bytes_total", "Bytes of API responses downloaded", registry=REGISTRY)
+    CACHE_REQUESTS = Counter(
+        "etl_response_cache_requests_total", "Response cache lookups by result (hit/miss)", ["result"],
+        registry=REGISTRY)
+    CONCURRENCY_LIMIT = Gauge(
+        "etl_concurrency_limit", "Current AIMD limit of in-flight API requests", registry=REGISTRY)
+    USERS = Counter(
+        "etl_users_total", "Users processed, by stage and result", ["stage", "result"], registry=REGISTRY)
+    STAGE_DURATION = Histogram(
+        "etl_stage_duration_seconds", "Duration of each pipeline stage", ["stage"], registry=REGISTRY,
+        buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600))
+else:
+    REGISTRY = None
+    API_REQUESTS = API_LATENCY = API_RETRIES = API_BYTES = CACHE_REQUESTS = _NoopMetric()
+    CONCURRENCY_LIMIT = USERS = STAGE_DURATION = _NoopMetric()
+
+
+def timed_stage(stage: str):
+    """Decorator recording how long a pipeline stage took in etl_stage_duration_seconds."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                STAGE_DURATION.labels(stage=stage).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def start_exporter(port: int) -> bool:
+    """Expose the metrics over HTTP (http://<host>:<port>/metrics) for Prometheus to scrape."""
+    if REGISTRY is None:
+        print("Metrics disabled: prometheus_client is not installed.")
+        return False
+    start_http_server(port, registry=REGISTRY)
+    print(f"Metrics exporter listening on port {port}")
+    return True
+
+
+def write_textfile(path) -> bool:
+    """Write the metrics in text format, e.g. for node_exporter's textfile collector after a one-shot run."""
+    if REGISTRY is None:
+        print("Metrics disabled: prometheus_client is not installed.")
+        return False
+    write_to_textfile(str(path), REGISTRY)
+    print(f"Metrics written to: {path}")
+    return True
@@ -0,0 +1,77 @@
+import io
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from src.utils.csv_helper import RowCodec
+from src.utils.encrypted_stream import EncryptedStreamReader
+from src.utils.user_record import RecordLayout
+
+# Codec per worker process, built once per file layout.
+_codecs = {}
+
+
+def _decode_chunk(text: str, fieldnames: tuple, records: bool) -> list:
+    codec = _codecs.get((fieldnames, records))
+    if codec is None:
+        codec = RecordLayout(fieldnames) if records else RowCodec.from_fieldnames(fieldnames)
+        _codecs[fieldnames, records] = codec
+    return [codec.decode(row) for row in csv.reader(io.StringIO(text, newline="")) if row]
+
+
+def _load_chunks(path: str, key: bytes, chunks: list, fieldnames: tuple, records: bool) -> tuple:
+    """Worker: decrypt, parse and unflatten a run of consecutive chunks. Returns (users, plaintext bytes read)."""
+    users = []
+    size = 0
+    with EncryptedStreamReader(path, key) as reader:
+        for index, offset in chunks:
+            payload = reader.read_chunk(index, offset)
+            size += len(payload)
+            users.extend(_decode_chunk(payload.decode("utf-8"), fieldnames, records))
+    return users, size
+
+
+def can_load_in_parallel(path, key: bytes) -> bool:
+    """Only containers whose chunks are aligned to records can be split between processes."""
+    try:
+        with EncryptedStreamReader(path, key) as reader:
+            return bool(reader.header.get("aligned"))
+    except ValueError:
+        return False
+
+
+def load_csv_parallel(path, key: bytes, workers: int, chunks_per_task: int = 4, records: bool = False) -> list:
+    """
+    Load an aligned chunked CSV with a process pool: every worker decrypts, parses and unflattens whole chunks,
+    and results are gathered in file order, so the users come back in the same order as a sequential load.
+    The chunk count and total size are checked against the trailer.
+    """
+    path = str(path)
+    with EncryptedStreamReader(path, key) as reader:
+        offsets = reader.frame_offsets()
+        if not offsets:
+            return []
+        data_offsets, trailer_offset = offsets[:-1], offsets[-1]
+        if not data_offsets:
+            reader.verify_trailer_at(0, trailer_offset, 0)
+            return []
+
+        # The first chunk starts with the header row; it is read here to learn the column layout.
+        first = reader.read_chunk(0, data_offsets[0])
+        header_end = first.index(b"\n") + 1
+        fieldnames = tuple(next(csv.reader([first[:header_end].decode("utf-8")])))
+
+        rest = list(enumerate(data_offsets))[1:]
+        tasks = [rest[i: i + chunks_per_task] for i in range(0, len(rest), chunks_per_task)]
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_load_chunks, [path] * len(tasks), [key] * len(tasks), tasks,
+                               [fieldnames] * len(tasks), [records] * len(tasks))
+
+            # The first chunk is decoded here while the workers handle the others.
+            users = _decode_chunk(first[header_end:].decode("utf-8"), fieldnames, records)
+            size = len(first)
+            for chunk_users, chunk_size in results:
+                users.extend(chunk_users)
+                size += chunk_size
+
+        reader.verify_trailer_at(len(data_offsets), trailer_offset, size)
+    return users
@@ -1,7 +1,11 @@
 import re
 import math
 import string
-from collections import Counter, defaultdict
+from itertools import islice
+from src.utils.user_record import as_records
+from src.utils.sketches import HyperLogLog, SpaceSaving
+from src.utils.stats_accumulator import SKETCH_BATCH
+from src.utils import metrics
 
 class PasswordAuditor:
     """
@@ -9,14 +13,18 @@ class PasswordAuditor:
     - Calculates strength, complexity, and common patterns.
     - Checks for correlations (name/birthyear in password).
     """
-    def __init__(self, users: list):
+    def __init__(self, users: list, approximate: dict = None):
         """
-        Initializes the PasswordAuditor with a list of user dictionaries.
+        Initializes the PasswordAuditor with a list of UserRecords (user dictionaries are converted).
+        approximate ({"hll_error": ..., "topk_error": ...}) counts the password patterns with sketches.
         """
-        self.users = users
-        self.passwords = [user.get("login", {}).get("password", "") for user in self.users]
+        self.users = as_records(users)
+        self.approximate = approximate
+        self.passwords = [user.password or "" for user in self.users]
+        self.audit_state = None
 
-    def _estimate_entropy(self, password):
+    @staticmethod
+    def _estimate_entropy(password):
         """Estimate entropy based on character set size R and length L."""
         if not password:
             return 0.0
@@ -31,7 +39,8 @@ class PasswordAuditor:
         L = len(password)
         return L * math.log2(R) if R > 0 else 0.0
 
-    def _check_complexity(self, password):
+    @staticmethod
+    def _check_complexity(password):
         """
         Checks if password meets basic complexity rules.
         Requires at least 3 of 4 types: lower, upper, digit, symbol.
@@ -47,153 +56,258 @@ class PasswordAuditor:
 
         return types >= 3
 
+    @metrics.timed_stage("audit")
     def generate_all_stats(self) -> dict:
-        """Runs all password audit methods and returns a combined dictionary."""
-
-        password_complexity_stats = self.calculate_password_complexity()
-        password_pattern_stats = self.calculate_password_pattern_stats()
-        password_strength_stats = self.calculate_password_strength_stats()
-        name_in_pass_stats = self.calculate_name_in_password()
-        birthyear_in_pass_stats = self.calculate_birthyear_in_password()
-        username_in_pass_stats = self.calculate_username_in_password()
-
-        most_secure_password = self.find_most_secure_password()
-
-        all_stats = {
-            "password_complexity_stats": password_complexity_stats,
-            "password_pattern_stats": password_pattern_stats,
-            "password_strength": password_strength_stats,
-            "name_in_password": name_in_pass_stats,
-            "birthyear_in_password": birthyear_in_pass_stats,
-            "username_in_password": username_in_pass_stats,
-            "most_secure_password": most_secure_password,
-        }
-        return all_stats
+        """
+        Audits every user in one pass (see AuditAccumulator) and returns the combined dictionary.
+        The state behind it is kept in self.audit_state, to be saved and merged with other runs.
+        """
+        self.audit_state = make_audit_accumulator(self.approximate).update(self.users)
+        return self.audit_state.finalize()
+
+    def _exact_audit(self, entropy_threshold: float = 50, top_n: int = 10) -> dict:
+        """Exact audit of all users; the single-metric methods below return one key of it."""
+        return AuditAccumulator(entropy_threshold).update(self.users).finalize(top_n)
 
     def find_most_secure_password(self):
         """
         Finds the most secure password based on a simple scoring system
         (length + complexity bonuses) minus disqualifiers (personal info).
         """
-        best_password = "N/A"
-        max_score = -1
-
-        for user in self.users:
-            password_original = user.get("login", {}).get("password", "")
-            if not password_original:
-                continue
-
-            password_lower = password_original.lower()
-            current_score = 0
-
-            first = user.get("name", {}).get("first", "").lower()
-            last = user.get("name", {}).get("last", "").lower()
-            if (first and first in password_lower) or (last and last in password_lower):
-                current_score = 0
-                continue
-
-            dob_date = user.get("dob", {}).get("date", "")
-            birth_year = dob_date[:4] if dob_date else ""
-            if birth_year and birth_year in password_original:
-                current_score = 0
-                continue
-
-            username = user.get("login", {}).get("username", "").lower()
-            if username and username in password_lower:
-                current_score = 0
-                continue
-
-            current_score = len(password_original)
-            if any(c.islower() for c in password_original): current_score += 3
-            if any(c.isupper() for c in password_original): current_score += 3
-            if any(c.isdigit() for c in password_original): current_score += 3
-            if any(c in string.punctuation for c in password_original): current_score += 3
-
-            if current_score > max_score:
-                max_score = current_score
-                best_password = password_original
-
-        return best_password
+        return self._exact_audit()["most_secure_password"]
 
     def calculate_password_strength_stats(self, entropy_threshold=50):
         """
         Compute strong vs weak passwords metrics using entropy and complexity rules.
         """
-        total = len(self.users)
-        if total == 0:
-            return {"strong": 0, "weak": 0, "percent_strong": 0.0, "total_users": 0}
-
-        strong = 0
-        for user in self.users:
-            password = user.get("login", {}).get("password", "")
-            passes_entropy = self._estimate_entropy(password) >= entropy_threshold
-            passes_complexity = self._check_complexity(password)
-
-            if passes_entropy and passes_complexity:
-                strong += 1
-
-        percent_strong = round((strong / total) * 100, 2)
-
-        return {
-            "strong": strong,
-            "weak": total - strong,
-            "percent_strong": percent_strong,
-            "total_users": total
-        }
+        return self._exact_audit(entropy_threshold=entropy_threshold)["password_strength"]
 
     def calculate_password_complexity(self):
         """Classify passwords: lowercase only, numbers only, letters+numbers, includes symbols."""
-        counts = defaultdict(int)
-        for p in self.passwords:
-            if not p:
-                continue
-            if re.fullmatch(r"[a-z]+", p):
-                counts["lowercase_only"] += 1
-            elif re.fullmatch(r"\d+", p):
-                counts["numbers_only"] += 1
-            elif re.search(r"[^\w]", p):
-                counts["includes_symbols"] += 1
-            else:
-                counts["letters_and_numbers"] += 1
-        return dict(counts)
+        return self._exact_audit()["password_complexity_stats"]
 
     def calculate_password_pattern_stats(self, top_n=10):
         """Return top N most common passwords."""
-        counter = Counter(self.passwords)
-        most_common = counter.most_common(top_n)
-        return [{"password": p, "count": c} for p, c in most_common]
+        return self._exact_audit(top_n=top_n)["password_pattern_stats"]
 
     def calculate_name_in_password(self):
         """Return the count of users using their first or last name in password."""
-        count = 0
-        total = len(self.users)
-        for user in self.users:
-            password = user.get("login", {}).get("password", "").lower()
-            first = user.get("name", {}).get("first", "").lower()
-            last = user.get("name", {}).get("last", "").lower()
-            if (first and first in password) or (last and last in password):
-                count += 1
-        return {"count": count, "total": total}
+        return self._exact_audit()["name_in_password"]
 
     def calculate_birthyear_in_password(self):
         """Return the count of users using their birth year in password."""
-        count = 0
-        total = len(self.users)
-        for user in self.users:
-            password = user.get("login", {}).get("password", "")
-            dob_date = user.get("dob", {}).get("date", "")
-            birth_year = dob_date[:4] if dob_date else ""
-            if birth_year and birth_year in password:
-                count += 1
-        return {"count": count, "total": total}
+        return self._exact_audit()["birthyear_in_password"]
 
     def calculate_username_in_password(self):
         """Return the count of users using their username in password."""
-        count = 0
-        total = len(self.users)
-        for user in self.users:
-            password = user.get("login", {}).get("password", "").lower()
-            username = user.get("login", {}).get("username", "").lower()
-            if username and username in password:
-                count += 1
-        return {"count": count, "total": total}
\ No newline at end of file
+        return self._exact_audit()["username_in_password"]
+
+
+def _complexity_class(password: str) -> str:
+    if re.fullmatch(r"[a-z]+", password):
+        return "lowercase_only"
+    if re.fullmatch(r"\d+", password):
+        return "numbers_only"
+    if re.search(r"[^\w]", password):
+        return "includes_symbols"
+    return "letters_and_numbers"
+
+
+def _security_score(password: str) -> int:
+    score = len(password)
+    if any(c.islower() for c in password): score += 3
+    if any(c.isupper() for c in password): score += 3
+    if any(c.isdigit() for c in password): score += 3
+    if any(c in string.punctuation for c in password): score += 3
+    return score
+
+
+class AuditAccumulator:
+    """
+    Mergeable state behind PasswordAuditor.generate_all_stats:
+    - counts only (complexity classes, every password's occurrences, strong passwords, personal-info hits),
+      plus the best-scoring password so far
+    - update() audits each user once; merge() adds the state of the users that come after, so chunks
+      merged in order give exactly the result of auditing the whole list
+    - finalize() derives the percentages and the top-N patterns
+    """
+
+    approximate = False
+
+    def __init__(self, entropy_threshold: float = 50):
+        self.entropy_threshold = entropy_threshold
+        self.total_users = 0
+        self.complexity = {}
+        self.passwords = {}
+        self.strong = 0
+        self.name_in_password = 0
+        self.birthyear_in_password = 0
+        self.username_in_password = 0
+        self.best_score = -1
+        self.best_password = "N/A"
+
+    def update(self, users):
+        """Audit every user of an iterable."""
+        complexity, passwords = self.complexity, self.passwords
+        for user in users:
+            self.total_users += 1
+            password = user.password or ""
+            passwords[password] = passwords.get(password, 0) + 1
+            password_lower = password.lower()
+
+            first = (user.first_name or "").lower()
+            last = (user.last_name or "").lower()
+            name_hit = bool((first and first in password_lower) or (last and last in password_lower))
+            birth_year = user.birth_year
+            birthyear_hit = bool(birth_year and birth_year in password)
+            username = (user.username or "").lower()
+            username_hit = bool(username and username in password_lower)
+            self.name_in_password += name_hit
+            self.birthyear_in_password += birthyear_hit
+            self.username_in_password += username_hit
+
+            if not password:
+                continue
+            kind = _complexity_class(password)
+            complexity[kind] = complexity.get(kind, 0) + 1
+            if (PasswordAuditor._estimate_entropy(password) >= self.entropy_threshold
+                    and PasswordAuditor._check_complexity(password)):
+                self.strong += 1
+            if not (name_hit or birthyear_hit or username_hit):
+                score = _security_score(password)
+                # Strictly greater: on ties the earliest password wins.
+                if score > self.best_score:
+                    self.best_score, self.best_password = score, password
+        return self
+
+    def merge(self, other: "AuditAccumulator") -> "AuditAccumulator":
+        """Add the state of the users that come after this state's users."""
+        if other.approximate and not self.approximate:
+            raise ValueError("An approximate audit state can only be merged into another approximate state")
+        self.total_users += other.total_users
+        for target, source in ((self.complexity, other.complexity), (self.passwords, other.passwords)):
+            for key, count in source.items():
+                target[key] = target.get(key, 0) + count
+        self.strong += other.strong
+        self.name_in_password += other.name_in_password
+        self.birthyear_in_password += other.birthyear_in_password
+        self.username_in_password += other.username_in_password
+        if other.best_score > self.best_score:
+            self.best_score, self.best_password = other.best_score, other.best_password
+        return self
+
+    def to_dict(self) -> dict:
+        state = dict(vars(self))
+        state["complexity"] = list(self.complexity.items())
+        state["passwords"] = list(self.passwords.items())
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "AuditAccumulator":
+        if "sketches" in state and cls is AuditAccumulator:
+            return ApproxAuditAccumulator.from_dict(state)
+        accumulator = cls(state["entropy_threshold"])
+        vars(accumulator).update(state)
+        accumulator.complexity = dict(state["complexity"])
+        accumulator.passwords = dict(state["passwords"])
+        return accumulator
+
+    def finalize(self, top_n: int = 10) -> dict:
+        """The generate_all_stats dict."""
+        total = self.total_users
+        if total:
+            strength = {
+                "strong": self.strong,
+                "weak": total - self.strong,
+                "percent_strong": round((self.strong / total) * 100, 2),
+                "total_users": total,
+            }
+        else:
+            strength = {"strong": 0, "weak": 0, "percent_strong": 0.0, "total_users": 0}
+        # Counter.most_common order: by count, ties in first-appearance order.
+        patterns = sorted(self.passwords.items(), key=lambda item: item[1], reverse=True)[:top_n]
+
+        return {
+            "password_complexity_stats": dict(self.complexity),
+            "password_pattern_stats": [{"password": p, "count": c} for p, c in patterns],
+            "password_strength": strength,
+            "name_in_password": {"count": self.name_in_password, "total": total},
+            "birthyear_in_password": {"count": self.birthyear_in_password, "total": total},
+            "username_in_password": {"count": self.username_in_password, "total": total},
+            "most_secure_password": self.best_password,
+        }
+
+
+class ApproxAuditAccumulator(AuditAccumulator):
+    """
+    AuditAccumulator with bounded memory for the password counts, which grow with every distinct password:
+    - users are audited exactly in batches of SKETCH_BATCH, then the password counts are folded into a
+      Space-Saving summary (top-k patterns) and a HyperLogLog sketch (distinct passwords)
+    - password_pattern_stats entries carry their max overcount as "error"; finalize() reports the bounds
+      under "approximation"
+    """
+
+    approximate = True
+
+    def __init__(self, entropy_threshold: float = 50, hll_error: float = 0.01, topk_error: float = 0.001):
+        super().__init__(entropy_threshold)
+        self.hll_error = hll_error
+        self.topk_error = topk_error
+        self.top_passwords = SpaceSaving(topk_error)
+        self.distinct_passwords = HyperLogLog(hll_error)
+
+    def _fold(self):
+        for password, count in self.passwords.items():
+            self.top_passwords.add(password, count)
+            self.distinct_passwords.add(password)
+        self.passwords.clear()
+
+    def update(self, users):
+        users = iter(users)
+        while True:
+            batch = list(islice(users, SKETCH_BATCH))
+            if not batch:
+                return self
+            super().update(batch)
+            self._fold()
+
+    def merge(self, other: AuditAccumulator) -> "ApproxAuditAccumulator":
+        super().merge(other)
+        self._fold()
+        if other.approximate:
+            self.top_passwords.merge(other.top_passwords)
+            self.distinct_passwords.merge(other.distinct_passwords)
+        return self
+
+    def to_dict(self) -> dict:
+        state = {key: value for key, value in super().to_dict().items()
+                 if key not in ("top_passwords", "distinct_passwords")}
+        state["sketches"] = {"top_passwords": self.top_passwords.to_dict(),
+                             "distinct_passwords": self.distinct_passwords.to_dict()}
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "ApproxAuditAccumulator":
+        state = dict(state)
+        sketches = state.pop("sketches")
+        accumulator = super().from_dict(state)
+        accumulator.top_passwords = SpaceSaving.from_dict(sketches["top_passwords"])
+        accumulator.distinct_passwords = HyperLogLog.from_dict(sketches["distinct_passwords"])
+        return accumulator
+
+    def finalize(self, top_n: int = 10) -> dict:
+        stats = super().finalize(top_n)
+        stats["password_pattern_stats"] = [{"password": p, "count": c, "error": e}
+                                           for p, c, e in self.top_passwords.top(top_n)]
+        stats["approximation"] = {
+            "password_pattern_stats": {"method": "space-saving", "max_overcount": self.top_passwords.max_error,
+                                       "kept": len(self.top_passwords),
+                                       "distinct_estimate": self.distinct_passwords.count(),
+                                       "relative_error": round(self.distinct_passwords.error, 4)},
+        }
+        return stats
+
+
+def make_audit_accumulator(approximate: dict = None) -> AuditAccumulator:
+    """Exact accumulator, or an ApproxAuditAccumulator built from {"hll_error": ..., "topk_error": ...}."""
+    return ApproxAuditAccumulator(**approximate) if approximate is not None else AuditAccumulator()
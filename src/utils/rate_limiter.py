@@ -0,0 +1,104 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every worker of an extraction run.
+    - Spaces requests out to at most `rate` per second (bursts up to `capacity`)
+    - Can be paused globally (e.g. after a 429) so no worker keeps hammering the API
+    """
+
+    def __init__(self, rate: float = None, capacity: float = None):
+        """
+        :param rate: Requests per second. None disables the rate limit (pauses still apply).
+        :param capacity: Max burst size, defaults to one second worth of tokens.
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate or 1.0, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self.paused_until - now, 0.0)
+
+            if self.rate:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                self.tokens -= 1
+                if self.tokens < 0:
+                    wait = max(wait, -self.tokens / self.rate)
+
+            return wait
+
+    def acquire(self):
+        """Blocking version of reserve() for thread workers."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Stop handing out usable tokens for the given number of seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            if self.rate:
+                # Restart from an empty bucket so workers resume one at a time instead of all at once.
+                self.tokens = min(self.tokens, 0.0)
+                self.updated_at = max(self.updated_at, self.paused_until)
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease control of the number of in-flight requests.
+    - Starts below `maximum` (half of it by default) and probes upwards towards the API's real limit
+    - Every successful, fast response grows the limit by roughly one slot per window, up to `maximum`
+    - A 429 (or a response slower than latency_target) cuts the limit by `decrease`
+    """
+
+    def __init__(self, maximum: int, initial: int = None, minimum: int = 1, increase: float = 1.0,
+                 decrease: float = 0.5, latency_target: float = None, cooldown: float = 1.0):
+        """
+        :param maximum: Hard ceiling, e.g. the worker pool size or the connection pool limit.
+        :param initial: Starting limit, defaults to half of maximum.
+        """
+        if initial is None:
+            initial = maximum // 2
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self._limit = float(min(max(initial, minimum), self.maximum))
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    def on_success(self, latency: float = None):
+        """Record a successful request and its latency in seconds."""
+        if self.latency_target is not None and latency is not None and latency > self.latency_target:
+            self.on_congestion()
+            return
+
+        with self._lock:
+            self._limit = min(self.maximum, self._limit + self.increase / self._limit)
+
+    def on_congestion(self):
+        """Record a 429 or a slow response. Decreases at most once per cooldown period."""
+        with self._lock:
+            now = time.monotonic()
+            # All requests in flight during one congestion event tend to fail together: count them once.
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self._limit = max(self.minimum, self._limit * self.decrease)
@@ -0,0 +1,173 @@
+import io
+import csv
+import json
+import uuid
+import struct
+from array import array
+from pathlib import Path
+from src.utils.csv_helper import RowCodec
+from src.utils.encrypted_stream import EncryptedStreamWriter, EncryptedStreamReader, IntegrityError
+
+_LENGTH = struct.Struct(">I")
+_NO_UUID = bytes(16)
+
+
+def index_path_for(artifact_path) -> Path:
+    """valid_users.csv.enc -> valid_users.csv.idx"""
+    artifact_path = Path(artifact_path)
+    name = artifact_path.name[:-len(".enc")] if artifact_path.name.endswith(".enc") else artifact_path.name
+    return artifact_path.with_name(name + ".idx")
+
+
+def _uuid_bytes(value) -> bytes:
+    try:
+        return uuid.UUID(str(value)).bytes
+    except ValueError:
+        return _NO_UUID
+
+
+class RecordIndex:
+    """
+    Sidecar index of a chunked CSV artifact, built while the artifact is written:
+    - for every record: the chunk that holds it and its byte offset in the chunk plaintext
+    - every record's login.uuid (16 bytes), sorted, with the record number of each, for binary-search lookups by id
+    - the file offset of every chunk, so a reader can seek straight to it
+    Stored encrypted (same key and container as the artifact) next to it as <name>.idx.
+    """
+
+    def __init__(self, uuid_path: tuple = ("login", "uuid")):
+        self.uuid_path = uuid_path
+        self.positions = array("I")
+        self.uuids = bytearray()
+
+    def add(self, position: tuple, user: dict):
+        """Register the next record, written at (chunk index, offset)."""
+        self.positions.extend(position)
+        value = user
+        try:
+            for key in self.uuid_path:
+                value = value[key]
+        except (KeyError, TypeError):
+            value = None
+        self.uuids += _uuid_bytes(value) if value else _NO_UUID
+
+    def save(self, artifact: EncryptedStreamWriter, fieldnames: list, key: bytes) -> Path:
+        """Write the index for the (closed) artifact; its file id ties the two files together."""
+        header = json.dumps({
+            "artifact": artifact.path.name,
+            "file_id": artifact.file_id.hex(),
+            "records": len(self.positions) // 2,
+            "fieldnames": fieldnames,
+            "uuid_field": ".".join(self.uuid_path),
+            "uuid_order": "sorted",
+            "chunk_offsets": artifact.chunk_offsets,
+        }).encode("utf-8")
+
+        positions = self.positions
+        uuids = bytes(self.uuids)
+        # Stable sort: records sharing a uuid stay in file order, so lookups return the first one.
+        order = sorted(range(len(positions) // 2), key=lambda number: uuids[16 * number: 16 * number + 16])
+        path = index_path_for(artifact.path)
+        with EncryptedStreamWriter(path, key) as out:
+            out.write(_LENGTH.pack(len(header)) + header)
+            out.write(struct.pack(f"<{len(positions)}I", *positions))
+            out.write(b"".join(uuids[16 * number: 16 * number + 16] for number in order))
+            out.write(struct.pack(f"<{len(order)}I", *order))
+        return path
+
+
+class ArtifactReader:
+    """
+    Random access to the records of an indexed, encrypted CSV artifact.
+    Only the chunks holding the requested records are read and decrypted (the last one is kept for reuse).
+    Chunks are authenticated individually; the whole-file trailer is only checked by sequential reads.
+    """
+
+    def __init__(self, artifact_path, key: bytes, index_path=None):
+        self.artifact_path = Path(artifact_path)
+        index_path = Path(index_path) if index_path else index_path_for(self.artifact_path)
+
+        with EncryptedStreamReader(index_path, key) as raw:
+            data = raw.read()
+        (length,) = _LENGTH.unpack_from(data)
+        self.header = json.loads(data[_LENGTH.size: _LENGTH.size + length])
+        if self.header.get("uuid_order") != "sorted":
+            raise ValueError(f"{index_path.name} was written by an older version without sorted ids; "
+                             f"extract the run again")
+        count = self.header["records"]
+        start = _LENGTH.size + length
+        self.positions = struct.unpack_from(f"<{2 * count}I", data, start)
+        self.uuids = data[start + 8 * count: start + 24 * count]
+        self.uuid_records = struct.unpack_from(f"<{count}I", data, start + 24 * count)
+
+        self._reader = EncryptedStreamReader(self.artifact_path, key)
+        if self._reader.header.get("file_id") != self.header["file_id"]:
+            self._reader.close()
+            raise IntegrityError(f"{index_path.name} is not the index of {self.artifact_path.name}")
+
+        self.codec = RowCodec.from_fieldnames(self.header["fieldnames"])
+        self.chunk_offsets = self.header["chunk_offsets"]
+        self._chunk_index = None
+        self._chunk = None
+
+    def __len__(self) -> int:
+        return self.header["records"]
+
+    def _load_chunk(self, index: int) -> bytes:
+        if index != self._chunk_index:
+            self._chunk = self._reader.read_chunk(index, self.chunk_offsets[index])
+            self._chunk_index = index
+        return self._chunk
+
+    def get(self, number: int) -> dict:
+        """Record `number` (0-based, in file order)."""
+        if not 0 <= number < len(self):
+            raise IndexError(f"Record {number} out of range (0-{len(self) - 1})")
+        return self.slice(number, number + 1)[0]
+
+    def get_by_uuid(self, user_uuid: str):
+        """The record with this login.uuid (the first one in file order), or None. Binary search over the sorted ids."""
+        target = _uuid_bytes(user_uuid)
+        if target == _NO_UUID:
+            return None
+
+        uuids = self.uuids
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if uuids[16 * mid: 16 * mid + 16] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(self) or uuids[16 * lo: 16 * lo + 16] != target:
+            return None
+        return self.get(self.uuid_records[lo])
+
+    def slice(self, start: int, stop: int) -> list:
+        """Records start..stop-1, reading each chunk involved once."""
+        start, stop = max(start, 0), min(stop, len(self))
+        users = []
+        number = start
+        while number < stop:
+            chunk_index, offset = self.positions[2 * number], self.positions[2 * number + 1]
+            last = number
+            while last + 1 < stop and self.positions[2 * (last + 1)] == chunk_index:
+                last += 1
+            end = self.positions[2 * (last + 1) + 1] if last + 1 < len(self) and \
+                self.positions[2 * (last + 1)] == chunk_index else None
+
+            text = self._load_chunk(chunk_index)[offset:end].decode("utf-8")
+            for row in csv.reader(io.StringIO(text, newline="")):
+                if row:
+                    users.append(self.codec.decode(row))
+            number = last + 1
+        return users
+
+    def close(self):
+        self._reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,95 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from cryptography.fernet import Fernet
+
+
+class CacheMissError(Exception):
+    """Raised in offline mode when a response is not in the cache."""
+
+
+class ResponseCache:
+    """
+    Content-keyed on-disk cache of raw API responses.
+    - Entries are keyed by the SHA-256 of the request URL (only meaningful for seeded, reproducible requests)
+    - Bodies are encrypted with the run key when one is given
+    - Least recently used entries are evicted once the cache grows beyond max_bytes
+    """
+
+    def __init__(self, cache_dir, key: bytes = None, max_bytes: int = 1024 * 1024 * 1024):
+        self.dir = Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.fernet = Fernet(key) if key else None
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = sum(p.stat().st_size for p in self._entries())
+
+    def _entries(self):
+        return self.dir.glob("*/*.cache")
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.dir / digest[:2] / f"{digest}.cache"
+
+    def get(self, url: str):
+        """Return the cached body for the URL, or None."""
+        path = self._path(url)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Touch the entry so eviction treats it as recently used.
+        os.utime(path)
+        with self._lock:
+            self.hits += 1
+        return self.fernet.decrypt(data) if self.fernet else data
+
+    def put(self, url: str, body: bytes):
+        """Store a response body and evict old entries if the cache is over its size limit."""
+        data = self.fernet.encrypt(body) if self.fernet else body
+
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._size += len(data) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is back under 90% of max_bytes."""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self._size -= size
@@ -0,0 +1,117 @@
+from src.utils.validator import Validator
+
+# Shape of a RandomUser record: nested dicts of expected leaf types.
+RANDOMUSER_SCHEMA = {
+    "gender": str,
+    "name": {"title": str, "first": str, "last": str},
+    "location": {
+        "street": {"number": int, "name": str},
+        "city": str,
+        "state": str,
+        "country": str,
+        "postcode": (int, str),
+        "coordinates": {"latitude": str, "longitude": str},
+        "timezone": {"offset": str, "description": str},
+    },
+    "email": str,
+    "login": {
+        "uuid": str,
+        "username": str,
+        "password": str,
+        "salt": str,
+        "md5": str,
+        "sha1": str,
+        "sha256": str,
+    },
+    "dob": {"date": str, "age": int},
+    "registered": {"date": str, "age": int},
+    "phone": str,
+    "cell": str,
+    "id": {"name": str, "value": str},
+    "picture": {"large": str, "medium": str, "thumbnail": str},
+    "nat": str,
+}
+
+
+class _SchemaMismatch(Exception):
+    """The record does not have the compiled shape (missing, extra or differently typed fields)."""
+
+
+class RecordValidator:
+    """
+    Null/empty validator compiled once from a known record shape.
+    - Each dict node is checked for its exact key count, so extra fields are detected without building key sets
+    - Each leaf is checked against its expected types with a flat loop (no recursion, no per-record allocations)
+    - Records that do not match the shape fall back to the generic recursive check
+    Gives the same verdict as Validator.is_valid_value and also reports which field failed.
+    """
+
+    def __init__(self, schema: dict):
+        self.groups = []
+        self._compile(schema, ())
+
+    @classmethod
+    def randomuser(cls) -> "RecordValidator":
+        return cls(RANDOMUSER_SCHEMA)
+
+    def _compile(self, schema: dict, path: tuple):
+        leaves = []
+        for key, expected in schema.items():
+            if isinstance(expected, dict):
+                continue
+            types = expected if isinstance(expected, tuple) else (expected,)
+            leaves.append((key, ".".join(path + (key,)), types))
+        self.groups.append((path, len(schema), tuple(leaves)))
+
+        for key, expected in schema.items():
+            if isinstance(expected, dict):
+                self._compile(expected, path + (key,))
+
+    def first_invalid_field(self, record):
+        """Return the dotted path of the first null/empty field, or None if the record is valid."""
+        try:
+            return self._check_compiled(record)
+        except _SchemaMismatch:
+            return self._check_generic(record, "")
+
+    def is_valid(self, record) -> bool:
+        return self.first_invalid_field(record) is None
+
+    def _check_compiled(self, record):
+        for path, size, leaves in self.groups:
+            node = record
+            try:
+                for key in path:
+                    node = node[key]
+                if type(node) is not dict or len(node) != size:
+                    raise _SchemaMismatch()
+
+                for key, name, types in leaves:
+                    value = node[key]
+                    if value is None:
+                        return name
+                    value_type = type(value)
+                    if value_type is str:
+                        if not value.strip():
+                            return name
+                    elif value_type not in types:
+                        raise _SchemaMismatch()
+            except (KeyError, TypeError):
+                raise _SchemaMismatch()
+        return None
+
+    def _check_generic(self, value, path: str):
+        """Recursive fallback with the exact semantics of Validator.is_valid_value."""
+        if isinstance(value, dict):
+            for k, v in value.items():
+                failed = self._check_generic(v, f"{path}.{k}" if path else k)
+                if failed is not None:
+                    return failed
+            return None
+        if isinstance(value, list):
+            for i, v in enumerate(value):
+                failed = self._check_generic(v, f"{path}[{i}]")
+                if failed is not None:
+                    return failed
+            return None
+        return None if Validator.is_valid_value(value) else path
@@ -0,0 +1,67 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from src.utils.validator import Validator
+from src.utils.stats_accumulator import make_stats_accumulator
+from src.utils.passwordauditor import make_audit_accumulator
+
+# Users handed to forked workers without pickling (set only while a pool is running).
+_shared_users = None
+
+
+def _process_shard(start: int, stop: int, stats_backend: str, approximate: dict = None, users: list = None) -> tuple:
+    """
+    Worker: validate users[start:stop], then count statistics and audit passwords of the valid ones.
+    Returns ([(position, strange fields)] of the invalid users, StatsAccumulator, AuditAccumulator).
+    """
+    if users is None:
+        users = _shared_users[start:stop]
+
+    invalid = []
+    valid = []
+    for position, user in enumerate(users, start):
+        fields = Validator.strange_fields(user)
+        if fields:
+            invalid.append((position, fields))
+        else:
+            valid.append(user)
+
+    if stats_backend == "numpy":
+        from src.utils.stats_numpy import vectorized_state
+        stats = vectorized_state(valid)
+        if approximate:
+            stats = make_stats_accumulator(approximate).merge(stats)
+    else:
+        stats = make_stats_accumulator(approximate).update(valid)
+    return invalid, stats, make_audit_accumulator(approximate).update(valid)
+
+
+def run_shards(users: list, workers: int, stats_backend: str = "python", approximate: dict = None,
+               shards_per_worker: int = 4) -> list:
+    """
+    Split the users into consecutive shards and process them with a process pool (see _process_shard).
+    Results come back in shard order, so merging them in turn gives exactly the sequential result.
+    Where processes are forked the workers read the list inherited from this process; elsewhere each
+    shard is pickled to its worker.
+    """
+    global _shared_users
+    if not users:
+        return [_process_shard(0, 0, stats_backend, approximate, users=[])]
+
+    size = -(-len(users) // (workers * shards_per_worker))
+    bounds = [(start, min(start + size, len(users))) for start in range(0, len(users), size)]
+    fork = "fork" in multiprocessing.get_all_start_methods()
+
+    try:
+        if fork:
+            _shared_users = users
+            context = multiprocessing.get_context("fork")
+            shard_users = [None] * len(bounds)
+        else:
+            context = None
+            shard_users = [users[start:stop] for start, stop in bounds]
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            return list(pool.map(_process_shard, [start for start, _ in bounds], [stop for _, stop in bounds],
+                                 [stats_backend] * len(bounds), [approximate] * len(bounds), shard_users))
+    finally:
+        _shared_users = None
@@ -0,0 +1,155 @@
+import math
+import heapq
+import hashlib
+
+
+def _hash64(value) -> int:
+    return int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    """
+    Distinct-count estimate in fixed memory (2^precision one-byte registers):
+    - the relative standard error is about 1.04 / sqrt(2^precision); error_rate picks the smallest
+      precision that meets it (0.01 -> 2^14 registers, 16 KiB)
+    - merge() of two sketches with the same precision is the sketch of the union
+    """
+
+    def __init__(self, error_rate: float = 0.01):
+        if not 0 < error_rate < 1:
+            raise ValueError("HyperLogLog needs 0 < error_rate < 1")
+        self.precision = min(18, max(4, math.ceil(math.log2((1.04 / error_rate) ** 2))))
+        self.registers = bytearray(1 << self.precision)
+
+    @property
+    def error(self) -> float:
+        """Relative standard error of count()."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, value):
+        h = _hash64(value)
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small range: linear counting over the empty registers is more accurate.
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Only HyperLogLog sketches with the same precision can be merged")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def to_dict(self) -> dict:
+        return {"precision": self.precision, "registers": self.registers.hex()}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "HyperLogLog":
+        sketch = cls.__new__(cls)
+        sketch.precision = state["precision"]
+        sketch.registers = bytearray.fromhex(state["registers"])
+        return sketch
+
+
+class SpaceSaving:
+    """
+    Top-k frequent items in fixed memory (Space-Saving, Metwally et al.):
+    - keeps at most ceil(1 / error_rate) counters; a new item takes over the smallest counter
+    - every count is an overestimate by at most that counter's recorded error, itself at most
+      error_rate * total; any item more frequent than that bound is guaranteed to be kept
+    - merge() combines two summaries into one with the same guarantee over the combined stream
+    """
+
+    def __init__(self, error_rate: float = 0.001):
+        if not 0 < error_rate < 1:
+            raise ValueError("SpaceSaving needs 0 < error_rate < 1")
+        self.error_rate = error_rate
+        self.capacity = math.ceil(1 / error_rate)
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        self._heap = []  # (count, item) candidates for the minimum; entries go stale as counts grow
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @property
+    def max_error(self) -> int:
+        """Largest possible overestimate of any count (0 while every item still has its own counter)."""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def add(self, item, count: int = 1):
+        counts = self.counts
+        self.total += count
+        if item in counts:
+            counts[item] += count
+            return
+        if len(counts) < self.capacity:
+            counts[item] = count
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (count, item))
+            return
+
+        minimum, victim = self._pop_minimum()
+        del counts[victim], self.errors[victim]
+        counts[item] = minimum + count
+        self.errors[item] = minimum
+        heapq.heappush(self._heap, (minimum + count, item))
+
+    def _pop_minimum(self) -> tuple:
+        heap, counts = self._heap, self.counts
+        if len(heap) > 4 * self.capacity:
+            heap[:] = [(count, item) for item, count in counts.items()]
+            heapq.heapify(heap)
+        while True:
+            count, item = heapq.heappop(heap)
+            current = counts.get(item)
+            if current == count:
+                return count, item
+            if current is not None:
+                heapq.heappush(heap, (current, item))
+
+    def top(self, n: int = None) -> list:
+        """[(item, estimated count, max overestimate)] by estimated count, descending."""
+        ranked = sorted(self.counts.items(), key=lambda entry: entry[1], reverse=True)[:n]
+        return [(item, count, self.errors[item]) for item, count in ranked]
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        # An item missing from a full summary may have occurred up to that summary's minimum count.
+        floor_self, floor_other = self.max_error, other.max_error
+        counts, errors = {}, {}
+        for item in list(self.counts) + [item for item in other.counts if item not in self.counts]:
+            counts[item] = self.counts.get(item, floor_self) + other.counts.get(item, floor_other)
+            errors[item] = self.errors.get(item, floor_self) + other.errors.get(item, floor_other)
+        kept = sorted(counts, key=counts.get, reverse=True)[:self.capacity]
+        self.counts = {item: counts[item] for item in kept}
+        self.errors = {item: errors[item] for item in kept}
+        self.total += other.total
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def to_dict(self) -> dict:
+        return {"error_rate": self.error_rate, "total": self.total,
+                "counters": [[item, count, self.errors[item]] for item, count in self.counts.items()]}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "SpaceSaving":
+        sketch = cls(state["error_rate"])
+        sketch.total = state["total"]
+        for item, count, error in state["counters"]:
+            sketch.counts[item] = count
+            sketch.errors[item] = error
+        sketch._heap = [(count, item) for item, count in sketch.counts.items()]
+        heapq.heapify(sketch._heap)
+        return sketch
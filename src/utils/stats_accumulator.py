@@ -0,0 +1,253 @@
+from datetime import datetime
+from itertools import islice
+from src.utils.sketches import HyperLogLog, SpaceSaving
+
+# Users counted exactly before the high-cardinality maps are folded into sketches (approximate mode).
+SKETCH_BATCH = 10000
+
+
+def _histogram_stats(histogram: dict) -> tuple:
+    """(count, min, max, sum) of the values of a {value: occurrences} histogram."""
+    count = sum(histogram.values())
+    total = sum(value * occurrences for value, occurrences in histogram.items())
+    return count, min(histogram, default=0), max(histogram, default=0), total
+
+
+def _merge_counts(target: dict, source: dict):
+    for key, count in source.items():
+        target[key] = target.get(key, 0) + count
+
+
+class StatsAccumulator:
+    """
+    Single-pass, mergeable engine behind Transformer.generate_stats:
+    - update() counts every field of each user in one traversal, with no per-field intermediate lists
+    - ages, username and password lengths are kept as {value: count} histograms, from which
+      min, max, exact mean and the decade buckets are derived
+    - dicts keep first-appearance order, so finalize() is identical to counting the lists with Counter
+    - the state is only counts, so states of consecutive chunks merge() into exactly the state of the
+      whole dataset, and serialize with to_dict()/from_dict()
+    """
+
+    approximate = False
+    COUNTS = ("ages", "genders", "countries", "nationalities", "email_domains", "username_lengths",
+              "password_lengths", "registration_years", "timezones")
+
+    def __init__(self):
+        self.total_users = 0
+        self.ages = {}
+        self.genders = {}
+        self.countries = {}
+        self.nationalities = {}
+        self.email_domains = {}
+        self.username_lengths = {}
+        self.password_lengths = {}
+        self.registration_years = {}  # keyed by int year, the keys become strings in finalize()
+        self.timezones = {}
+
+    def add(self, user):
+        """Count one UserRecord."""
+        self.update((user,))
+
+    def update(self, users):
+        """Count every user of an iterable, in one traversal (counters bound to locals for speed)."""
+        ages, genders, countries = self.ages, self.genders, self.countries
+        nationalities, email_domains, timezones = self.nationalities, self.email_domains, self.timezones
+        username_lengths, password_lengths = self.username_lengths, self.password_lengths
+        registration_years = self.registration_years
+        count = 0
+
+        for user in users:
+            count += 1
+            age = user.age
+            if type(age) is int:
+                ages[age] = ages.get(age, 0) + 1
+            value = user.gender
+            if value is not None:
+                genders[value] = genders.get(value, 0) + 1
+            value = user.country
+            if value is not None:
+                countries[value] = countries.get(value, 0) + 1
+            value = user.nat
+            if value is not None:
+                nationalities[value] = nationalities.get(value, 0) + 1
+            value = user.email
+            if value is not None:
+                value = value.rpartition("@")[2]
+                email_domains[value] = email_domains.get(value, 0) + 1
+            value = len(user.username or "")
+            username_lengths[value] = username_lengths.get(value, 0) + 1
+            value = user.password
+            if value:
+                value = len(value)
+                password_lengths[value] = password_lengths.get(value, 0) + 1
+            value = user.registered
+            if isinstance(value, datetime):
+                value = value.year
+                registration_years[value] = registration_years.get(value, 0) + 1
+            value = user.timezone_offset
+            if value:
+                timezones[value] = timezones.get(value, 0) + 1
+
+        self.total_users += count
+        return self
+
+    def merge(self, other: "StatsAccumulator") -> "StatsAccumulator":
+        """Add the counts of another state (of users that come after this state's users)."""
+        if other.approximate and not self.approximate:
+            raise ValueError("An approximate stats state can only be merged into another approximate state")
+        self.total_users += other.total_users
+        for name in self.COUNTS:
+            _merge_counts(getattr(self, name), getattr(other, name))
+        return self
+
+    def to_dict(self) -> dict:
+        """JSON-ready state; count maps are [key, count] pairs so int keys and order survive."""
+        state = {"total_users": self.total_users}
+        for name in self.COUNTS:
+            state[name] = [[key, count] for key, count in getattr(self, name).items()]
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "StatsAccumulator":
+        if "sketches" in state and cls is StatsAccumulator:
+            return ApproxStatsAccumulator.from_dict(state)
+        accumulator = cls()
+        accumulator.total_users = state["total_users"]
+        for name in cls.COUNTS:
+            setattr(accumulator, name, {key: count for key, count in state[name]})
+        return accumulator
+
+    def finalize(self) -> dict:
+        """The stats dict, in the layout generate_stats has always returned."""
+        age_count, age_min, age_max, age_sum = _histogram_stats(self.ages)
+        name_count, name_min, name_max, name_sum = _histogram_stats(self.username_lengths)
+        pass_count, pass_min, pass_max, pass_sum = _histogram_stats(self.password_lengths)
+
+        age_decades = {}
+        for age, occurrences in self.ages.items():
+            decade = f"{(age // 10) * 10}s"
+            age_decades[decade] = age_decades.get(decade, 0) + occurrences
+
+        short = sum(occurrences for length, occurrences in self.password_lengths.items() if length < 8)
+        # Counter.most_common order: by count, ties in first-appearance order.
+        most_frequent_gender = max(self.genders, key=self.genders.get) if self.genders else None
+        timezones = sorted(self.timezones.items(), key=lambda item: item[1], reverse=True)[:10]
+
+        return {
+            "total_users": self.total_users,
+            "average_age": round(age_sum / age_count, 2) if age_count else 0.0,
+            "minimum_age": age_min,
+            "maximum_age": age_max,
+            "most_frequent_gender": most_frequent_gender,
+            "gender_distribution": dict(self.genders),
+            "different_countries": len(self.countries),
+            "users_per_country": dict(self.countries),
+            "nationality_distribution": dict(self.nationalities),
+            "email_domain_distribution": dict(self.email_domains),
+            "username_length_stats": {
+                "min": name_min,
+                "max": name_max,
+                "average": round(name_sum / name_count, 2) if name_count else 0.0,
+            },
+            "age_decade_distribution": age_decades,
+            "password_length_stats": {
+                "min": pass_min,
+                "max": pass_max,
+                "average": round(pass_sum / pass_count, 2) if pass_count else 0.0,
+                "distribution": dict(self.password_lengths),
+                "short_percentage": round(short / pass_count * 100, 2) if pass_count else 0.0,
+            },
+            "registration_by_year": dict(sorted((str(year), n) for year, n in self.registration_years.items())),
+            "timezone_distribution": dict(timezones),
+        }
+
+
+class ApproxStatsAccumulator(StatsAccumulator):
+    """
+    StatsAccumulator with bounded memory for the high-cardinality fields:
+    - users are counted exactly in batches of SKETCH_BATCH, then the country and email domain counts
+      are folded into Space-Saving summaries (top-k) and HyperLogLog sketches (distinct counts)
+    - different_countries is the HyperLogLog estimate; users_per_country and email_domain_distribution
+      hold the top-k estimates; finalize() reports the error bounds under "approximation"
+    - merging an exact state into an approximate one folds its counts into the sketches
+    """
+
+    approximate = True
+    SKETCHED = ("countries", "email_domains")
+
+    def __init__(self, hll_error: float = 0.01, topk_error: float = 0.001):
+        super().__init__()
+        self.hll_error = hll_error
+        self.topk_error = topk_error
+        self.top = {name: SpaceSaving(topk_error) for name in self.SKETCHED}
+        self.distinct = {name: HyperLogLog(hll_error) for name in self.SKETCHED}
+
+    def _fold(self):
+        for name in self.SKETCHED:
+            counts = getattr(self, name)
+            top, distinct = self.top[name], self.distinct[name]
+            for value, count in counts.items():
+                top.add(value, count)
+                distinct.add(value)
+            counts.clear()
+
+    def update(self, users):
+        users = iter(users)
+        while True:
+            batch = list(islice(users, SKETCH_BATCH))
+            if not batch:
+                return self
+            super().update(batch)
+            self._fold()
+
+    def merge(self, other: StatsAccumulator) -> "ApproxStatsAccumulator":
+        super().merge(other)
+        self._fold()
+        if other.approximate:
+            for name in self.SKETCHED:
+                self.top[name].merge(other.top[name])
+                self.distinct[name].merge(other.distinct[name])
+        return self
+
+    def to_dict(self) -> dict:
+        state = super().to_dict()
+        state["sketches"] = {
+            "hll_error": self.hll_error,
+            "topk_error": self.topk_error,
+            "top": {name: sketch.to_dict() for name, sketch in self.top.items()},
+            "distinct": {name: sketch.to_dict() for name, sketch in self.distinct.items()},
+        }
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "ApproxStatsAccumulator":
+        sketches = state["sketches"]
+        accumulator = cls(sketches["hll_error"], sketches["topk_error"])
+        accumulator.total_users = state["total_users"]
+        for name in cls.COUNTS:
+            setattr(accumulator, name, {key: count for key, count in state[name]})
+        accumulator.top = {name: SpaceSaving.from_dict(sketch) for name, sketch in sketches["top"].items()}
+        accumulator.distinct = {name: HyperLogLog.from_dict(sketch) for name, sketch in sketches["distinct"].items()}
+        return accumulator
+
+    def finalize(self) -> dict:
+        stats = super().finalize()
+        countries, domains = self.top["countries"], self.top["email_domains"]
+        stats["different_countries"] = self.distinct["countries"].count()
+        stats["users_per_country"] = {item: count for item, count, _ in countries.top()}
+        stats["email_domain_distribution"] = {item: count for item, count, _ in domains.top()}
+        stats["approximation"] = {
+            "different_countries": {"method": "hyperloglog", "relative_error": round(self.distinct["countries"].error, 4)},
+            "users_per_country": {"method": "space-saving", "max_overcount": countries.max_error,
+                                  "kept": len(countries)},
+            "email_domain_distribution": {"method": "space-saving", "max_overcount": domains.max_error,
+                                          "kept": len(domains),
+                                          "distinct_estimate": self.distinct["email_domains"].count()},
+        }
+        return stats
+
+
+def make_stats_accumulator(approximate: dict = None) -> StatsAccumulator:
+    """Exact accumulator, or an ApproxStatsAccumulator built from {"hll_error": ..., "topk_error": ...}."""
+    return ApproxStatsAccumulator(**approximate) if approximate is not None else StatsAccumulator()
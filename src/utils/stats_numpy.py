@@ -0,0 +1,74 @@
+from datetime import datetime
+from operator import attrgetter
+import numpy as np
+import pandas as pd
+from src.utils.stats_accumulator import StatsAccumulator
+
+
+def _counts(values) -> tuple:
+    """(distinct values in first-appearance order, their counts) via a hash factorization, not a sort."""
+    values = np.asarray(values, dtype=object) if isinstance(values, list) else values
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    # tolist() turns NumPy scalars back into Python ints and strings (json rejects np.int64 keys).
+    return uniques.tolist(), np.bincount(codes, minlength=len(uniques))
+
+
+def _distribution(values) -> dict:
+    uniques, counts = _counts(values)
+    return dict(zip(uniques, counts.tolist()))
+
+
+def _gather(users: list, name: str) -> list:
+    """One field of every user, collected with a C-level map instead of a Python loop."""
+    return list(map(attrgetter(name), users))
+
+
+def _present(values: list, missing=None) -> list:
+    return [value for value in values if value is not missing] if missing in values else values
+
+
+def _lengths(strings: list) -> "np.ndarray":
+    return np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+
+
+def _int_column(values: list) -> "np.ndarray":
+    """Typed column of the int values (missing or unparsed ones are skipped)."""
+    try:
+        return np.array(values, dtype=np.int64)
+    except (TypeError, ValueError):
+        return np.array([value for value in values if type(value) is int], dtype=np.int64)
+
+
+def _years(users: list) -> "np.ndarray":
+    try:
+        return np.fromiter(map(attrgetter("registered.year"), users), dtype=np.int64, count=len(users))
+    except AttributeError:
+        return np.array([user.registered.year for user in users if isinstance(user.registered, datetime)],
+                        dtype=np.int64)
+
+
+def vectorized_state(users: list) -> StatsAccumulator:
+    """
+    The StatsAccumulator state computed over NumPy columns: each field is gathered once into a typed column,
+    then every histogram is counted in bulk. Same counts, in the same order, as StatsAccumulator.update.
+    """
+    usernames = _gather(users, "username")
+    state = StatsAccumulator()
+    state.total_users = len(users)
+    state.ages = _distribution(_int_column(_gather(users, "age")))
+    state.genders = _distribution(_present(_gather(users, "gender")))
+    state.countries = _distribution(_present(_gather(users, "country")))
+    state.nationalities = _distribution(_present(_gather(users, "nat")))
+    state.email_domains = _distribution([email.rpartition("@")[2] for email in _present(_gather(users, "email"))])
+    state.username_lengths = _distribution(
+        _lengths(usernames if None not in usernames else [name or "" for name in usernames]))
+    state.password_lengths = _distribution(_lengths([password for password in _gather(users, "password") if password]))
+    year_values, year_counts = np.unique(_years(users), return_counts=True)
+    state.registration_years = dict(zip(year_values.tolist(), year_counts.tolist()))
+    state.timezones = _distribution([offset for offset in _gather(users, "timezone_offset") if offset])
+    return state
+
+
+def vectorized_stats(users: list) -> dict:
+    """generate_stats over NumPy columns: same dict (keys, values, order) as StatsAccumulator."""
+    return vectorized_state(users).finalize()
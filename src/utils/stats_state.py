@@ -0,0 +1,78 @@
+import json
+import os
+from pathlib import Path
+from cryptography.fernet import Fernet
+from src.utils.stats_accumulator import StatsAccumulator
+from src.utils.passwordauditor import AuditAccumulator
+
+STATE_FILE = "stats_state.json.enc"
+STATE_VERSION = 1
+
+
+class RunStatsState:
+    """
+    Mergeable statistics of one or more runs (saved as stats_state.json.enc in the run directory):
+    - the Transformer's StatsAccumulator and the PasswordAuditor's AuditAccumulator, counts only
+    - merge() combines runs (or chunks) and finalize() gives the statistics.json dict, so a new batch
+      is added to earlier results without rescanning their users
+    - `runs` lists the run directories folded into the state; `validation` holds the validation totals
+      (ValidationReport.summary()) when known
+    - the saved state holds every distinct password with its count (needed for an exact top-N after
+      merging), so it is always encrypted with the run key, like the CSV artifacts
+    """
+
+    def __init__(self, stats: StatsAccumulator = None, audit: AuditAccumulator = None, runs: list = None,
+                 validation: dict = None):
+        self.stats = stats or StatsAccumulator()
+        self.audit = audit or AuditAccumulator()
+        self.runs = list(runs or [])
+        self.validation = validation
+
+    def merge(self, other: "RunStatsState") -> "RunStatsState":
+        self.stats.merge(other.stats)
+        self.audit.merge(other.audit)
+        self.runs.extend(other.runs)
+        if other.validation is not None:
+            if self.validation is None:
+                self.validation = {"records_flagged": 0, "violations": 0, "by_rule": {}}
+            self.validation["records_flagged"] += other.validation["records_flagged"]
+            self.validation["violations"] += other.validation["violations"]
+            by_rule = self.validation["by_rule"]
+            for rule, count in other.validation["by_rule"].items():
+                by_rule[rule] = by_rule.get(rule, 0) + count
+        return self
+
+    def finalize(self) -> dict:
+        stats = self.stats.finalize()
+        audit = self.audit.finalize()
+        approximation = {**stats.pop("approximation", {}), **audit.pop("approximation", {})}
+        stats.update(audit)
+        if approximation:
+            stats["approximation"] = approximation
+        if self.validation is not None:
+            stats["validation"] = self.validation
+        return stats
+
+    def save(self, path, key: bytes):
+        """Write the state as Fernet-encrypted JSON."""
+        path = Path(path)
+        state = {"version": STATE_VERSION, "runs": self.runs, "validation": self.validation,
+                 "stats": self.stats.to_dict(), "audit": self.audit.to_dict()}
+        data = Fernet(key).encrypt(json.dumps(state).encode("utf-8"))
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, key: bytes) -> "RunStatsState":
+        """Load a stats_state.json.enc (or the one inside a run directory)."""
+        path = Path(path)
+        if path.is_dir():
+            path = path / STATE_FILE
+        with open(path, "rb") as f:
+            state = json.loads(Fernet(key).decrypt(f.read()))
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported stats state version in {path}: {state.get('version')}")
+        return cls(StatsAccumulator.from_dict(state["stats"]), AuditAccumulator.from_dict(state["audit"]),
+                   state["runs"], state.get("validation"))
@@ -0,0 +1,218 @@
+from datetime import datetime, timezone
+from operator import attrgetter, itemgetter
+
+
+def _parse_date(value) -> datetime:
+    date = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    if date.tzinfo is timezone.utc:
+        return date
+    return date.replace(tzinfo=timezone.utc) if date.tzinfo is None else date.astimezone(timezone.utc)
+
+
+def _format_date(date: datetime) -> str:
+    """The API's own format: 1993-07-20T09:44:18.674Z"""
+    return (f"{date.year:04d}-{date.month:02d}-{date.day:02d}T{date.hour:02d}:{date.minute:02d}:{date.second:02d}"
+            f".{date.microsecond // 1000:03d}Z")
+
+
+# (slot, flattened RandomUser path, converter) in the API's field order. Fields without a converter stay strings.
+FIELDS = (
+    ("gender", "gender", None),
+    ("title", "name.title", None),
+    ("first_name", "name.first", None),
+    ("last_name", "name.last", None),
+    ("street_number", "location.street.number", int),
+    ("street_name", "location.street.name", None),
+    ("city", "location.city", None),
+    ("state", "location.state", None),
+    ("country", "location.country", None),
+    ("postcode", "location.postcode", None),
+    ("latitude", "location.coordinates.latitude", float),
+    ("longitude", "location.coordinates.longitude", float),
+    ("timezone_offset", "location.timezone.offset", None),
+    ("timezone_description", "location.timezone.description", None),
+    ("email", "email", None),
+    ("uuid", "login.uuid", None),
+    ("username", "login.username", None),
+    ("password", "login.password", None),
+    ("salt", "login.salt", None),
+    ("md5", "login.md5", None),
+    ("sha1", "login.sha1", None),
+    ("sha256", "login.sha256", None),
+    ("dob", "dob.date", _parse_date),
+    ("age", "dob.age", int),
+    ("registered", "registered.date", _parse_date),
+    ("registered_age", "registered.age", int),
+    ("phone", "phone", None),
+    ("cell", "cell", None),
+    ("id_name", "id.name", None),
+    ("id_value", "id.value", None),
+    ("picture_large", "picture.large", None),
+    ("picture_medium", "picture.medium", None),
+    ("picture_thumbnail", "picture.thumbnail", None),
+    ("nat", "nat", None),
+)
+
+_PATHS = tuple(tuple(path.split(".")) for _, path, _ in FIELDS)
+_TYPED = tuple((position, convert) for position, (_, _, convert) in enumerate(FIELDS) if convert)
+_KNOWN = frozenset(path for _, path, _ in FIELDS)
+_FLAT_PATHS = tuple(path for _, path, _ in FIELDS)
+_VALUES = attrgetter(*(slot for slot, _, _ in FIELDS))
+
+
+def _convert(convert, value):
+    """Typed value; None when empty, the original text when it does not parse."""
+    if value is None or value == "":
+        return None
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class UserRecord:
+    """
+    Compact, typed user (one object with slots instead of ~12 nested dicts per user):
+    - ages and street number are ints, coordinates floats, dates UTC datetimes
+    - every other RandomUser leaf is kept as loaded; missing fields are None
+    - columns outside the RandomUser schema are kept in `extra` ({flattened path: value})
+    Pipeline stages read the attributes directly; to_dict() is only for JSON output.
+    """
+    __slots__ = tuple(slot for slot, _, _ in FIELDS) + ("extra",)
+
+    def __init__(self, *values, extra: dict = None):
+        (self.gender, self.title, self.first_name, self.last_name, self.street_number, self.street_name,
+         self.city, self.state, self.country, self.postcode, self.latitude, self.longitude,
+         self.timezone_offset, self.timezone_description, self.email, self.uuid, self.username, self.password,
+         self.salt, self.md5, self.sha1, self.sha256, self.dob, self.age, self.registered, self.registered_age,
+         self.phone, self.cell, self.id_name, self.id_value, self.picture_large, self.picture_medium,
+         self.picture_thumbnail, self.nat) = values
+        self.extra = extra
+
+    def __reduce__(self):
+        # Positional state pickles much smaller than the default slot dict (parallel loads return records).
+        return _restore, (self.values(), self.extra)
+
+    def __eq__(self, other):
+        if not isinstance(other, UserRecord):
+            return NotImplemented
+        return self.values() == other.values() and self.extra == other.extra
+
+    def __repr__(self):
+        return f"UserRecord(uuid={self.uuid!r}, username={self.username!r})"
+
+    def values(self) -> tuple:
+        """Field values in FIELDS order."""
+        return _VALUES(self)
+
+    @property
+    def birth_year(self) -> str:
+        if isinstance(self.dob, datetime):
+            return str(self.dob.year)
+        return self.dob[:4] if self.dob else ""
+
+    @classmethod
+    def from_dict(cls, user: dict) -> "UserRecord":
+        """Build a record from a nested user dict (API response, Arrow artifact)."""
+        values = []
+        for path in _PATHS:
+            value = user
+            for part in path:
+                if not isinstance(value, dict):
+                    value = None
+                    break
+                value = value.get(part)
+            values.append(value)
+        for position, convert in _TYPED:
+            values[position] = _convert(convert, values[position])
+
+        extra = {path: value for path, value in _iter_leaves(user) if path not in _KNOWN}
+        return cls(*values, extra=extra or None)
+
+    def iter_fields(self):
+        """(flattened path, value) for every field, like Validator.iterate_fields on the user dict."""
+        yield from zip(_FLAT_PATHS, _VALUES(self))
+        if self.extra:
+            yield from self.extra.items()
+
+    def to_dict(self) -> dict:
+        """Nested dict in the API's layout; dates are written back in the API's ISO format."""
+        user = {}
+        for (slot, _, _), path in zip(FIELDS, _PATHS):
+            value = getattr(self, slot)
+            if isinstance(value, datetime):
+                value = _format_date(value)
+            _set_path(user, path, value)
+        if self.extra:
+            for path, value in self.extra.items():
+                _set_path(user, tuple(path.split(".")), value)
+        return user
+
+
+def _restore(values: tuple, extra: dict) -> UserRecord:
+    return UserRecord(*values, extra=extra)
+
+
+def _iter_leaves(data: dict, parent: str = ""):
+    for key, value in data.items():
+        path = f"{parent}.{key}" if parent else key
+        if isinstance(value, dict):
+            yield from _iter_leaves(value, path)
+        else:
+            yield path, value
+
+
+def _set_path(user: dict, path: tuple, value):
+    node = user
+    for part in path[:-1]:
+        child = node.get(part)
+        if not isinstance(child, dict):
+            child = node[part] = {}
+        node = child
+    node[path[-1]] = value
+
+
+class RecordLayout:
+    """
+    Maps the columns of a flattened file (CSV header, Arrow schema) to UserRecord fields, once per file,
+    so each row becomes a record with one itemgetter call and no intermediate dicts.
+    """
+
+    def __init__(self, fieldnames):
+        self.fieldnames = list(fieldnames)
+        self.width = len(self.fieldnames)
+        column = {name: index for index, name in enumerate(self.fieldnames)}
+        # Missing fields read the None appended after the row's last column.
+        self._get = itemgetter(*[column.get(path, self.width) for _, path, _ in FIELDS])
+        self._extra = [(name, index) for index, name in enumerate(self.fieldnames) if name not in _KNOWN]
+
+    def decode(self, row) -> UserRecord:
+        """Record for one row (a csv.reader list is extended in place; other sequences are copied)."""
+        if type(row) is list and len(row) == self.width:
+            row.append(None)
+        else:
+            row = list(row[:self.width])
+            row.extend([None] * (self.width - len(row) + 1))
+
+        values = list(self._get(row))
+        for position, convert in _TYPED:
+            value = values[position]
+            if value is None or value == "":
+                values[position] = None
+            else:
+                try:
+                    values[position] = convert(value)
+                except (TypeError, ValueError):
+                    pass
+        extra = {name: row[index] for name, index in self._extra} if self._extra else None
+        return UserRecord(*values, extra=extra)
+
+
+def as_records(users: list) -> list:
+    """UserRecords for a list of records and/or nested user dicts."""
+    return [user if isinstance(user, UserRecord) else UserRecord.from_dict(user) for user in users]
+
+
+def as_dicts(users: list) -> list:
+    """Nested user dicts for JSON output."""
+    return [user.to_dict() if isinstance(user, UserRecord) else user for user in users]
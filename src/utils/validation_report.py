@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+from src.utils.validator import Validator
+
+REPORT_FILE = "validation_report.ndjson"
+
+
+class ValidationReport:
+    """
+    Violations found by validate_data, collected instead of printed one line per field:
+    - one compact (record, field, rule, excerpt) tuple per offending field; record is the 1-based
+      position of the user in the loaded input, as in the old log lines
+    - write() saves them in one go as NDJSON, summary() gives the totals for statistics.json
+    """
+
+    def __init__(self):
+        self.violations = []
+        self.records_flagged = 0
+        self.by_rule = {}
+
+    def __len__(self) -> int:
+        return len(self.violations)
+
+    def add(self, record: int, fields: list):
+        """Record the strange fields ([(field path, value)]) of one flagged user."""
+        self.records_flagged += 1
+        for field, value in fields:
+            rule, excerpt = Validator.strange_violation(value)
+            self.violations.append((record, field, rule, excerpt))
+            self.by_rule[rule] = self.by_rule.get(rule, 0) + 1
+
+    def summary(self) -> dict:
+        return {"records_flagged": self.records_flagged, "violations": len(self.violations),
+                "by_rule": dict(self.by_rule)}
+
+    def print_summary(self, limit: int = 5):
+        print(f"Validation complete. {self.records_flagged} records flagged for review.")
+        if not self.violations:
+            return
+        print("Violations by rule: " + ", ".join(f"{rule}: {count}" for rule, count in self.by_rule.items()))
+        for record, field, rule, excerpt in self.violations[:limit]:
+            print(f"  user #{record}, field '{field}' ({rule}): {excerpt}")
+        if len(self.violations) > limit:
+            print(f"  ... {len(self.violations) - limit} more in {REPORT_FILE}")
+
+    def write(self, path):
+        """Write every violation as one JSON object per line, with a single write."""
+        lines = [json.dumps({"record": record, "field": field, "rule": rule, "excerpt": excerpt}, ensure_ascii=False)
+                 for record, field, rule, excerpt in self.violations]
+        with open(Path(path), "w", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
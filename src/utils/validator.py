@@ -1,5 +1,35 @@
 import unicodedata
 import re
+from functools import lru_cache
+
+# Values accepted as they are: HTML entities, timezone offsets, emails, URLs.
+_EXEMPT = re.compile(
+    r"(?:&[a-zA-Z0-9#]+;"
+    r"|^[+-]\d{1,2}:\d{2}$"
+    r"|^[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}$"
+    r"|^https?://\S+$)"
+)
+_ALLOWED = re.compile(r"^[\w\s'’‘\-–—.,;:/()@+À-ÿ&]+$", re.UNICODE)
+_ASCII_CONTROL = re.compile(r"[\x00-\x1f\x7f]")
+
+# Distinct non-ASCII values remembered per process (names, cities and states repeat across users).
+STRANGE_CACHE_SIZE = 65536
+
+
+def _scan(text: str) -> bool:
+    """The full check: NFKC, the accepted shapes, then one pass for control (C*) or non-Latin (> U+024F) characters."""
+    normalized = unicodedata.normalize("NFKC", text)
+    if _EXEMPT.fullmatch(normalized) or _ALLOWED.fullmatch(normalized):
+        return False
+    return any(ord(ch) > 591 or unicodedata.category(ch)[0] == "C" for ch in normalized)
+
+
+_scan_cached = lru_cache(maxsize=STRANGE_CACHE_SIZE)(_scan)
+
+# Rule reported for a flagged value, by the Unicode category of its first offending character.
+_CATEGORY_RULES = {"Cc": "control_character", "Cf": "invisible_character"}
+EXCERPT_CONTEXT = 10
+
 
 class Validator:
     """Utility class for validating data and helper methods for ETL."""
@@ -26,30 +56,37 @@ class Validator:
         """Return True if the string contains invalid/non-Latin/invisible characters."""
         if not isinstance(text, str):
             return False
+        if text.isascii():
+            # NFKC leaves ASCII unchanged and its only "C" category characters are the controls,
+            # so without one no rule below can flag the text.
+            return _ASCII_CONTROL.search(text) is not None and _scan(text)
+        return _scan_cached(text)
 
+    @staticmethod
+    def strange_violation(text: str) -> tuple:
+        """
+        (rule, excerpt) explaining why contains_strange_characters flagged the text: the rule of the first
+        offending character, and up to 10 characters around it with invisible ones escaped (\\u200b).
+        """
         normalized = unicodedata.normalize("NFKC", text)
+        position, rule = 0, "non_latin_character"
+        for position, ch in enumerate(normalized):
+            category = unicodedata.category(ch)
+            if category[0] == "C":
+                rule = _CATEGORY_RULES.get(category, "unassigned_character")
+                break
+        else:
+            position = next((i for i, ch in enumerate(normalized) if ord(ch) > 591), 0)
 
-        if (
-            re.fullmatch(r"&[a-zA-Z0-9#]+;", normalized)  # HTML entities
-            or re.fullmatch(r"^[+-]\d{1,2}:\d{2}$", normalized)  # Timezone offsets
-            or re.fullmatch(r"^[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}$", normalized)  # Email
-            or re.fullmatch(r"^https?://\S+$", normalized)  # URL
-        ):
-            return False
-
-        allowed_pattern = re.compile(r"^[\w\s'’‘\-–—.,;:/()@+À-ÿ&]+$", re.UNICODE)
-        if allowed_pattern.fullmatch(normalized):
-            return False
-
-        for ch in normalized:
-            if unicodedata.category(ch).startswith("C"):
-                return True
-
-        for ch in normalized:
-            if ord(ch) > 591:
-                return True
+        start, stop = max(0, position - EXCERPT_CONTEXT), position + EXCERPT_CONTEXT + 1
+        excerpt = "".join(ch if ch.isprintable() else f"\\u{ord(ch):04x}" for ch in normalized[start:stop])
+        return rule, ("…" if start else "") + excerpt + ("…" if stop < len(normalized) else "")
 
-        return False
+    @staticmethod
+    def strange_fields(user) -> list:
+        """(field path, value) of every string field of a UserRecord that contains strange characters."""
+        return [(key, value) for key, value in user.iter_fields()
+                if isinstance(value, str) and Validator.contains_strange_characters(value)]
 
     @staticmethod
     def iterate_fields(data, parent_key=""):
@@ -0,0 +1,17 @@
+from src.utils.rate_limiter import AIMDController
+
+
+def test_limit_grows_past_initial_without_congestion():
+    controller = AIMDController(maximum=16, initial=4)
+    for _ in range(200):
+        controller.on_success(latency=0.1)
+    assert controller.limit == 16
+
+
+def test_limit_starts_below_maximum_and_halves_on_congestion():
+    controller = AIMDController(maximum=10, cooldown=0)
+    assert controller.limit == 5
+    for _ in range(50):
+        controller.on_success()
+    controller.on_congestion()
+    assert controller.limit == 5